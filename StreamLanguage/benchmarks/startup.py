@@ -0,0 +1,58 @@
+"""
+Startup benchmark: time from process start to the end of the first executed statement.
+
+Every run is a new Python process, like a command line invocation of the interpreter. Two numbers are reported for
+each mode, the median of the runs:
+- first statement: measured inside the child, from before the interpreter module is imported until the first
+  statement of the program has run.
+- process: wall time of the whole child process, including the Python runtime starting and exiting.
+
+    python -m StreamLanguage.benchmarks.startup [--runs N] [--engine tree|closure|vm]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHILD = """
+import time
+start = time.perf_counter()
+from StreamLanguage.interpreter.interpreter import Interpreter
+Interpreter(engine={engine!r}, frozen_tables={frozen!r}).interpret("var x = 1;")
+print(time.perf_counter() - start)
+"""
+
+MODES = (('generated tables', False), ('frozen tables', True))
+
+
+def run_child(engine, frozen):
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    environment.pop('PYTHONDONTWRITEBYTECODE', None)  # Installed packages start from their bytecode caches
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', CHILD.format(engine=engine, frozen=frozen)],
+                            capture_output=True, text=True, check=True, env=environment, cwd=ROOT)
+    elapsed = time.perf_counter() - start
+    return float(result.stdout.split()[-1]), elapsed
+
+
+def main(argv=None):
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arguments.add_argument('--runs', type=int, default=20)
+    arguments.add_argument('--engine', default='tree')
+    options = arguments.parse_args(argv)
+
+    run_child(options.engine, False)  # Compile the bytecode caches once so no mode pays for it
+    print(f"{'mode':<18}{'first statement':>18}{'process':>12}")
+    for label, frozen in MODES:
+        timings = [run_child(options.engine, frozen) for _ in range(options.runs)]
+        first_statement = statistics.median(timing[0] for timing in timings)
+        process = statistics.median(timing[1] for timing in timings)
+        print(f"{label:<18}{first_statement * 1000:>15.1f} ms{process * 1000:>9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,6 @@
 class SLBaseException(Exception):
+    stack_trace = None  # StackSnapshot of the calls that were active where the error left a function
+
     def __init__(self, message: str):
         self.message = message
 
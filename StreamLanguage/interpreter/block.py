@@ -1,13 +1,13 @@
 from StreamLanguage.sl_ast.block_types import BlockFlags
-from StreamLanguage.interpreter.symbol_table import SymbolTable
 
 
 class Block:
-    def __init__(self, block_type, block_uuid=None):
+    __slots__ = ('block_type', 'uuid', 'scoped')
+
+    def __init__(self, block_type, block_uuid=None, scoped=True):
         self.block_type = block_type
-        self.symbol_table = SymbolTable()
         self.uuid = block_uuid
-        # Additional attributes as needed
+        self.scoped = scoped  # Whether entering the block pushed a symbol table, see Context.enter_block
 
     def can_define_function(self):
         return (self.block_type.value & BlockFlags.ALLOW_FUNCTIONS) != 0
@@ -0,0 +1,193 @@
+"""
+Bytecode format for the StreamLanguage virtual machine.
+
+Every instruction is four integers wide: an opcode followed by three operands. Operands are register numbers,
+indexes into the constant or name pools of the code object, or absolute jump targets (instruction indexes).
+An unused operand is stored as -1.
+"""
+from array import array
+
+
+# Loads and stores
+LOAD_CONST = 0        # a = dst, b = constant index
+LOAD_NAME = 1         # a = dst, b = name index, c = EntryCache constant
+STORE_NAME = 2        # a = src, b = name index
+DECLARE_NAME = 3      # a = src (-1 when there is no initial value), b = name index, c = type hint constant (-1)
+MOVE = 4              # a = dst, b = src; also reads and writes locals, which live in the first registers
+LOAD_GLOBAL = 5       # a = dst, b = name index, c = EntryCache constant
+STORE_GLOBAL = 6      # a = src, b = name index
+LOAD_DEREF = 7        # a = dst, b = depth, c = slot of an enclosing function's frame
+STORE_DEREF = 8       # a = src, b = depth, c = slot of an enclosing function's frame
+DECLARE_LOCAL = 9     # a = src (-1 when there is no initial value), b = slot, c = (name, type hint) constant
+
+# Binary operators: a = dst, b = left, c = right
+ADD = 10
+SUB = 11
+MUL = 12
+DIV = 13
+MOD = 14
+LT = 15
+GT = 16
+EQ = 17
+NE = 18
+LE = 19
+GE = 20
+CHAIN = 23
+SPLIT = 24
+MERGE = 25
+FEEDBACK = 26
+
+# Unary operators: a = dst, b = operand
+POS = 30
+NEG = 31
+NOT = 32
+
+# Control flow
+JUMP = 40             # a = target
+JUMP_IF_FALSE = 41    # a = condition, b = target
+JUMP_IF_TRUE = 42     # a = condition, b = target
+ENTER_BLOCK = 43      # a = BlockType constant, b = block uuid constant, c = 1 when the block gets a symbol table
+EXIT_BLOCK = 44
+CLEAR_LOCALS = 45     # a = first slot, b = end slot; unbinds the locals declared in the block being entered
+
+# Functions
+CALL = 50             # a = dst, b = first argument register, c = call site constant
+#                       (name, argument count, address, InlineCache, EntryCache)
+RETURN = 51           # a = value (-1 returns None)
+DECLARE_FUNCTION = 52  # a = function constant, b = slot of a nested function (-1 to declare it by name)
+TAIL_CALL = 53        # CALL operands; restarts the current frame when the call reaches the running function
+
+# Exceptions
+SETUP_TRY = 60        # a = handler target
+POP_TRY = 61
+LOAD_EXCEPTION = 62   # a = dst
+MATCH_EXCEPTION = 63  # a = dst, b = exception register, c = exception type constant
+RAISE = 64            # a = exception register
+
+# Everything else
+MAKE_ARRAY = 70       # a = dst, b = first element register, c = element count
+EVALUATE_NODE = 71    # a = dst, b = node constant; nodes without bytecode are evaluated by the tree walker
+ERROR = 72            # a = error constant
+
+BINARY_OPCODES = {
+    '+': ADD, '-': SUB, '*': MUL, '/': DIV, '%': MOD,
+    '<': LT, '>': GT, '==': EQ, '!=': NE, '<=': LE, '>=': GE,
+    '>>': CHAIN, '|': SPLIT, '++': MERGE, '<<': FEEDBACK,
+}
+
+UNARY_OPCODES = {'+': POS, '-': NEG, '!': NOT}
+
+# Short-circuit operators: the jump taken over the right operand, the left operand's value is then the result
+SHORT_CIRCUIT_JUMPS = {'&&': JUMP_IF_FALSE, '||': JUMP_IF_TRUE}
+
+OPCODE_NAMES = {value: name for name, value in globals().items() if name.isupper() and isinstance(value, int)}
+
+INSTRUCTION_WIDTH = 4
+
+
+class CodeObject:
+    """
+    A compiled unit of bytecode: the body of a program or of a single function.
+
+    Attributes:
+        name (str): Name of the function, or '<program>'.
+        code (array): Flat instruction stream, INSTRUCTION_WIDTH integers per instruction.
+        constants (list): Constant pool (values, types, call sites, functions, errors).
+        names (list): Name pool used by the *_NAME instructions.
+        register_count (int): Number of registers a frame executing this code needs.
+        nodes (list): The AST node each instruction was compiled from, used for error messages and profiling.
+        guards (list): For each instruction, the (node, exception types) pairs whose handle_error wraps the errors it
+            raises, innermost last: the nodes the tree walker evaluates it inside of that catch and report errors.
+        frame_size (int): Number of leading registers holding the locals resolved by sl_ast.resolver, or None when
+            the code keeps its variables in symbol tables.
+    """
+
+    def __init__(self, name, code, constants, names, register_count, nodes, frame_size=None, guards=None):
+        self.name = name
+        self.code = code
+        self.constants = constants
+        self.names = names
+        self.register_count = register_count
+        self.nodes = nodes
+        self.guards = guards if guards is not None else [()] * len(nodes)
+        self.frame_size = frame_size
+        self._instructions = None
+
+    def __len__(self):
+        return len(self.code) // INSTRUCTION_WIDTH
+
+    def instructions(self):
+        """
+        The instruction stream decoded into (opcode, a, b, c) tuples. Decoded once and cached for the dispatch loop.
+        """
+        if self._instructions is None:
+            code = self.code
+            self._instructions = [tuple(code[i:i + INSTRUCTION_WIDTH])
+                                  for i in range(0, len(code), INSTRUCTION_WIDTH)]
+        return self._instructions
+
+    def disassemble(self):
+        lines = [f"Code object '{self.name}' ({len(self)} instructions, {self.register_count} registers)"]
+        for index, (opcode, a, b, c) in enumerate(self.instructions()):
+            operands = ", ".join(str(operand) for operand in (a, b, c) if operand != -1)
+            lines.append(f"{index:5} {OPCODE_NAMES[opcode]:<17} {operands}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"CodeObject(name={self.name}, instructions={len(self)}, registers={self.register_count})"
+
+
+class CodeBuilder:
+    """
+    Accumulates instructions and pools while a single code object is being compiled.
+    """
+
+    def __init__(self, name, frame_size=None):
+        self.name = name
+        self.frame_size = frame_size
+        self.code = array('i')
+        self.constants = []
+        self.names = []
+        self.nodes = []
+        self.guards = []
+        self.active_guards = ()  # Guards of the instructions emitted next, see BytecodeCompiler.guarded
+        self.register_count = frame_size or 0
+        self._name_indexes = {}
+        self._constant_indexes = {}
+
+    def emit(self, opcode, a=-1, b=-1, c=-1, node=None):
+        self.code.extend((opcode, a, b, c))
+        self.nodes.append(node)
+        self.guards.append(self.active_guards)
+        return len(self.nodes) - 1
+
+    def patch(self, index, operand, value):
+        """
+        Set operand (1, 2 or 3) of an already emitted instruction, used to fill in forward jump targets.
+        """
+        self.code[index * INSTRUCTION_WIDTH + operand] = value
+
+    def position(self):
+        return len(self.nodes)
+
+    def constant(self, value):
+        # Constants are keyed by identity, SL values do not have Python compatible equality or hashing
+        key = id(value)
+        if key not in self._constant_indexes:
+            self._constant_indexes[key] = len(self.constants)
+            self.constants.append(value)
+        return self._constant_indexes[key]
+
+    def name_index(self, identifier):
+        if identifier not in self._name_indexes:
+            self._name_indexes[identifier] = len(self.names)
+            self.names.append(identifier)
+        return self._name_indexes[identifier]
+
+    def use_register(self, register):
+        if register + 1 > self.register_count:
+            self.register_count = register + 1
+
+    def build(self):
+        return CodeObject(self.name, self.code, self.constants, self.names, self.register_count, self.nodes,
+                          self.frame_size, self.guards)
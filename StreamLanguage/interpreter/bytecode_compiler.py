@@ -0,0 +1,475 @@
+"""
+Compiler from the sl_ast.nodes tree to StreamLanguage bytecode.
+
+Expressions are compiled into a destination register; temporaries are allocated stack-wise above it and released
+once the expression is complete. In functions resolved by sl_ast.resolver the locals are the first registers of the
+frame and are used as operands directly. Leaving a block early (break, continue, return) is compiled into explicit
+EXIT_BLOCK and POP_TRY instructions, and finally blocks are emitted inline on every path that leaves their try.
+
+Errors are reported through the same handle_error calls as in the tree walker: every instruction records the nodes
+whose evaluation would catch and wrap its errors there (see guarded), and the virtual machine applies them frame by
+frame.
+"""
+from contextlib import contextmanager
+
+from StreamLanguage.exceptions import SLException
+from StreamLanguage.interpreter import bytecode as op
+from StreamLanguage.interpreter.bytecode import CodeBuilder
+from StreamLanguage.interpreter.function_metadata import InlineCache
+from StreamLanguage.interpreter.symbol_table import EntryCache
+from StreamLanguage.interpreter.vm import VMFunction, BytecodeProgram
+from StreamLanguage.sl_ast.block_types import BlockType
+from StreamLanguage.sl_ast.exceptions import ParserError, SLValueError, VariableNotDeclaredError
+from StreamLanguage.sl_ast.nodes.error_handling import TryCatchNode, ThrowNode
+from StreamLanguage.sl_ast.nodes.expressions import AssignmentNode, IdentifierNode, BinaryOperationNode, \
+    UnaryOperationNode
+from StreamLanguage.sl_ast.nodes.flow_control import IfNode, WhileNode, ForNode, BreakNode, ContinueNode
+from StreamLanguage.sl_ast.nodes.functions import FunctionNode, FunctionCallNode, ReturnNode
+from StreamLanguage.sl_ast.nodes.node_types import PrimitiveDataNode, ArrayNode
+from StreamLanguage.sl_ast.nodes.structure import ProgramNode, VariableDeclarationNode
+from StreamLanguage.sl_ast.resolver import Resolver, GLOBAL
+from StreamLanguage.sl_ast.scopes import ScopeElider
+from StreamLanguage.sl_ast.tail_calls import TailCallMarker
+
+
+# Entries of the compiler's scope stack, used to unwind break, continue and return
+_BLOCK = 'block'
+_TRY = 'try'
+_LOOP = 'loop'
+
+
+class _Loop:
+    def __init__(self, continue_target=None):
+        self.continue_target = continue_target  # None until the target is known (for loops)
+        self.break_jumps = []
+        self.continue_jumps = []
+
+
+class BytecodeCompiler:
+    """
+    Compiles a ProgramNode, and every function declared in it, into code objects.
+    """
+
+    def __init__(self, name='<program>', in_function=False, frame_size=None):
+        self.builder = CodeBuilder(name, frame_size)
+        self.in_function = in_function
+        self.scopes = []  # (kind, payload) entries, innermost last
+        self.next_register = frame_size or 0  # Temporaries start after the locals
+
+    def compile_program(self, program: ProgramNode) -> BytecodeProgram:
+        Resolver().resolve_program(program)
+        TailCallMarker().mark_program(program)
+        ScopeElider().mark_program(program)
+        return BytecodeProgram(program, self.compile_body(program.nodes))
+
+    def compile_body(self, nodes):
+        for node in nodes:
+            self.compile_statement(node)
+        self.builder.emit(op.RETURN)
+        return self.builder.build()
+
+    # Registers
+
+    def allocate(self, count=1):
+        first = self.next_register
+        self.next_register += count
+        self.builder.use_register(self.next_register - 1)
+        return first
+
+    def emit(self, opcode, a=-1, b=-1, c=-1, node=None):
+        return self.builder.emit(opcode, a, b, c, node)
+
+    def emit_error(self, error_type, message, node):
+        self.emit(op.ERROR, self.builder.constant((error_type, message)), node=node)
+
+    @contextmanager
+    def guarded(self, node, errors=SLException):
+        """
+        Report the errors of the given types raised by the instructions emitted inside through node.handle_error, as
+        the tree walker does for the errors raised while it evaluates node.
+        """
+        builder = self.builder
+        outer = builder.active_guards
+        builder.active_guards = outer + ((node, errors),)
+        try:
+            yield
+        finally:
+            builder.active_guards = outer
+
+    # Statements
+
+    def compile_block(self, nodes):
+        for node in nodes:
+            self.compile_statement(node)
+
+    def compile_statement(self, node):
+        mark = self.next_register
+        method = getattr(self, f"_statement_{type(node).__name__}", None)
+        if method is not None:
+            method(node)
+        else:
+            # Expression statements discard their value
+            self.compile_expression(node, self.allocate())
+        self.next_register = mark
+
+    def enter_block(self, block_type, block_uuid, slots, node, scoped=True):
+        self.emit(op.ENTER_BLOCK, self.builder.constant(block_type), self.builder.constant(block_uuid), int(scoped),
+                  node=node)
+        if slots is not None:
+            self.emit(op.CLEAR_LOCALS, slots[0], slots[1], node=node)
+
+    def compile_scoped_block(self, block_type, block_uuid, nodes, node, slots=None, scoped=True):
+        self.enter_block(block_type, block_uuid, slots, node, scoped)
+        self.scopes.append((_BLOCK, None))
+        self.compile_block(nodes)
+        self.scopes.pop()
+        self.emit(op.EXIT_BLOCK, node=node)
+
+    def unwind(self, depth, node):
+        """
+        Emit the instructions that leave every scope above the given scope stack depth, innermost first.
+        """
+        for index in range(len(self.scopes) - 1, depth - 1, -1):
+            kind, payload = self.scopes[index]
+            if kind == _BLOCK:
+                self.emit(op.EXIT_BLOCK, node=node)
+            elif kind == _TRY:
+                self.emit(op.POP_TRY, node=node)
+                if payload:
+                    # The finally block runs with only the scopes and guards outside of its try active
+                    try_node, guards = payload
+                    scopes, active_guards = self.scopes, self.builder.active_guards
+                    self.scopes, self.builder.active_guards = scopes[:index], guards
+                    self.compile_finally(try_node.finally_block, try_node.finally_slots, try_node.finally_scoped)
+                    self.scopes, self.builder.active_guards = scopes, active_guards
+
+    def innermost_loop(self):
+        for index in range(len(self.scopes) - 1, -1, -1):
+            kind, payload = self.scopes[index]
+            if kind == _LOOP:
+                return index, payload
+        return None, None
+
+    def _statement_VariableDeclarationNode(self, node: VariableDeclarationNode):
+        with self.guarded(node):
+            self._compile_declaration(node)
+
+    def _compile_declaration(self, node: VariableDeclarationNode):
+        address = node.identifier.address
+        if address is not None:
+            declaration = self.builder.constant((node.identifier.name, node.type_hint))
+            register = -1
+            if node.value:
+                register = self.allocate()
+                self.compile_expression(node.value, register)
+            self.emit(op.DECLARE_LOCAL, register, address[1], declaration, node=node)
+            return
+
+        type_hint = self.builder.constant(node.type_hint) if node.type_hint else -1
+        name = self.builder.name_index(node.identifier.name)
+        if node.value:
+            register = self.allocate()
+            self.compile_expression(node.value, register)
+            self.emit(op.DECLARE_NAME, register, name, type_hint, node=node)
+        else:
+            self.emit(op.DECLARE_NAME, -1, name, type_hint, node=node)
+
+    def _statement_FunctionNode(self, node: FunctionNode):
+        code = BytecodeCompiler(node.name, in_function=True, frame_size=node.frame_size).compile_body(node.body)
+        function = VMFunction(node.name, node.parameters, node.body, code, node.return_type, node.nonlocals,
+                              node.pure)
+        slot = node.address if node.address is not None else -1
+        self.emit(op.DECLARE_FUNCTION, self.builder.constant(function), slot, node=node)
+
+    def _statement_ReturnNode(self, node: ReturnNode):
+        if not self.in_function:
+            self.emit_error(ParserError, "Return statement outside function", node)
+            return
+        with self.guarded(node):
+            self._compile_return(node)
+
+    def _compile_return(self, node: ReturnNode):
+        if node.tail_call:
+            call = node.value
+            register = self.allocate()
+            first = self.allocate(len(call.arguments))
+            for index, argument in enumerate(call.arguments):
+                self.compile_expression(argument, first + index)
+            self.unwind(0, node)
+            call_site = self.builder.constant((call.function.name, len(call.arguments), call.function.address,
+                                               InlineCache(), EntryCache()))
+            # Falls through to the RETURN when the call reaches another function
+            self.emit(op.TAIL_CALL, register, first, call_site, node=call)
+            self.emit(op.RETURN, register, node=node)
+            return
+        register = -1
+        if node.value is not None:
+            register = self.allocate()
+            self.compile_expression(node.value, register)
+        self.unwind(0, node)
+        self.emit(op.RETURN, register, node=node)
+
+    def _statement_BreakNode(self, node: BreakNode):
+        depth, loop = self.innermost_loop()
+        if loop is None:
+            self.emit_error(ParserError, "Break statement outside loop", node)
+            return
+        self.unwind(depth + 1, node)
+        loop.break_jumps.append(self.emit(op.JUMP, node=node))
+
+    def _statement_ContinueNode(self, node: ContinueNode):
+        depth, loop = self.innermost_loop()
+        if loop is None:
+            self.emit_error(ParserError, "Continue statement outside loop", node)
+            return
+        self.unwind(depth + 1, node)
+        if loop.continue_target is not None:
+            self.emit(op.JUMP, loop.continue_target, node=node)
+        else:
+            loop.continue_jumps.append(self.emit(op.JUMP, node=node))
+
+    def _statement_IfNode(self, node: IfNode):
+        with self.guarded(node):
+            self._compile_if(node)
+
+    def _compile_if(self, node: IfNode):
+        condition = self.compile_operand(node.condition)
+        jump_to_else = self.emit(op.JUMP_IF_FALSE, condition, node=node)
+        self.compile_scoped_block(BlockType.IF, node.then_block_uuid, node.then_block, node, node.then_slots,
+                                  node.then_scoped)
+        if node.else_block:
+            jump_to_end = self.emit(op.JUMP, node=node)
+            self.builder.patch(jump_to_else, 2, self.builder.position())
+            self.compile_scoped_block(BlockType.IF, node.else_block_uuid, node.else_block, node, node.else_slots,
+                                      node.else_scoped)
+            self.builder.patch(jump_to_end, 1, self.builder.position())
+        else:
+            self.builder.patch(jump_to_else, 2, self.builder.position())
+
+    def _compile_loop(self, node, condition_node, body, initializer=None, increment=None):
+        self.enter_block(BlockType.LOOP, node.body_uuid, node.body_slots, node, node.body_scoped)
+        self.scopes.append((_BLOCK, None))
+        if initializer is not None:
+            self.compile_statement(initializer)
+
+        start = self.builder.position()
+        mark = self.next_register
+        condition = self.compile_operand(condition_node)
+        jump_to_end = self.emit(op.JUMP_IF_FALSE, condition, node=node)
+        self.next_register = mark
+
+        loop = _Loop(continue_target=start if increment is None else None)
+        self.scopes.append((_LOOP, loop))
+        self.compile_block(body)
+        self.scopes.pop()
+
+        if increment is not None:
+            for jump in loop.continue_jumps:
+                self.builder.patch(jump, 1, self.builder.position())
+            self.compile_statement(increment)
+        self.emit(op.JUMP, start, node=node)
+
+        end = self.builder.position()
+        self.builder.patch(jump_to_end, 2, end)
+        for jump in loop.break_jumps:
+            self.builder.patch(jump, 1, end)
+        self.scopes.pop()
+        self.emit(op.EXIT_BLOCK, node=node)
+
+    def _statement_WhileNode(self, node: WhileNode):
+        with self.guarded(node):
+            self._compile_loop(node, node.condition, node.body)
+
+    def _statement_ForNode(self, node: ForNode):
+        with self.guarded(node):
+            self._compile_loop(node, node.condition, node.body, initializer=node.initializer,
+                               increment=node.increment)
+
+    def compile_finally(self, nodes, slots, scoped=True):
+        self.compile_scoped_block(BlockType.FINALLY, None, nodes, None, slots, scoped)
+
+    def _statement_TryCatchNode(self, node: TryCatchNode):
+        builder = self.builder
+        finally_block = node.finally_block
+        end_jumps = []
+
+        # Try block
+        finally_scope = (_TRY, (node, builder.active_guards) if finally_block else None)
+        setup = self.emit(op.SETUP_TRY, node=node)
+        self.scopes.append(finally_scope)
+        with self.guarded(node):
+            self.compile_scoped_block(BlockType.TRY, node.block_uuid, node.try_block, node, node.try_slots,
+                                      node.try_scoped)
+        self.scopes.pop()
+        self.emit(op.POP_TRY, node=node)
+        if finally_block:
+            self.compile_finally(finally_block, node.finally_slots, node.finally_scoped)
+        end_jumps.append(self.emit(op.JUMP, node=node))
+
+        # Catch clauses, tried in order against the raised exception
+        builder.patch(setup, 1, builder.position())
+        exception = self.allocate()
+        self.emit(op.LOAD_EXCEPTION, exception, node=node)
+        catch_setups = []
+        for (exception_var, exception_type, handler_block), address, slots, scoped in zip(
+                node.catch_clauses, node.catch_addresses, node.catch_slots, node.catch_scoped):
+            matches = self.allocate()
+            self.emit(op.MATCH_EXCEPTION, matches, exception, builder.constant(exception_type), node=node)
+            jump_to_next = self.emit(op.JUMP_IF_FALSE, matches, node=node)
+            self.next_register = matches
+
+            if finally_block:
+                catch_setups.append(self.emit(op.SETUP_TRY, node=node))
+                self.scopes.append(finally_scope)
+            self.enter_block(BlockType.CATCH, node.block_uuid, slots, node, scoped)
+            self.scopes.append((_BLOCK, None))
+            if address is not None:
+                self.emit(op.MOVE, address[1], exception, node=node)
+            elif exception_var:
+                self.emit(op.DECLARE_NAME, exception, builder.name_index(exception_var), -1, node=node)
+            self.compile_block(handler_block)
+            self.scopes.pop()
+            self.emit(op.EXIT_BLOCK, node=node)
+            if finally_block:
+                self.scopes.pop()
+                self.emit(op.POP_TRY, node=node)
+                self.compile_finally(finally_block, node.finally_slots, node.finally_scoped)
+            end_jumps.append(self.emit(op.JUMP, node=node))
+            builder.patch(jump_to_next, 2, builder.position())
+
+        # No clause matched: run the finally block and propagate
+        if finally_block:
+            self.compile_finally(finally_block, node.finally_slots, node.finally_scoped)
+        self.emit(op.RAISE, exception, node=node)
+
+        # An exception raised inside a catch handler still runs the finally block
+        if catch_setups:
+            for setup in catch_setups:
+                builder.patch(setup, 1, builder.position())
+            self.emit(op.LOAD_EXCEPTION, exception, node=node)
+            self.compile_finally(finally_block, node.finally_slots, node.finally_scoped)
+            self.emit(op.RAISE, exception, node=node)
+
+        for jump in end_jumps:
+            builder.patch(jump, 1, builder.position())
+
+    def _statement_ThrowNode(self, node: ThrowNode):
+        register = self.allocate()
+        self.compile_expression(node.exception_expression, register)
+        self.emit(op.RAISE, register, node=node)
+
+    # Expressions
+
+    def compile_expression(self, node, destination):
+        """
+        Emit the instructions that leave the value of node in the destination register.
+        """
+        mark = self.next_register
+        method = getattr(self, f"_expression_{type(node).__name__}", None)
+        if method is not None:
+            method(node, destination)
+        elif isinstance(node, PrimitiveDataNode):
+            self._expression_PrimitiveDataNode(node, destination)
+        else:
+            # Nodes without bytecode are still evaluated by the tree walker
+            self.emit(op.EVALUATE_NODE, destination, self.builder.constant(node), node=node)
+        self.next_register = mark
+
+    def compile_operand(self, node, destination=None):
+        """
+        Give the register holding the value of node: the register of a local of the current frame is used as is,
+        any other expression is compiled into destination (a new register when not given).
+        """
+        if isinstance(node, IdentifierNode) and node.address is not None and node.address is not GLOBAL \
+                and node.address[0] == 0:
+            return node.address[1]
+        if destination is None:
+            destination = self.allocate()
+        self.compile_expression(node, destination)
+        return destination
+
+    def _expression_PrimitiveDataNode(self, node: PrimitiveDataNode, destination):
+        self.emit(op.LOAD_CONST, destination, self.builder.constant(node.value), node=node)
+
+    def _expression_IdentifierNode(self, node: IdentifierNode, destination):
+        address = node.address
+        if address is None:
+            with self.guarded(node, VariableNotDeclaredError):
+                self.emit(op.LOAD_NAME, destination, self.builder.name_index(node.name),
+                          self.builder.constant(EntryCache()), node=node)
+        elif address is GLOBAL:
+            with self.guarded(node, VariableNotDeclaredError):
+                self.emit(op.LOAD_GLOBAL, destination, self.builder.name_index(node.name),
+                          self.builder.constant(EntryCache()), node=node)
+        elif address[0] == 0:
+            self.emit(op.MOVE, destination, address[1], node=node)
+        else:
+            self.emit(op.LOAD_DEREF, destination, address[0], address[1], node=node)
+
+    def _expression_AssignmentNode(self, node: AssignmentNode, destination):
+        self.compile_expression(node.value, destination)
+        address = node.target.address
+        if address is None:
+            self.emit(op.STORE_NAME, destination, self.builder.name_index(node.target.name), node=node)
+        elif address is GLOBAL:
+            self.emit(op.STORE_GLOBAL, destination, self.builder.name_index(node.target.name), node=node)
+        elif address[0] == 0:
+            self.emit(op.MOVE, address[1], destination, node=node)
+        else:
+            self.emit(op.STORE_DEREF, destination, address[0], address[1], node=node)
+
+    def _expression_BinaryOperationNode(self, node: BinaryOperationNode, destination):
+        jump_opcode = op.SHORT_CIRCUIT_JUMPS.get(node.operator)
+        if jump_opcode is not None:
+            self.compile_expression(node.left, destination)
+            jump = self.emit(jump_opcode, destination, node=node)
+            with self.guarded(node):
+                self.compile_expression(node.right, destination)
+            self.builder.patch(jump, 2, self.builder.position())
+            return
+        opcode = op.BINARY_OPCODES.get(node.operator)
+        if opcode is None:
+            with self.guarded(node):
+                self.emit_error(SLValueError, f"Unsupported operator: {node.operator}", node)
+            return
+        # A local can be read in place unless evaluating the right operand could still assign it
+        if isinstance(node.right, (IdentifierNode, PrimitiveDataNode)):
+            left = self.compile_operand(node.left, destination)
+        else:
+            left = destination
+            self.compile_expression(node.left, destination)
+        right = self.compile_operand(node.right)
+        with self.guarded(node):
+            self.emit(opcode, destination, left, right, node=node)
+
+    def _expression_UnaryOperationNode(self, node: UnaryOperationNode, destination):
+        opcode = op.UNARY_OPCODES.get(node.operator)
+        if opcode is None:
+            with self.guarded(node):
+                self.emit_error(SLValueError, f"Unsupported unary operator: {node.operator}", node)
+            return
+        operand = self.compile_operand(node.operand, destination)
+        with self.guarded(node):
+            self.emit(opcode, destination, operand, node=node)
+
+    def _expression_FunctionCallNode(self, node: FunctionCallNode, destination):
+        with self.guarded(node):
+            self._compile_call(node, destination)
+
+    def _compile_call(self, node: FunctionCallNode, destination):
+        first = self.allocate(len(node.arguments))
+        for index, argument in enumerate(node.arguments):
+            self.compile_expression(argument, first + index)
+        call_site = self.builder.constant((node.function.name, len(node.arguments), node.function.address,
+                                           InlineCache(), EntryCache()))
+        self.emit(op.CALL, destination, first, call_site, node=node)
+
+    def _expression_ArrayNode(self, node: ArrayNode, destination):
+        with self.guarded(node):
+            self._compile_array(node, destination)
+
+    def _compile_array(self, node: ArrayNode, destination):
+        first = self.allocate(len(node.elements))
+        for index, element in enumerate(node.elements):
+            self.compile_expression(element, first + index)
+        self.emit(op.MAKE_ARRAY, destination, first, len(node.elements), node=node)
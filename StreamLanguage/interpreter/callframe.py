@@ -1,8 +1,56 @@
 class CallFrame:
-    def __init__(self, function_name, arguments, symbol_table):
+    __slots__ = ('function_name', 'arguments', 'symbol_table', 'caller')
+
+    def __init__(self, function_name, arguments, symbol_table, caller=None):
         self.function_name = function_name
         self.arguments = arguments
         self.symbol_table = symbol_table
+        self.caller = caller  # CallFrame of the calling function, None for calls made at program level
 
     def __repr__(self):
         return f"CallFrame(function_name={self.function_name}, arguments={self.arguments})"
+
+
+class StackSnapshot:
+    """
+    The call stack at one point of execution. Holds only the innermost CallFrame, whose caller links are never
+    changed, so taking a snapshot costs the same at any depth. The text is only built by format().
+    """
+    __slots__ = ('frame',)
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    def frames(self):
+        """
+        The captured frames, innermost first.
+        """
+        frame = self.frame
+        while frame is not None:
+            yield frame
+            frame = frame.caller
+
+    def format(self):
+        return "".join(f"Function '{frame.function_name}' called with arguments {frame.arguments}\n"
+                       for frame in self.frames())
+
+    def __len__(self):
+        return sum(1 for _ in self.frames())
+
+    def __str__(self):
+        return self.format()
+
+    def __repr__(self):
+        return f"StackSnapshot(depth={len(self)})"
+
+
+def error_stack_trace(error):
+    """
+    The StackSnapshot attached to an error or to one of the errors it was raised while handling, None if there is none.
+    """
+    while error is not None:
+        stack_trace = getattr(error, 'stack_trace', None)
+        if stack_trace is not None:
+            return stack_trace
+        error = error.__cause__ or error.__context__
+    return None
@@ -0,0 +1,622 @@
+"""
+Closure compilation engine.
+
+The tree walking interpreter re-dispatches through ``ParserNode.evaluate`` for every node, rebuilds operator tables on
+every binary operation and polls the ControlFlowManager flags after every child. This module compiles a ProgramNode
+once into a tree of specialised Python closures. Each closure already knows which operator, name or block it works on,
+so running the compiled program only pays for the work the program actually does.
+
+Closures take the context and the Frame of the running function (None at program level). Variables resolved to a
+frame slot by sl_ast.resolver are read and written by index; the other names are still looked up by name.
+
+Statement closures return ``None`` when execution falls through to the next statement, or a signal (RETURN, BREAK,
+CONTINUE or a tail call, see sl_ast.tail_calls) that is propagated up to the enclosing loop or function. Expression
+closures return their value.
+User level exceptions (division by zero, throw) are raised as ``RaiseSignal`` so try/catch closures can handle them.
+"""
+from functools import partial
+
+from StreamLanguage.exceptions import SLException
+from StreamLanguage.interpreter.callframe import error_stack_trace
+from StreamLanguage.interpreter.frame import Frame, UNBOUND, check_declaration, declare_function_slot, \
+    lookup_slot_function
+from StreamLanguage.interpreter.function_metadata import FunctionMetadata, InlineCache
+from StreamLanguage.interpreter.operations import BINARY_OPERATORS, LAZY_OPERATORS, UNARY_OPERATORS, RaiseSignal
+from StreamLanguage.interpreter.symbol_table import EntryCache
+from StreamLanguage.sl_ast.block_types import BlockType
+from StreamLanguage.sl_ast.callables import CallableFunction
+from StreamLanguage.sl_ast.exceptions import ParserError, VariableNotDeclaredError, VariableRedeclaredError, \
+    SLTypeError, SLValueError
+from StreamLanguage.sl_ast.nodes.error_handling import TryCatchNode, ThrowNode
+from StreamLanguage.sl_ast.nodes.expressions import AssignmentNode, IdentifierNode, BinaryOperationNode, \
+    UnaryOperationNode
+from StreamLanguage.sl_ast.nodes.flow_control import IfNode, WhileNode, ForNode, BreakNode, ContinueNode
+from StreamLanguage.sl_ast.nodes.functions import FunctionNode, FunctionCallNode, ReturnNode
+from StreamLanguage.sl_ast.nodes.node_types import PrimitiveDataNode, ArrayNode
+from StreamLanguage.sl_ast.nodes.structure import ProgramNode, VariableDeclarationNode
+from StreamLanguage.sl_ast.resolver import Resolver, GLOBAL
+from StreamLanguage.sl_ast.scopes import ScopeElider
+from StreamLanguage.sl_ast.tail_calls import TailCallMarker
+from StreamLanguage.sl_types.data_instances.collections.array import SLArray
+
+
+class ReturnSignal:
+    """
+    Signal returned by a statement closure when a return statement was executed.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class TailCallSignal:
+    """
+    Signal returned by a statement closure when a return statement calls the enclosing function (sl_ast.tail_calls).
+    """
+    __slots__ = ('function', 'arguments')
+
+    def __init__(self, function, arguments):
+        self.function = function
+        self.arguments = arguments
+
+
+BREAK = object()  # Signal returned by a statement closure when a break statement was executed
+CONTINUE = object()  # Signal returned by a statement closure when a continue statement was executed
+
+
+class CompiledFunction(CallableFunction):
+    """
+    A user function whose body has been compiled into a closure.
+    Declared in the context exactly like the CallableFunction created by FunctionNode.evaluate.
+    Functions with a frame_size keep their locals in a Frame, the others in a symbol table like the tree walker.
+    """
+
+    def __init__(self, name, parameters, body, compiled_body, return_type=None, nonlocals=None, frame_size=None,
+                 pure=False):
+        super().__init__(name, parameters, body, return_type, nonlocals, pure)
+        self.compiled_body = compiled_body
+        self.frame_size = frame_size
+        self.parent_frame = None  # Frame the function was declared in, for nonlocal names
+
+    def bind(self, frame):
+        """
+        Copy of the function declared in the given frame.
+        """
+        function = CompiledFunction(self.name, self.parameters, self.body, self.compiled_body, self.return_type,
+                                    self.nonlocals, self.frame_size, self.pure)
+        function.parent_frame = frame
+        return function
+
+    def invoke(self, *args, context):
+        while True:
+            if self.frame_size is None:
+                frame = None
+                context.enter_function_call(self, args)
+            else:
+                frame = Frame(self.frame_size, self.parent_frame)
+                frame.slots[:len(args)] = args
+                context.enter_function_frame(self, args)
+            try:
+                signal = self.compiled_body(context, frame)
+                if type(signal) is TailCallSignal and signal.function.unwrap() is not self:
+                    signal = ReturnSignal(signal.function.invoke(*signal.arguments, context=context))
+            except SLException as e:
+                error = SLException(f"Error in function '{self.name}': {str(e)}")
+                error.stack_trace = error_stack_trace(e) or context.capture_stack()
+                raise error
+            finally:
+                if frame is None:
+                    context.exit_function_call()
+                else:
+                    context.exit_function_frame()
+            if type(signal) is not TailCallSignal:
+                break
+            args = signal.arguments  # Restart the call instead of nesting a new one
+
+        if signal is None:
+            return None  # Function completed without a return statement
+        if signal is BREAK or signal is CONTINUE:
+            raise SLException(f"Error in function '{self.name}': Invalid 'break' or 'continue' outside of a loop")
+        return signal.value
+
+
+class CompiledProgram:
+    """
+    The result of compiling a ProgramNode. Can be run any number of times against a context.
+    """
+
+    def __init__(self, program_node, compiled_body):
+        self.program_node = program_node
+        self.compiled_body = compiled_body
+
+    def run(self, context):
+        program = self.program_node
+        try:
+            with context.block_context(BlockType.PROGRAM, program.block_uuid):
+                signal = self.compiled_body(context, None)
+                if signal is not None:
+                    if isinstance(signal, ReturnSignal):
+                        raise ParserError("Return statement outside function")
+                    raise ParserError(f"{'Break' if signal is BREAK else 'Continue'} statement outside loop")
+        except RaiseSignal as e:
+            program.handle_error(SLException(f"Uncaught exception {e.exception}"), context)
+        except SLException as e:
+            program.handle_error(e, context)
+
+
+class ClosureCompiler:
+    """
+    Compiles AST nodes into closures taking the execution context and the current frame.
+    """
+
+    def compile_program(self, program: ProgramNode) -> CompiledProgram:
+        Resolver().resolve_program(program)
+        TailCallMarker().mark_program(program)
+        ScopeElider().mark_program(program)
+        return CompiledProgram(program, self.compile_block(program.nodes))
+
+    @staticmethod
+    def compile_slot_reset(slots):
+        """
+        Closure that unbinds the frame slots declared in a block, run when the block is entered. None if there are none.
+        """
+        if slots is None:
+            return None
+        first, end = slots
+        unbound = [UNBOUND] * (end - first)
+
+        def reset(frame):
+            frame.slots[first:end] = unbound
+
+        return reset
+
+    # Statements
+
+    def compile_block(self, nodes):
+        """
+        Compile a list of statements into a single statement closure.
+        """
+        statements = tuple(self.compile_statement(node) for node in nodes)
+
+        if not statements:
+            return lambda context, frame: None
+        if len(statements) == 1:
+            return statements[0]
+
+        def block(context, frame):
+            for statement in statements:
+                signal = statement(context, frame)
+                if signal is not None:
+                    return signal
+            return None
+
+        return block
+
+    def compile_statement(self, node):
+        method = getattr(self, f"_statement_{type(node).__name__}", None)
+        if method is not None:
+            return method(node)
+
+        # Expression statements discard their value
+        expression = self.compile_expression(node)
+
+        def expression_statement(context, frame):
+            expression(context, frame)
+
+        return expression_statement
+
+    def _statement_VariableDeclarationNode(self, node: VariableDeclarationNode):
+        name = node.identifier.name
+        address = node.identifier.address
+        type_hint = node.type_hint
+        value = self.compile_expression(node.value) if node.value else None
+
+        if address is not None:
+            slot = address[1]
+
+            def declare_local(context, frame):
+                try:
+                    slots = frame.slots
+                    check_declaration(context, slots, slot, name)
+                    if value is None:
+                        slots[slot] = None
+                        return None
+                    result = value(context, frame)
+                    value_type = result.type_descriptor
+                    if type_hint and value_type != type_hint:
+                        raise SLTypeError(f"Type mismatch: Variable '{name}' expected type {type_hint}, but got {value_type}")
+                    slots[slot] = result
+                except SLException as e:
+                    node.handle_error(e, context)
+
+            return declare_local
+
+        def declare(context, frame):
+            try:
+                if context.current_symbol_table.is_declared(name):
+                    raise VariableRedeclaredError(f"Variable '{name}' already declared in the current scope")
+                if value is None:
+                    context.declare_variable(name, t=type_hint, v=None)
+                    return None
+                result = value(context, frame)
+                value_type = result.type_descriptor
+                if type_hint and value_type != type_hint:
+                    raise SLTypeError(f"Type mismatch: Variable '{name}' expected type {type_hint}, but got {value_type}")
+                context.declare_variable(name, t=value_type, v=result)
+            except SLException as e:
+                node.handle_error(e, context)
+
+        return declare
+
+    def _statement_FunctionNode(self, node: FunctionNode):
+        function = CompiledFunction(node.name, node.parameters, node.body, self.compile_block(node.body),
+                                    node.return_type, node.nonlocals, node.frame_size, node.pure)
+
+        if node.address is not None:
+            slot = node.address
+
+            def declare_local(context, frame):
+                if not context.can_define_function():
+                    raise Exception("Cannot define functions in the current context")
+                metadata = FunctionMetadata(node.name, node.parameters, function.bind(frame), node.return_type)
+                declare_function_slot(frame.slots, slot, metadata)
+
+            return declare_local
+
+        def declare(context, frame):
+            context.declare_function(node.name, function, node.parameters, node.return_type)
+
+        return declare
+
+    def _statement_ReturnNode(self, node: ReturnNode):
+        if node.value is None:
+            return lambda context, frame: ReturnSignal(None)
+
+        if node.tail_call:
+            call = node.value
+            lookup = self.compile_function_lookup(call)
+            arguments = tuple(self.compile_expression(argument) for argument in call.arguments)
+
+            def tail_call(context, frame):
+                try:
+                    evaluated_arguments = [argument(context, frame) for argument in arguments]
+                    overload = lookup(context, frame, evaluated_arguments)
+                except SLException as e:
+                    call.handle_error(e, context)
+                return TailCallSignal(overload.implementation, evaluated_arguments)
+
+            return tail_call
+
+        value = self.compile_expression(node.value)
+
+        def return_statement(context, frame):
+            return ReturnSignal(value(context, frame))
+
+        return return_statement
+
+    def _statement_BreakNode(self, node: BreakNode):
+        return lambda context, frame: BREAK
+
+    def _statement_ContinueNode(self, node: ContinueNode):
+        return lambda context, frame: CONTINUE
+
+    def _statement_IfNode(self, node: IfNode):
+        condition = self.compile_expression(node.condition)
+        then_block = self.compile_block(node.then_block)
+        then_reset = self.compile_slot_reset(node.then_slots)
+        else_block = self.compile_block(node.else_block) if node.else_block else None
+        else_reset = self.compile_slot_reset(node.else_slots)
+        then_scoped, else_scoped = node.then_scoped, node.else_scoped
+
+        def if_statement(context, frame):
+            try:
+                if condition(context, frame):
+                    context.enter_block(BlockType.IF, node.then_block_uuid, then_scoped)
+                    try:
+                        if then_reset is not None:
+                            then_reset(frame)
+                        return then_block(context, frame)
+                    finally:
+                        context.exit_block()
+                elif else_block is not None:
+                    context.enter_block(BlockType.IF, node.else_block_uuid, else_scoped)
+                    try:
+                        if else_reset is not None:
+                            else_reset(frame)
+                        return else_block(context, frame)
+                    finally:
+                        context.exit_block()
+            except SLException as e:
+                node.handle_error(e, context)
+
+        return if_statement
+
+    def _statement_WhileNode(self, node: WhileNode):
+        condition = self.compile_expression(node.condition)
+        body = self.compile_block(node.body)
+        reset = self.compile_slot_reset(node.body_slots)
+        scoped = node.body_scoped
+
+        def while_statement(context, frame):
+            try:
+                context.enter_block(BlockType.LOOP, node.body_uuid, scoped)
+                try:
+                    if reset is not None:
+                        reset(frame)
+                    while condition(context, frame):
+                        signal = body(context, frame)
+                        if signal is not None and signal is not CONTINUE:
+                            if signal is BREAK:
+                                return None
+                            return signal
+                finally:
+                    context.exit_block()
+            except SLException as e:
+                node.handle_error(e, context)
+
+        return while_statement
+
+    def _statement_ForNode(self, node: ForNode):
+        initializer = self.compile_statement(node.initializer)
+        condition = self.compile_expression(node.condition)
+        increment = self.compile_expression(node.increment)
+        body = self.compile_block(node.body)
+        reset = self.compile_slot_reset(node.body_slots)
+        scoped = node.body_scoped
+
+        def for_statement(context, frame):
+            try:
+                context.enter_block(BlockType.LOOP, node.body_uuid, scoped)
+                try:
+                    if reset is not None:
+                        reset(frame)
+                    initializer(context, frame)
+                    while condition(context, frame):
+                        signal = body(context, frame)
+                        if signal is not None and signal is not CONTINUE:
+                            if signal is BREAK:
+                                return None
+                            return signal
+                        increment(context, frame)
+                finally:
+                    context.exit_block()
+            except SLException as e:
+                node.handle_error(e, context)
+
+        return for_statement
+
+    def _statement_TryCatchNode(self, node: TryCatchNode):
+        try_block = self.compile_block(node.try_block)
+        try_reset = self.compile_slot_reset(node.try_slots)
+        catch_clauses = tuple(
+            (exception_var, address, self.compile_block(handler_block), self.compile_slot_reset(slots), scoped)
+            for (exception_var, _, handler_block), address, slots, scoped
+            in zip(node.catch_clauses, node.catch_addresses, node.catch_slots, node.catch_scoped)
+        )
+        finally_block = self.compile_block(node.finally_block) if node.finally_block else None
+        finally_reset = self.compile_slot_reset(node.finally_slots)
+        try_scoped, finally_scoped = node.try_scoped, node.finally_scoped
+
+        def run_catch(context, frame, exception):
+            index = node.handler_index(exception.type_descriptor)
+            if index is None:
+                raise RaiseSignal(exception)  # Not handled, propagate upwards
+            exception_var, address, handler, reset, scoped = catch_clauses[index]
+            context.enter_block(BlockType.CATCH, node.block_uuid, scoped)
+            try:
+                if reset is not None:
+                    reset(frame)
+                # Bind the exception to a variable in the catch block
+                if address is not None:
+                    frame.slots[address[1]] = exception
+                elif exception_var:
+                    context.declare_variable(exception_var, t=exception.type_descriptor, v=exception)
+                return handler(context, frame)
+            finally:
+                context.exit_block()
+
+        def try_statement(context, frame):
+            try:
+                context.enter_block(BlockType.TRY, node.block_uuid, try_scoped)
+                try:
+                    if try_reset is not None:
+                        try_reset(frame)
+                    return try_block(context, frame)
+                finally:
+                    context.exit_block()
+            except RaiseSignal as e:
+                return run_catch(context, frame, e.exception)
+            except SLException as e:
+                node.handle_error(e, context)
+            finally:
+                if finally_block is not None:
+                    context.enter_block(BlockType.FINALLY, node.block_uuid, finally_scoped)
+                    try:
+                        if finally_reset is not None:
+                            finally_reset(frame)
+                        finally_block(context, frame)
+                    finally:
+                        context.exit_block()
+
+        return try_statement
+
+    def _statement_ThrowNode(self, node: ThrowNode):
+        expression = self.compile_expression(node.exception_expression)
+
+        def throw_statement(context, frame):
+            raise RaiseSignal(expression(context, frame))
+
+        return throw_statement
+
+    # Expressions
+
+    def compile_expression(self, node):
+        method = getattr(self, f"_expression_{type(node).__name__}", None)
+        if method is not None:
+            return method(node)
+        if isinstance(node, PrimitiveDataNode):
+            return self._expression_PrimitiveDataNode(node)
+
+        # Nodes without a specialised closure are still evaluated by the tree walker
+        evaluate = node.evaluate
+        return lambda context, frame: evaluate(context)
+
+    def _expression_PrimitiveDataNode(self, node: PrimitiveDataNode):
+        value = node.value
+        return lambda context, frame: value
+
+    def _expression_IdentifierNode(self, node: IdentifierNode):
+        name = node.name
+        address = node.address
+
+        if address is None:
+            cache = EntryCache()
+
+            def identifier(context, frame):
+                try:
+                    return context.current_symbol_table.lookup(name, cache).value
+                except VariableNotDeclaredError as e:
+                    node.handle_error(e, context)
+        elif address is GLOBAL:
+            cache = EntryCache()
+
+            def identifier(context, frame):
+                try:
+                    return context.global_symbol_table.lookup_global(name, cache).value
+                except VariableNotDeclaredError as e:
+                    node.handle_error(e, context)
+        elif address[0] == 0:
+            slot = address[1]
+
+            def identifier(context, frame):
+                return frame.slots[slot]
+        else:
+            depth, slot = address
+
+            def identifier(context, frame):
+                return frame.outer(depth).slots[slot]
+
+        return identifier
+
+    def _expression_AssignmentNode(self, node: AssignmentNode):
+        name = node.target.name
+        address = node.target.address
+        value = self.compile_expression(node.value)
+
+        if address is None:
+            def assignment(context, frame):
+                result = value(context, frame)
+                context.current_symbol_table.update(name, result)
+                return result
+        elif address is GLOBAL:
+            def assignment(context, frame):
+                result = value(context, frame)
+                context.global_symbol_table.update(name, result)
+                return result
+        elif address[0] == 0:
+            slot = address[1]
+
+            def assignment(context, frame):
+                result = frame.slots[slot] = value(context, frame)
+                return result
+        else:
+            depth, slot = address
+
+            def assignment(context, frame):
+                result = frame.outer(depth).slots[slot] = value(context, frame)
+                return result
+
+        return assignment
+
+    def _expression_BinaryOperationNode(self, node: BinaryOperationNode):
+        left = self.compile_expression(node.left)
+        right = self.compile_expression(node.right)
+        lazy_operation = LAZY_OPERATORS.get(node.operator)
+        if lazy_operation is not None:
+            def lazy_binary_operation(context, frame):
+                try:
+                    return lazy_operation(left(context, frame), partial(right, context, frame))
+                except SLException as e:
+                    node.handle_error(e, context)
+            return lazy_binary_operation
+
+        operation = BINARY_OPERATORS.get(node.operator)
+
+        if operation is None:
+            def unsupported(context, frame):
+                node.handle_error(SLValueError(f"Unsupported operator: {node.operator}"), context)
+            return unsupported
+
+        def binary_operation(context, frame):
+            try:
+                return operation(left(context, frame), right(context, frame))
+            except SLException as e:
+                node.handle_error(e, context)
+
+        return binary_operation
+
+    def _expression_UnaryOperationNode(self, node: UnaryOperationNode):
+        operand = self.compile_expression(node.operand)
+        operation = UNARY_OPERATORS.get(node.operator)
+
+        if operation is None:
+            def unsupported(context, frame):
+                node.handle_error(SLValueError(f"Unsupported unary operator: {node.operator}"), context)
+            return unsupported
+
+        def unary_operation(context, frame):
+            try:
+                return operation(operand(context, frame))
+            except SLException as e:
+                node.handle_error(e, context)
+
+        return unary_operation
+
+    @staticmethod
+    def compile_function_lookup(node: FunctionCallNode):
+        """
+        Closure finding the overload a call reaches for the given evaluated arguments.
+        """
+        name = node.function.name
+        address = node.function.address
+        cache = InlineCache()
+        if address is None:
+            entry_cache = EntryCache()
+
+            def lookup(context, frame, evaluated_arguments):
+                return context.current_symbol_table.lookup_function(name, evaluated_arguments, cache, entry_cache)
+        elif address is GLOBAL:
+            def lookup(context, frame, evaluated_arguments):
+                return context.global_symbol_table.lookup_function(name, evaluated_arguments, cache)
+        else:
+            depth, slot = address
+
+            def lookup(context, frame, evaluated_arguments):
+                return lookup_slot_function(frame.outer(depth).slots[slot], name, evaluated_arguments, cache)
+        return lookup
+
+    def _expression_FunctionCallNode(self, node: FunctionCallNode):
+        lookup = self.compile_function_lookup(node)
+        arguments = tuple(self.compile_expression(argument) for argument in node.arguments)
+
+        def function_call(context, frame):
+            try:
+                evaluated_arguments = [argument(context, frame) for argument in arguments]
+                overload = lookup(context, frame, evaluated_arguments)
+                return overload.implementation.invoke(*evaluated_arguments, context=context)
+            except SLException as e:
+                node.handle_error(e, context)
+
+        return function_call
+
+    def _expression_ArrayNode(self, node: ArrayNode):
+        elements = tuple(self.compile_expression(element) for element in node.elements)
+
+        def array(context, frame):
+            try:
+                return SLArray([element(context, frame) for element in elements])
+            except SLException as e:
+                node.handle_error(e, context)
+
+        return array
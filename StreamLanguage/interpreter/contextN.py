@@ -6,7 +6,7 @@ from StreamLanguage.sl_ast.exceptions import SLRecursionError, FunctionNotFoundE
 from StreamLanguage.sl_ast.nodes.base import ParserNode
 from StreamLanguage.exceptions import SLException
 from StreamLanguage.interpreter.block import Block
-from StreamLanguage.interpreter.callframe import CallFrame
+from StreamLanguage.interpreter.callframe import CallFrame, StackSnapshot
 from StreamLanguage.interpreter.flow_manager import ControlFlowManager
 from StreamLanguage.interpreter.function_metadata import FunctionMetadata
 from StreamLanguage.interpreter.symbol_table import SymbolTable
@@ -26,6 +26,8 @@ class Context:
         self.control_flow = ControlFlowManager()
         self.call_stack = []  # Stack to maintain function call trace
         self.loop_stack = []  # Stack to manage loop states
+        self.memoizer = None  # Optional Memoizer wrapping the pure functions declared in this context
+        self.capture_stack_traces = True  # Whether returns and errors capture a StackSnapshot, see capture_stack
 
     def is_global_scope(self):
         return not self.call_stack and (not self.blocks_stack or self.blocks_stack[-1].block_type.value & BlockFlags.GLOBAL_SCOPE) # No active blocks or function calls
@@ -39,19 +41,23 @@ class Context:
         else:
             raise Exception("Cannot exit the global scope")
 
-    def enter_block(self, block_type, block_uuid):
-        block = Block(block_type, block_uuid)
-        self.blocks_stack.append(block)
-        self.current_symbol_table = SymbolTable(parent=self.current_symbol_table)
+    def enter_block(self, block_type, block_uuid, scoped=True):
+        """
+        Enter a block. Blocks declaring no names (see sl_ast.scopes) pass scoped=False and only push their marker,
+        names are then looked up and assigned in the enclosing symbol table.
+        """
+        self.blocks_stack.append(Block(block_type, block_uuid, scoped))
+        if scoped:
+            self.current_symbol_table = SymbolTable(parent=self.current_symbol_table)
 
     def exit_block(self):
         if self.blocks_stack:
-            self.blocks_stack.pop()
-            self.current_symbol_table = self.current_symbol_table.parent
+            if self.blocks_stack.pop().scoped:
+                self.current_symbol_table = self.current_symbol_table.parent
 
     @contextmanager
-    def block_context(self, block_type, block_uuid):
-        self.enter_block(block_type, block_uuid)
+    def block_context(self, block_type, block_uuid, scoped=True):
+        self.enter_block(block_type, block_uuid, scoped)
         try:
             yield
         finally:
@@ -82,6 +88,9 @@ class Context:
         if not self.can_define_function():
             raise Exception("Cannot define functions in the current context")
 
+        if self.memoizer is not None and getattr(callable_object, 'pure', False):
+            callable_object = self.memoizer.wrap(callable_object)
+
         #Create a new FunctionMetadata object
         metadata = FunctionMetadata(identifier, parameters, callable_object, return_type)
         if self.is_global_scope():  # Declare the function in the global scope
@@ -90,11 +99,11 @@ class Context:
             self.current_symbol_table.declare_function(metadata)
 
 
-    def lookup(self, identifier):
-        return self.current_symbol_table.lookup(identifier).value
+    def lookup(self, identifier, cache=None):
+        return self.current_symbol_table.lookup(identifier, cache).value
 
-    def lookup_function(self, identifier, parameters):
-        return self.current_symbol_table.lookup_function(identifier, parameters)
+    def lookup_function(self, identifier, parameters, cache=None, entry_cache=None):
+        return self.current_symbol_table.lookup_function(identifier, parameters, cache, entry_cache)
 
     def assign(self, identifier, value):
         self.current_symbol_table.update(identifier, value)
@@ -109,18 +118,7 @@ class Context:
 
     def enter_function_call(self, function_callable: CallableFunction, arguments: list[SLInstanceType]):
         function_name = function_callable.name
-
-        # Check recursion limits
-        total_recursion_depth = len(self.call_stack)
-        if total_recursion_depth > self.MAX_RECURSION_DEPTH:
-            raise SLRecursionError(f"Exceeded maximum recursion depth in function '{function_name}'")
-
-        if function_name in self.recursion_depth:
-            self.recursion_depth[function_name] += 1
-            if self.recursion_depth[function_name] > self.MAX_FUNCTION_RECURSION_DEPTH:
-                raise SLRecursionError(f"Exceeded maximum recursion depth in function '{function_name}'")
-        else:
-            self.recursion_depth[function_name] = 1
+        self._enter_recursion(function_name)
 
         # Create a new symbol table for the function scope
         function_symbol_table = SymbolTable(parent=self.current_symbol_table, is_restricted=True)
@@ -131,32 +129,64 @@ class Context:
         # Assign arguments to the function parameters
         for param, arg, t in zip(function_callable.parameters, arguments, arg_types):
             self.current_symbol_table.declare(param.name, t=t, value=arg)
+        # Names the function reaches in the calling scopes
+        for name in getattr(function_callable, 'nonlocals', None) or ():
+            self.current_symbol_table.declare(name, t=None, is_nonlocal=True)
 
         # Push a detailed call frame onto the call stack
-        call_frame = CallFrame(function_name, arguments, self.current_symbol_table)
+        call_frame = CallFrame(function_name, arguments, self.current_symbol_table,
+                               self.call_stack[-1] if self.call_stack else None)
         self.call_stack.append(call_frame)
-        print(call_frame, self.recursion_depth[function_name])
 
     def exit_function_call(self):
         # Pop the call frame and restore the previous symbol table
         if self.call_stack:
             call_frame = self.call_stack.pop()
             self.current_symbol_table = self.current_symbol_table.parent
+            self._exit_recursion(call_frame.function_name)
 
-            # Decrement recursion depth for this function
-            function_name = call_frame.function_name
-            if self.recursion_depth[function_name] > 0:
-                self.recursion_depth[function_name] -= 1
-            if self.recursion_depth[function_name] == 0:
-                del self.recursion_depth[function_name]  # Cleanup recursion tracking
+    def enter_function_frame(self, function_callable: CallableFunction, arguments: list[SLInstanceType]):
+        """
+        Enter a call to a function whose locals live in a Frame (see sl_ast.resolver) instead of a symbol table.
+        Only the recursion limits and the call stack are maintained.
+        """
+        function_name = function_callable.name
+        self._enter_recursion(function_name)
+        self.call_stack.append(CallFrame(function_name, arguments, None,
+                                         self.call_stack[-1] if self.call_stack else None))
 
-    def execute_function(self, function_name: str, arguments: list[ParserNode]):
+    def exit_function_frame(self):
+        if self.call_stack:
+            call_frame = self.call_stack.pop()
+            self._exit_recursion(call_frame.function_name)
+
+    def _enter_recursion(self, function_name):
+        # Check recursion limits
+        total_recursion_depth = len(self.call_stack)
+        if total_recursion_depth > self.MAX_RECURSION_DEPTH:
+            raise SLRecursionError(f"Exceeded maximum recursion depth in function '{function_name}'")
+
+        if function_name in self.recursion_depth:
+            self.recursion_depth[function_name] += 1
+            if self.recursion_depth[function_name] > self.MAX_FUNCTION_RECURSION_DEPTH:
+                raise SLRecursionError(f"Exceeded maximum recursion depth in function '{function_name}'")
+        else:
+            self.recursion_depth[function_name] = 1
+
+    def _exit_recursion(self, function_name):
+        # Decrement recursion depth for this function
+        if self.recursion_depth[function_name] > 0:
+            self.recursion_depth[function_name] -= 1
+        if self.recursion_depth[function_name] == 0:
+            del self.recursion_depth[function_name]  # Cleanup recursion tracking
+
+    def execute_function(self, function_name: str, arguments: list[ParserNode], cache=None, entry_cache=None):
         try:
             # Evaluate arguments
             evaluated_arguments = [arg.evaluate(self) for arg in arguments]
 
             # Lookup the function
-            func_callable = self.lookup_function(function_name, evaluated_arguments)
+            func_callable = self.lookup_function(function_name, evaluated_arguments, cache, entry_cache)
             if func_callable is None:
                 raise FunctionNotFoundError(f"Function '{function_name}' not found")
 
@@ -165,11 +195,19 @@ class Context:
         except SLException as e:
             raise e
 
+    def capture_stack(self):
+        """
+        Snapshot of the active calls, formatted only when it is reported. None when capture is switched off or no
+        function is running.
+        """
+        if not self.capture_stack_traces or not self.call_stack:
+            return None
+        return StackSnapshot(self.call_stack[-1])
+
     def get_call_stack_trace(self):
-        trace = ""
-        for frame in reversed(self.call_stack):
-            trace += f"Function '{frame.function_name}' called with arguments {frame.arguments}\n"
-        return trace
+        if not self.call_stack:
+            return ""
+        return StackSnapshot(self.call_stack[-1]).format()
 
     def register_builtin_functions(self):
         from StreamLanguage.builtins.functions import PrintFunction, ReadIntFunction, ReadStringFunction, ReadDataFunction
@@ -0,0 +1,356 @@
+"""
+Push based dataflow behind SLStream.
+
+Every SLStream is a vertex of a DataflowGraph. The stream operators connect vertices instead of nesting generators:
+- a >> b (chain): elements leaving a enter b, the result is b so chains read left to right
+- a | b (split): b becomes one more branch a's elements are copied to, the result is a so branches can be added
+- a ++ b (merge): the result is a new stream both a and b feed
+- a << b (feedback): elements leaving b enter a again, the result is a
+map and filter add a vertex whose stage transforms the elements passing through it.
+
+Elements move between vertices in batches of up to batch_size elements. Each connected graph has one executor, the
+DataflowGraph itself: it keeps a FIFO of pending (vertex, batch) deliveries and only pulls the next batch from a source
+stream when every delivery has been made, so fan out, merges and feedback loops are scheduled by the same loop.
+Connecting vertices of two graphs merges the graphs.
+
+Stages work on whole batches: a function marked with vectorized is called once per batch, with the list of elements,
+instead of once per element. When adaptive is set the graph resizes the batches it pulls from its sources after each
+one, doubling batch_size while a batch takes less than half of target_latency to arrive from its source and run
+through the graph, and halving it when a batch takes longer than target_latency, so slow sources get small batches.
+
+Elements leaving a vertex with no downstream vertex wait in its sink until they are read (SLStream.next, iteration,
+reduce). Reading runs the graph only until that sink has an element, so infinite sources work. A stream connected to a
+downstream vertex hands its elements on, reading it directly only sees elements pushed while it has none.
+
+Before it delivers anything the graph plans routes, fusing chains of stateless vertices: from each vertex, the route
+follows the only downstream vertex while that one is fed by nothing else and is neither a source nor a window. A batch entering the
+vertex runs through the stages and type checks of the whole route in one call, where consecutive stages calling a
+function per element are generated into one loop, and leaves from the last vertex of the route. Type checks a filter
+or a plain stream would repeat with the element type of the vertex before it are left out. explain lists the routes.
+
+Window vertices (interpreter.windows) keep state between batches. When every source of a graph is exhausted, the
+windows still holding elements receive END_OF_STREAM and emit their last results; a graph fed only by push never ends.
+
+Sinks with a limited buffer (SLBasicStream) apply their overflow policy only to elements the consumer did not keep up
+with: the graph pulls no more elements from a source than the fullest of them has room for, at least one, so a sink read
+as fast as it fills drops nothing. A full sink with a blocking overflow policy does not take the elements: the graph
+holds them and makes no other delivery until that sink has been read. With a single thread there is nothing to wait for, so
+reading another stream of a blocked graph ends without an element and push only queues its element.
+"""
+from collections import Counter, deque
+from itertools import count, islice
+from time import perf_counter
+
+DEFAULT_BATCH_SIZE = 64
+MAX_BATCH_SIZE = 4096
+TARGET_BATCH_LATENCY = 0.005  # Seconds a batch should take to run through the graph
+
+# Kinds of vertices, SLStream.kind
+SOURCE = 'source'
+STREAM = 'stream'
+MAP = 'map'
+FILTER = 'filter'
+WINDOW = 'window'
+
+END_OF_STREAM = object()  # Batch delivered to window vertices once every source of their graph is exhausted
+
+# Steps of a route, see fuse
+CHECK = 'check'
+BATCH = 'batch'
+
+_vertex_ids = count(1)
+
+
+def vectorized(func):
+    """
+    Mark a map function or filter predicate as taking the list of elements of a batch and returning the list of
+    results, so stages call it once per batch.
+    """
+    func.vectorized = True
+    return func
+
+
+def _element_loop(steps):
+    """
+    One generated function running a batch through consecutive per element steps.
+    """
+    namespace = {}
+    lines = ["def fused(batch):", "    out = []", "    append = out.append", "    for item in batch:"]
+    for index, (kind, function) in enumerate(steps):
+        name = f"step{index}"
+        if kind == MAP:
+            namespace[name] = function
+            lines.append(f"        item = {name}(item)")
+        elif kind == FILTER:
+            namespace[name] = function
+            lines.append(f"        if not {name}(item):")
+            lines.append("            continue")
+        else:
+            # function is the vertex whose element type is checked
+            namespace[name] = function._validate_element
+            namespace[f"checked{index}"] = function.checked_types
+            lines.append(f"        if type(item) not in checked{index}:")
+            lines.append(f"            {name}(item)")
+    lines += ["        append(item)", "    return out"]
+    exec(compile("\n".join(lines), "<fused stream stages>", "exec"), namespace)
+    return namespace["fused"]
+
+
+def fuse(vertices):
+    """
+    Function running a batch through the stages and type checks of a route, None when it passes batches unchanged.
+    """
+    steps = []
+    for index, vertex in enumerate(vertices):
+        if vertex.element_step is not None:
+            steps.append(vertex.element_step)
+        elif vertex.stage is not None:
+            steps.append((BATCH, vertex.stage))
+        if vertex.element_type is None:
+            continue
+        if index and (vertex.kind == FILTER or vertex.stage is None) \
+                and vertices[index - 1].element_type == vertex.element_type:
+            continue  # Elements the vertex before checked already
+        steps.append((CHECK, vertex))
+
+    functions = []
+    element_steps = []
+    for step in steps + [(BATCH, None)]:
+        if step[0] != BATCH:
+            element_steps.append(step)
+            continue
+        if element_steps:
+            if all(kind == CHECK for kind, _ in element_steps):
+                functions += [_batch_check(vertex) for _, vertex in element_steps]
+            else:
+                functions.append(_element_loop(element_steps))
+            element_steps = []
+        if step[1] is not None:
+            functions.append(step[1])
+
+    if not functions:
+        return None
+    if len(functions) == 1:
+        return functions[0]
+
+    def fused(batch):
+        for function in functions:
+            batch = function(batch)
+            if not batch:
+                break
+        return batch
+
+    return fused
+
+
+def _batch_check(vertex):
+    def check(batch):
+        vertex._validate_batch(batch)
+        return batch
+
+    return check
+
+
+class DataflowGraph:
+    """
+    The vertices of one connected stream graph, their source streams and the deliveries waiting to be made.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, adaptive=True, target_latency=TARGET_BATCH_LATENCY):
+        self.batch_size = batch_size
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+        self.batch_time = 0.0  # Seconds spent pulling and delivering the batch pulled last
+        self.batch_full = False  # Whether the batch pulled last had batch_size elements
+        self.vertices = []
+        self.sources = deque()  # Streams with a generator that is not exhausted yet, pulled round robin
+        self.pending = deque()  # (vertex, batch) deliveries in the order they were made
+        self.running = False  # Set while the executor loop runs, deliveries made by stages are queued
+        self.blocked = None  # (vertex, elements) a full blocking sink did not take
+        self.planned = False  # Whether the routes of the vertices are up to date, see plan
+        self.bounded = []  # Vertices whose elements wait in a sink of limited room, set by plan
+        self.exhausted = False  # Set when the last source runs out, see pull
+
+    def add(self, stream):
+        stream.graph = self
+        stream.vertex_id = next(_vertex_ids)
+        self.planned = False
+        self.vertices.append(stream)
+        if stream.generator_func is not None:
+            self.sources.append(stream)
+
+    def connect(self, upstream, downstream):
+        """
+        Make the elements leaving upstream enter downstream, merging their graphs first.
+        """
+        graph = upstream.graph.join(downstream.graph)
+        upstream.downstream.append(downstream)
+        graph.planned = False
+        if upstream.sink:
+            # Elements that were waiting to be read go the new way
+            graph.pending.append((downstream, list(upstream.sink)))
+            upstream.sink.clear()
+        return graph
+
+    def join(self, other):
+        """
+        Merge two graphs, the larger one absorbs the smaller one and is returned.
+        """
+        if other is self:
+            return self
+        if len(other.vertices) > len(self.vertices):
+            return other.join(self)
+        for stream in other.vertices:
+            stream.graph = self
+        self.vertices.extend(other.vertices)
+        self.planned = False
+        self.exhausted = self.exhausted and other.exhausted
+        self.sources.extend(other.sources)
+        self.pending.extend(other.pending)
+        if self.blocked is None:
+            self.blocked = other.blocked
+        self.batch_size = max(self.batch_size, other.batch_size)
+        return self
+
+    def push(self, stream, batch):
+        """
+        Deliver a batch at the mouth of a stream and run the deliveries it causes.
+        """
+        self.pending.append((stream, batch))
+        if not self.running:
+            self.run_until(None)
+
+    def deliver(self, stream, batch):
+        """
+        Run one batch through the route starting at a vertex and pass its output on.
+        """
+        if not self.planned:
+            self.plan()
+        function, destination = stream.route
+        if function is not None:
+            batch = function(batch)
+            if not batch:
+                return
+        if destination.downstream:
+            for target in destination.downstream:
+                self.pending.append((target, batch))
+        else:
+            self.store(destination, batch)
+
+    def plan(self):
+        """
+        Set the route of every vertex: (function running a batch through it, last vertex of the route).
+        """
+        upstream_counts = Counter(target for stream in self.vertices for target in stream.downstream)
+        for stream in self.vertices:
+            route = [stream]
+            while len(route[-1].downstream) == 1:
+                target = route[-1].downstream[0]
+                if target.generator_func is not None or target.kind == WINDOW or upstream_counts[target] != 1 \
+                        or target in route:
+                    break
+                route.append(target)
+            stream.fused = route
+            stream.route = (fuse(route), route[-1])
+        self.bounded = [stream for stream in self.vertices
+                        if not stream.downstream and getattr(stream.sink, 'room', None) is not None]
+        self.planned = True
+
+    def explain(self):
+        """
+        The routes batches take through the graph, one line for each vertex no other route runs through.
+        """
+        if not self.planned:
+            self.plan()
+        inner = {vertex for stream in self.vertices for vertex in stream.fused[1:]}
+        lines = []
+        for stream in self.vertices:
+            if stream in inner:
+                continue
+            destination = stream.fused[-1]
+            targets = ", ".join(_label(target) for target in destination.downstream) or "sink"
+            lines.append(" + ".join(_label(vertex) for vertex in stream.fused) + " -> " + targets)
+        return "\n".join(lines)
+
+    def store(self, stream, elements):
+        """
+        Add elements to the sink of a stream, holding the ones a full blocking sink does not take.
+        """
+        rest = stream.sink.extend(elements)
+        if rest:
+            self.blocked = (stream, rest)
+
+    def pull(self):
+        """
+        Take the next batch from the first source in turn. Once every source is exhausted, close the open windows
+        instead; False when there is nothing left to do.
+        """
+        if self.adaptive and self.batch_full:
+            self.adapt()
+        if not self.planned:
+            self.plan()
+        size = self.batch_size
+        room = min((stream.sink.room for stream in self.bounded), default=size)
+        limited = room < size
+        if limited:
+            size = max(room, 1)  # A full sink applies its overflow policy to one element at a time
+        while self.sources:
+            stream = self.sources.popleft()
+            if stream.iterator is None:
+                stream.iterator = iter(stream.generator_func())
+            started = perf_counter()
+            batch = list(islice(stream.iterator, size))
+            self.batch_time = perf_counter() - started  # Waiting on the source counts toward the latency
+            more = len(batch) == size
+            self.batch_full = more and not limited
+            if more:
+                self.sources.append(stream)
+            elif not self.sources:
+                self.exhausted = True
+            if batch:
+                self.pending.append((stream, batch))
+                return True
+        if self.exhausted:
+            # Nothing more will arrive, the windows still open emit what they hold
+            closing = [stream for stream in self.vertices if stream.kind == WINDOW and stream.stage.open]
+            for stream in closing:
+                self.pending.append((stream, END_OF_STREAM))
+            return bool(closing)
+        return False
+
+    def adapt(self):
+        """
+        Resize batches by the time the batch pulled last took to arrive and run through the graph.
+        """
+        if self.batch_time < self.target_latency / 2:
+            self.batch_size = min(self.batch_size * 2, MAX_BATCH_SIZE)
+        elif self.batch_time > self.target_latency:
+            self.batch_size = max(self.batch_size // 2, 1)
+
+    def run_until(self, stream):
+        """
+        Make deliveries until the sink of stream has an element. With no stream, make the pending deliveries only;
+        sources are pulled when a stream is being read.
+        """
+        running, self.running = self.running, True
+        try:
+            while stream is None or not stream.sink:
+                if self.blocked is not None:
+                    target, rest = self.blocked
+                    self.blocked = None
+                    self.store(target, rest)
+                    if self.blocked is not None:
+                        break  # Still full, nothing moves until it is read
+                elif self.pending:
+                    target, batch = self.pending.popleft()
+                    started = perf_counter()
+                    self.deliver(target, batch)
+                    self.batch_time += perf_counter() - started
+                elif stream is None or not self.pull():
+                    break
+        finally:
+            self.running = running
+
+
+def _label(stream):
+    return f"{stream.kind} {stream.vertex_id}"
@@ -1,37 +1,88 @@
+# Pending signals, one bit each in ControlFlowManager.state
+NONE = 0
+RETURN = 1
+BREAK = 2
+CONTINUE = 4
+RAISE = 8
+JUMPS = RETURN | BREAK | CONTINUE  # Signals that leave a block, blocks keep running on a pending exception
+
+
 class ControlFlowManager:
+    """
+    Signals of the tree walker. Nodes test the single integer state once after evaluating a child (any signal) or a
+    statement (state & JUMPS) instead of polling a flag per signal. The should_* properties read and write the bits.
+    """
 
     def __init__(self):
         self.reset()
 
     def reset(self):
-        self.should_return = False
+        self.state = NONE
         self.return_value = None
         self.return_metadata = None
-        self.should_break = False
+        self.tail_call = None  # (function, arguments) of a tail call replacing the return value
         self.break_metadata = None  #
-        self.should_continue = False
         self.continue_metadata = None
 
-        self.should_raise = False
         self.exception = None
         self.exception_metadata = None
 
+    def clear(self, signal):
+        self.state &= ~signal
+
+    @property
+    def should_return(self):
+        return bool(self.state & RETURN)
+
+    @should_return.setter
+    def should_return(self, value):
+        self.state = self.state | RETURN if value else self.state & ~RETURN
+
+    @property
+    def should_break(self):
+        return bool(self.state & BREAK)
+
+    @should_break.setter
+    def should_break(self, value):
+        self.state = self.state | BREAK if value else self.state & ~BREAK
+
+    @property
+    def should_continue(self):
+        return bool(self.state & CONTINUE)
+
+    @should_continue.setter
+    def should_continue(self, value):
+        self.state = self.state | CONTINUE if value else self.state & ~CONTINUE
+
+    @property
+    def should_raise(self):
+        return bool(self.state & RAISE)
+
+    @should_raise.setter
+    def should_raise(self, value):
+        self.state = self.state | RAISE if value else self.state & ~RAISE
 
     def set_return(self, value, metadata=None):
-        self.should_return = True
+        self.state |= RETURN
         self.return_value = value
         self.return_metadata = metadata
 
+    def set_tail_call(self, function, arguments, metadata=None):
+        self.state |= RETURN
+        self.return_value = None
+        self.return_metadata = metadata
+        self.tail_call = (function, arguments)
+
     def set_break(self, metadata=None):
-        self.should_break = True
+        self.state |= BREAK
         self.break_metadata = metadata
 
     def set_continue(self, metadata=None):
-        self.should_continue = True
+        self.state |= CONTINUE
         self.continue_metadata = metadata
 
     def set_exception(self, exception, metadata=None):
-        self.should_raise = True
+        self.state |= RAISE
         self.exception = exception
         self.exception_metadata = metadata
 
@@ -41,6 +92,7 @@ class ControlFlowManager:
             'should_return': self.should_return,
             'return_value': self.return_value,
             'return_metadata': self.return_metadata,
+            'tail_call': self.tail_call,
             'should_break': self.should_break,
             'break_metadata': self.break_metadata,
             'should_continue': self.should_continue,
@@ -48,4 +100,4 @@ class ControlFlowManager:
             'should_raise': self.should_raise,
             'exception': self.exception,
             'exception_metadata': self.exception_metadata
-        }
\ No newline at end of file
+        }
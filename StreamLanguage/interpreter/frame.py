@@ -0,0 +1,60 @@
+"""
+Frames for functions whose variables were resolved to slots by sl_ast.resolver.
+
+A Frame replaces the restricted SymbolTable of a call: every local (parameters first, then each declaration site in
+the body) owns a fixed position in a list, so reading or assigning it is a single index operation. Frames of nested
+functions keep a reference to the frame they were declared in, which is how nonlocal names are reached.
+"""
+from StreamLanguage.interpreter.function_metadata import FunctionMetadata
+from StreamLanguage.sl_ast.exceptions import VariableRedeclaredError, SLTypeError
+
+
+UNBOUND = object()  # Value of a slot whose declaration has not been executed since its block was entered
+
+
+class Frame:
+    __slots__ = ('slots', 'parent')
+
+    def __init__(self, size, parent=None):
+        self.slots = [UNBOUND] * size
+        self.parent = parent  # Frame of the enclosing function the callee was declared in
+
+    def outer(self, depth):
+        frame = self
+        for _ in range(depth):
+            frame = frame.parent
+        return frame
+
+
+def check_declaration(context, slots, slot, name):
+    """
+    Raise if declaring name in slot would redeclare a variable, with the same rules as VariableDeclarationNode in a
+    restricted function scope: the slot is already bound, or the name is declared in the global scope. The symbol
+    tables of the caller are not visible to the function.
+    """
+    if slots[slot] is not UNBOUND or context.global_symbol_table.is_declared(name):
+        raise VariableRedeclaredError(f"Variable '{name}' already declared in the current scope")
+
+
+def declare_function_slot(slots, slot, metadata):
+    """
+    Declare a nested function in a frame slot, adding it as an overload when the slot already holds the function.
+    """
+    existing = slots[slot]
+    if existing is UNBOUND:
+        slots[slot] = metadata
+    elif isinstance(existing, FunctionMetadata):
+        existing.merge(metadata)
+    else:
+        raise SLTypeError(f"Symbol '{metadata.name}' is not a function")
+
+
+def lookup_slot_function(value, name, arguments, cache=None):
+    """
+    Find the overload to call for a function stored in a frame slot.
+    """
+    if not isinstance(value, FunctionMetadata):
+        raise SLTypeError(f"Symbol '{name}' is not a function")
+    if cache is not None:
+        return cache.resolve(value, arguments)
+    return value.find_overload(arguments)
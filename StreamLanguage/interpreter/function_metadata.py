@@ -29,6 +29,7 @@ class FunctionMetadata:
         self.name = name
         self.overloads = []
         self.overloads.append(FunctionOverload(parameters, return_type, body)) # Add the first overload
+        self.version = 0  # Changes whenever the overloads change, invalidating the InlineCaches holding them
 
     def add_overload(self, parameters, return_type, body):
         """
@@ -49,6 +50,7 @@ class FunctionMetadata:
         # Add the new overload
         new_overload = FunctionOverload(parameters, return_type, body)
         self.overloads.append(new_overload)
+        self.version += 1
 
     def has_overload(self, parameter_count):
         return any(len(overload.parameters) == parameter_count for overload in self.overloads)
@@ -80,6 +82,7 @@ class FunctionMetadata:
                 )
             # If no conflict, add the overload
             self.overloads.append(overload)
+            self.version += 1
 
     def __repr__(self):
         return f"FunctionMetadata(name={self.name}, overloads={self.overloads})"
@@ -88,6 +91,7 @@ class FunctionMetadata:
         for overload in self.overloads:
             if len(overload.parameters) == parameter_count:
                 self.overloads.remove(overload)
+                self.version += 1
                 return True
             return False
 
@@ -104,6 +108,7 @@ class FunctionMetadata:
         self.name = None
         self.overloads.clear()
         self.overloads = None
+        self.version += 1
 
 
     def __add__ (self, other):
@@ -111,4 +116,58 @@ class FunctionMetadata:
             if self.name == other.name:
                 initial_overloads = self.overloads
 
-        return NotImplemented
\ No newline at end of file
+        return NotImplemented
+
+
+class InlineCache:
+    """
+    Overloads resolved at one call site, so repeated calls skip FunctionMetadata.find_overload.
+
+    An entry is valid while the call reaches the same FunctionMetadata, with the same argument count, and the metadata
+    still has the version it had when the entry was stored. The first entry is checked inline (monomorphic sites),
+    up to MAX_ENTRIES - 1 more are kept for sites reaching several functions or overloads (polymorphic sites). Sites
+    reaching more than that are megamorphic and stop storing new entries.
+    """
+    MAX_ENTRIES = 4
+
+    __slots__ = ('metadata', 'version', 'argument_count', 'overload', 'polymorphic')
+
+    def __init__(self):
+        self.metadata = None
+        self.version = -1
+        self.argument_count = -1
+        self.overload = None
+        self.polymorphic = None  # List of (metadata, version, argument count, overload) after the first entry
+
+    def resolve(self, metadata, arguments):
+        """
+        The overload of metadata to call with the given arguments.
+        """
+        argument_count = len(arguments)
+        if self.metadata is metadata and self.version == metadata.version and self.argument_count == argument_count:
+            return self.overload
+        if self.polymorphic is not None:
+            for entry in self.polymorphic:
+                if entry[0] is metadata and entry[1] == metadata.version and entry[2] == argument_count:
+                    return entry[3]
+
+        overload = metadata.find_overload(arguments)
+        if self.metadata is None or self.metadata is metadata and self.argument_count == argument_count:
+            # Empty, or the entry for the same target was invalidated by a new version
+            self.metadata, self.version, self.argument_count, self.overload = (metadata, metadata.version,
+                                                                               argument_count, overload)
+        else:
+            if self.polymorphic is None:
+                self.polymorphic = []
+            entries = self.polymorphic
+            for index, entry in enumerate(entries):
+                if entry[0] is metadata and entry[2] == argument_count:
+                    entries[index] = (metadata, metadata.version, argument_count, overload)
+                    break
+            else:
+                if len(entries) < self.MAX_ENTRIES - 1:
+                    entries.append((metadata, metadata.version, argument_count, overload))
+        return overload
+
+    def clear(self):
+        self.__init__()
@@ -1,17 +1,63 @@
 from StreamLanguage.interpreter.contextN import Context
 from StreamLanguage.parser.parser import Parser
+from StreamLanguage.sl_ast.optimizer import ConstantFolder
+from StreamLanguage.sl_ast.purity import PurityAnalyzer
+from StreamLanguage.sl_ast.scopes import ScopeElider
+from StreamLanguage.sl_ast.tail_calls import TailCallMarker
 
 
 class Interpreter:
+    # 'tree' evaluates the AST directly, 'closure' compiles it into closures first, 'vm' compiles it to bytecode
+    ENGINES = ('tree', 'closure', 'vm')
 
-    def __init__(self):
-        self._parser = Parser()
+    def __init__(self, engine='tree', parse_cache=None, frozen_tables=False, optimize=True, memoizer=None,
+                 stack_traces=True):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {self.ENGINES}")
+        self._engine = engine
+        # Frozen tables skip grammar validation and table generation, for short-lived command line runs
+        self._parser = Parser.frozen() if frozen_tables else Parser()
+        self._parse_cache = parse_cache  # Optional ParseCache, repeat runs of a source then skip the parser
+        self._optimize = optimize  # Fold constants before running, see sl_ast.optimizer
         self._global_context = Context()
         self._global_context.register_builtin_functions()
+        # Optional Memoizer, calls of pure functions (see sl_ast.purity) are then cached by argument values
+        self._global_context.memoizer = memoizer
+        # Stack snapshots on returns and errors; switching them off leaves errors without a stack_trace
+        self._global_context.capture_stack_traces = stack_traces
 
     def interpret(self, text):
-        tree = self._parser.parse(text)
-        return tree.evaluate(self._global_context)
+        tree = self.parse(text)
+        if self._optimize and tree is not None:
+            tree = ConstantFolder().fold_program(tree)
+        if self._global_context.memoizer is not None and tree is not None:
+            tree = PurityAnalyzer().analyze_program(tree)
+        if self._engine == 'tree':
+            if tree is not None:
+                # The compilers mark tail calls and unscoped blocks themselves
+                TailCallMarker().mark_program(tree)
+                ScopeElider().mark_program(tree)
+            return tree.evaluate(self._global_context)
+        return self.compile(tree).run(self._global_context)
+
+    def parse(self, text):
+        if self._parse_cache is not None:
+            return self._parse_cache.parse(self._parser, text)
+        return self._parser.parse(text)
+
+    def compile(self, tree):
+        """
+        Compile a parsed ProgramNode once for the selected engine. The result can be run repeatedly with run(context).
+        """
+        # The compilers are only imported by the engines using them, keeping the tree walker's startup short
+        if self._engine == 'vm':
+            from StreamLanguage.interpreter.bytecode_compiler import BytecodeCompiler
+            return BytecodeCompiler().compile_program(tree)
+        from StreamLanguage.interpreter.closure_compiler import ClosureCompiler
+        return ClosureCompiler().compile_program(tree)
+
+    def get_engine(self):
+        return self._engine
 
     def get_context(self):
         return self._global_context
@@ -27,5 +73,26 @@ class Interpreter:
         self._parser = parser
         return self._parser
 
+    def get_memoizer(self):
+        return self._global_context.memoizer
+
+    def set_memoizer(self, memoizer):
+        self._global_context.memoizer = memoizer
+        return memoizer
+
+    def get_stack_traces(self):
+        return self._global_context.capture_stack_traces
+
+    def set_stack_traces(self, flag):
+        self._global_context.capture_stack_traces = flag
+        return flag
+
+    def get_parse_cache(self):
+        return self._parse_cache
+
+    def set_parse_cache(self, parse_cache):
+        self._parse_cache = parse_cache
+        return self._parse_cache
+
     def __str__(self):
         return "Interpreter"
\ No newline at end of file
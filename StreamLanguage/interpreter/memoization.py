@@ -0,0 +1,131 @@
+"""
+Memoization of pure user functions.
+
+When a Context has a Memoizer, every function sl_ast.purity marked pure is wrapped in a MemoizedFunction as it is
+declared, so all engines share it: the tree walker and the closure engine call MemoizedFunction.invoke, the virtual
+machine looks the arguments up itself and only pushes a frame on a miss.
+
+Each function gets its own bounded cache keyed by the types and values of the arguments. Calls with an argument that
+is not a hashable primitive value (arrays, streams, exceptions) bypass the cache.
+"""
+from collections import OrderedDict
+
+from StreamLanguage.sl_ast.callables import CallableFunction
+
+MISSING = object()  # Result of MemoCache.lookup when the key is not cached
+
+LRU = 'lru'  # Evict the entry used least recently
+FIFO = 'fifo'  # Evict the entry stored first, hits do not refresh an entry
+EVICTION_POLICIES = (LRU, FIFO)
+
+
+def argument_key(arguments):
+    """
+    Cache key of a call, None when one of the arguments cannot be part of a key.
+    """
+    try:
+        key = tuple((type(argument), argument.value) for argument in arguments)
+        hash(key)
+    except (AttributeError, TypeError):
+        return None
+    return key
+
+
+class MemoCache:
+    """
+    Results of one function by argument key, holding at most max_entries results.
+    """
+
+    def __init__(self, max_entries=1024, eviction=LRU):
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{eviction}', expected one of {EVICTION_POLICIES}")
+        if max_entries < 1:
+            raise ValueError("A memoization cache needs room for at least one entry")
+        self.max_entries = max_entries
+        self.eviction = eviction
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key):
+        value = self.entries.get(key, MISSING)
+        if value is MISSING:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        if self.eviction == LRU:
+            self.entries.move_to_end(key)
+        return value
+
+    def store(self, key, value):
+        self.entries[key] = value
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'entries': len(self.entries)}
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+class MemoizedFunction(CallableFunction):
+    """
+    A pure function with a cache in front of it. Declared in the context in place of the function it wraps.
+    """
+
+    def __init__(self, function, cache):
+        super().__init__(function.name, function.parameters, function.body, function.return_type,
+                         function.nonlocals, function.pure)
+        self.function = function
+        self.cache = cache
+
+    def unwrap(self):
+        return self.function
+
+    def invoke(self, *args, context):
+        key = argument_key(args)
+        if key is None:
+            return self.function.invoke(*args, context=context)
+        value = self.cache.lookup(key)
+        if value is MISSING:
+            value = self.function.invoke(*args, context=context)
+            self.cache.store(key, value)
+        return value
+
+
+class Memoizer:
+    """
+    Creates the caches of the pure functions declared in a context and collects their statistics.
+    """
+
+    def __init__(self, max_entries=1024, eviction=LRU):
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{eviction}', expected one of {EVICTION_POLICIES}")
+        self.max_entries = max_entries
+        self.eviction = eviction
+        self.caches = {}  # (function name, parameter count) to the cache of its latest declaration
+
+    def wrap(self, function):
+        """
+        The function to declare in place of the given one: memoized when it is pure, unchanged otherwise.
+        """
+        if not function.pure or isinstance(function, MemoizedFunction):
+            return function
+        # Each declaration starts empty, a later program may declare a different function with the same name
+        cache = MemoCache(self.max_entries, self.eviction)
+        self.caches[(function.name, len(function.parameters))] = cache
+        return MemoizedFunction(function, cache)
+
+    def stats(self):
+        """
+        Statistics of every cache, by function name and parameter count.
+        """
+        return {f"{name}/{count}": cache.stats() for (name, count), cache in self.caches.items()}
+
+    def clear(self):
+        for cache in self.caches.values():
+            cache.clear()
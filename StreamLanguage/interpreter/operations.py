@@ -0,0 +1,73 @@
+"""
+Operator implementations shared by the compiled execution engines.
+
+The tree walker builds its operator tables inside BinaryOperationNode.perform_operation on every evaluation.
+The compiled engines resolve an operator to one of these functions once, when the program is compiled.
+The virtual machine compiles the LAZY_OPERATORS to conditional jumps instead.
+"""
+import operator
+
+from StreamLanguage.exceptions import SLBaseException
+from StreamLanguage.sl_types.data_instances.primatives.exception import SLExceptionInstance
+from StreamLanguage.sl_types.type_registry import TypeRegistry
+
+
+class RaiseSignal(SLBaseException):
+    """
+    Carries a user level exception instance up to the nearest compiled try/catch.
+    """
+
+    def __init__(self, exception):
+        super().__init__(str(exception))
+        self.exception = exception
+
+
+def raise_value_error(message):
+    value_error_type = TypeRegistry.get_meta_type_by_name("ValueError")
+    raise RaiseSignal(SLExceptionInstance(value_error_type, message))
+
+
+def division(a, b):
+    if b == 0:
+        raise_value_error("Division by zero")
+    return a / b
+
+
+def modulus(a, b):
+    if b == 0:
+        raise_value_error("Division by zero")
+    return a % b
+
+
+BINARY_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': division,
+    '%': modulus,
+    '<': operator.lt,
+    '>': operator.gt,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<=': operator.le,
+    '>=': operator.ge,
+    '&&': lambda x, y: x and y,
+    '||': lambda x, y: x or y,
+    '>>': lambda x, y: x.chain(y),
+    '|': lambda x, y: x.split(y),
+    '++': lambda x, y: x.merge(y),
+    '<<': lambda x, y: x.feedback(y),
+}
+
+# Operators that may not need their right operand. They receive it as a function taking no arguments and only call
+# it when the left operand does not decide the result. BINARY_OPERATORS keeps the eager forms for constant folding.
+LAZY_OPERATORS = {
+    '&&': lambda x, y: x and y(),
+    '||': lambda x, y: x or y(),
+}
+
+UNARY_OPERATORS = {
+    '+': operator.pos,
+    '-': operator.neg,
+    '!': operator.not_,
+}
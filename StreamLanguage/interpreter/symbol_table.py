@@ -88,6 +88,19 @@ class SymbolTable:
 """
 
 
+class EntryCache:
+    """
+    The entry a name resolved to in a global symbol table, reused while the table's version does not change.
+    Kept by the nodes and compiled instructions that read a name, see SymbolTable.lookup_global.
+    """
+    __slots__ = ('table', 'version', 'entry')
+
+    def __init__(self):
+        self.table = None
+        self.version = -1
+        self.entry = None
+
+
 class SymbolTable:
     def __init__(self, parent=None, is_restricted=False, global_symbol_table=None):
         self.parent = parent
@@ -95,6 +108,7 @@ class SymbolTable:
         self.global_symbol_table = global_symbol_table or (parent.global_symbol_table if parent else self)  # Global symbol table
         self.entries = {}
         self.nonlocal_entries = set()
+        self.version = 0  # Changes whenever a name is bound or unbound, never when a value is updated
 
     def declare(self, identifier, t, value=None, is_constant=False, is_global=False, is_nonlocal=False):
         # Check for shadowing
@@ -104,30 +118,55 @@ class SymbolTable:
             self.nonlocal_entries.add(identifier)
         else:
             self.entries[identifier] = SymbolTableEntry(identifier, t, value, is_constant, is_global=is_global)
+            self.version += 1
 
 
     def is_declared(self, identifier):
+        """
+        Whether a name is visible from this scope, with the rules of lookup: a restricted scope only sees its own
+        names, its nonlocal names and the global scope, not the scopes of its callers.
+        """
         if identifier in self.entries:
             return True
+        elif self.is_restricted:
+            if identifier in self.nonlocal_entries:
+                return self.parent is not None and self.parent.is_declared(identifier)
+            return self.global_symbol_table is not self and self.global_symbol_table.is_declared(identifier)
         elif self.parent:
             return self.parent.is_declared(identifier)
         else:
             return False
 
     
-    def lookup(self, identifier):
+    def lookup(self, identifier, cache=None):
+        """
+        Find the entry of a name. The optional EntryCache is used when the name is looked up in the global scope.
+        """
         if identifier in self.entries:
             return self.entries[identifier]
         elif self.is_restricted:
             if identifier in self.nonlocal_entries:  # Check nonlocal entries
                 return self._parent_lookup(identifier)
             else:  # Restricted scope, no access to parent scopes except global
-                return self.global_symbol_table.lookup(identifier)
+                return self.global_symbol_table.lookup_global(identifier, cache)
         elif self.parent:
-            return self.parent.lookup(identifier)
+            return self.parent.lookup(identifier, cache)
         else:
             raise VariableNotDeclaredError(f"Variable '{identifier}' is not declared.")
 
+    def lookup_global(self, identifier, cache=None):
+        """
+        Look a name up in this (global) table, reusing the entry held by the cache while no name was bound or unbound
+        here since it was stored.
+        """
+        if cache is None:
+            return self.lookup(identifier)
+        if cache.table is self and cache.version == self.version:
+            return cache.entry
+        entry = self.lookup(identifier)
+        cache.table, cache.version, cache.entry = self, self.version, entry
+        return entry
+
     def lookup_type(self, identifier):
         entry = self.lookup(identifier)
         if not entry.type:
@@ -194,10 +233,16 @@ class SymbolTable:
             # Apply the new overload
             entry.value.merge(metadata)
 
-    def lookup_function(self, identifier, params):
-        entry = self.lookup(identifier)
+    def lookup_function(self, identifier, params, cache=None, entry_cache=None):
+        """
+        Find the overload of a function to call with the given arguments, through the call site's InlineCache and
+        EntryCache when they are given.
+        """
+        entry = self.lookup(identifier, entry_cache)
         if entry.type != 'function':
             raise SLTypeError(f"Symbol '{identifier}' is not a function")
+        if cache is not None:
+            return cache.resolve(entry.value, params)
         f_overload: FunctionMetadata = entry.value.find_overload(params)
         if not f_overload:
             raise SLTypeError(f"Function '{identifier}' does not accept the given parameters")
@@ -207,4 +252,5 @@ class SymbolTable:
     def cleanup(self):
         for entry in self.entries.values():
             entry.cleanup()
-        self.entries.clear()
\ No newline at end of file
+        self.entries.clear()
+        self.version += 1
\ No newline at end of file
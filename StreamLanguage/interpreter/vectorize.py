@@ -0,0 +1,286 @@
+"""
+Columnar evaluation of simple stream functions with NumPy.
+
+A user function of one parameter whose body is a single return of arithmetic (+, -, *, /, %, unary -) and comparisons
+over that parameter and integer or float literals can run over a whole batch at once. When a batch of a stream holds
+only Integers or only Floats, the stage built by vectorize_map or vectorize_filter unboxes it into a NumPy array,
+evaluates the expression on the array and boxes the results again; the function itself is not called.
+
+Everything else takes the scalar path, the stage the function would have without NumPy: functions of another shape,
+batches of other or mixed types, and batches where the columnar result could differ from calling the function, a
+division by zero (the function raises ValueError), an Integer leaving the int64 range or a division of an Integer above
+2**53 in magnitude, which float64 does not hold exactly. Without NumPy installed every stage is scalar.
+
+vectorize_reduce does the same for reducers adding or multiplying their two parameters, on unboxed Python numbers so
+the result is exactly the one of reducing element by element.
+"""
+import operator
+from functools import reduce
+
+from StreamLanguage.sl_ast.nodes.expressions import IdentifierNode, BinaryOperationNode, UnaryOperationNode
+from StreamLanguage.sl_ast.nodes.functions import ReturnNode
+from StreamLanguage.sl_ast.nodes.node_types import PrimitiveIntNode, PrimitiveFloatNode
+from StreamLanguage.sl_types.data_instances.primatives.boolean import TRUE, FALSE
+from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat, _float
+from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger, _integer
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional, stream functions then run element by element
+    numpy = None
+
+INTEGER = 'i'
+FLOAT = 'f'
+BOOLEAN = 'b'
+
+INT64_LIMIT = 2 ** 62  # Integer results with a larger magnitude might have wrapped around, they take the scalar path
+FLOAT64_EXACT_LIMIT = 2 ** 53  # Largest magnitude up to which every Integer converts to float64 exactly
+
+COMPARISONS = {
+    '<': operator.lt,
+    '>': operator.gt,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+
+
+class _Fallback(Exception):
+    """
+    Raised by a columnar evaluation whose result could differ from the scalar one.
+    """
+
+
+def _checked(operation):
+    """
+    operation on columns, refusing Integer results that may have left the int64 range.
+    """
+
+    def apply(left, right):
+        result = operation(left, right)
+        if getattr(result, 'dtype', None) is not None and result.dtype.kind == INTEGER:
+            estimate = operation(numpy.asarray(left, dtype=numpy.float64), numpy.asarray(right, dtype=numpy.float64))
+            if numpy.any(numpy.abs(estimate) >= INT64_LIMIT):
+                raise _Fallback()
+        return result
+
+    return apply
+
+
+def _nonzero_divisor(operation):
+    """
+    operation on columns, leaving a division by zero to the scalar path so the function raises its ValueError.
+    """
+
+    def apply(left, right):
+        if numpy.any(numpy.asarray(right) == 0):
+            raise _Fallback()
+        return operation(left, right)
+
+    return apply
+
+
+def _exact_division(left_kind, right_kind):
+    """
+    True division on columns, refusing Integer operands float64 does not hold exactly, which Python divides exactly.
+    """
+    integers = [index for index, kind in enumerate((left_kind, right_kind)) if kind == INTEGER]
+
+    def apply(left, right):
+        operands = (left, right)
+        for index in integers:
+            operand = operands[index]
+            if numpy.any((operand > FLOAT64_EXACT_LIMIT) | (operand < -FLOAT64_EXACT_LIMIT)):
+                raise _Fallback()
+        return operator.truediv(left, right)
+
+    return _nonzero_divisor(apply)
+
+
+def _compile(node, parameter, kind):
+    """
+    (function of the parameter column, result kind) for an expression over a parameter column of the given kind, None
+    when the expression cannot be evaluated columnar.
+    """
+    if isinstance(node, IdentifierNode):
+        return (lambda column: column, kind) if node.name == parameter else None
+    if isinstance(node, PrimitiveIntNode) and type(node.value) is SLInteger:
+        value = node.value.value
+        return (lambda column: value), INTEGER
+    if isinstance(node, PrimitiveFloatNode) and type(node.value) is SLFloat:
+        value = node.value.value
+        return (lambda column: value), FLOAT
+    if isinstance(node, UnaryOperationNode) and node.operator == '-':
+        operand = _compile(node.operand, parameter, kind)
+        if operand is None or operand[1] == BOOLEAN:
+            return None
+        operand_function, operand_kind = operand
+        negate = _checked(lambda _, value: -value)
+        return (lambda column: negate(0, operand_function(column))), operand_kind
+    if not isinstance(node, BinaryOperationNode):
+        return None
+    left = _compile(node.left, parameter, kind)
+    right = _compile(node.right, parameter, kind)
+    if left is None or right is None or BOOLEAN in (left[1], right[1]):
+        return None
+    (left_function, left_kind), (right_function, right_kind) = left, right
+    if node.operator in COMPARISONS:
+        if left_kind != right_kind:
+            return None  # Integers and Floats do not compare
+        operation, result_kind = COMPARISONS[node.operator], BOOLEAN
+    elif node.operator in ('+', '-', '*'):
+        operation = _checked({'+': operator.add, '-': operator.sub, '*': operator.mul}[node.operator])
+        result_kind = INTEGER if left_kind == right_kind == INTEGER else FLOAT
+    elif node.operator == '/':
+        operation, result_kind = _exact_division(left_kind, right_kind), FLOAT
+    elif node.operator == '%':
+        operation = _nonzero_divisor(numpy.remainder)
+        result_kind = INTEGER if left_kind == right_kind == INTEGER else FLOAT
+    else:
+        return None
+    return (lambda column: operation(left_function(column), right_function(column))), result_kind
+
+
+class ColumnarFunction:
+    """
+    The return expression of a one parameter function, compiled for Integer and for Float columns on first use.
+    """
+
+    def __init__(self, parameter, expression):
+        self.parameter = parameter
+        self.expression = expression
+        self.compiled = {}  # Column kind -> (function, result kind) or None
+
+    def __call__(self, batch):
+        """
+        The results for a batch as an array, None when the batch takes the scalar path.
+        """
+        element_type = type(batch[0])
+        if element_type is SLInteger:
+            kind, dtype = INTEGER, numpy.int64
+        elif element_type is SLFloat:
+            kind, dtype = FLOAT, numpy.float64
+        else:
+            return None
+        if kind not in self.compiled:
+            self.compiled[kind] = _compile(self.expression, self.parameter, kind)
+        compiled = self.compiled[kind]
+        if compiled is None:
+            return None
+        function, result_kind = compiled
+        for element in batch:
+            if type(element) is not element_type:
+                return None
+        try:
+            column = numpy.array([element.value for element in batch], dtype=dtype)
+            with numpy.errstate(all='ignore'):
+                result = function(column)
+        except (_Fallback, OverflowError, ZeroDivisionError):
+            return None
+        if numpy.ndim(result) == 0:
+            result = numpy.full(len(batch), result)  # The expression does not use the parameter
+        return result, result_kind
+
+
+def _function_parts(func):
+    """
+    (parameter names, body) of a user function, None for other callables.
+    """
+    function = func.unwrap() if hasattr(func, 'unwrap') else func
+    parameters = getattr(function, 'parameters', None)
+    body = getattr(function, 'body', None)
+    if parameters is None or not isinstance(body, list):
+        return None
+    names = [getattr(parameter, 'name', None) for parameter in parameters]
+    return names, body
+
+
+def columnar_function(func):
+    """
+    ColumnarFunction of a user function returning one expression of its only parameter, None for other functions or
+    without NumPy.
+    """
+    if numpy is None:
+        return None
+    parts = _function_parts(func)
+    if parts is None:
+        return None
+    names, body = parts
+    if len(names) != 1 or names[0] is None or len(body) != 1 or not isinstance(body[0], ReturnNode):
+        return None
+    return ColumnarFunction(names[0], body[0].value)
+
+
+def _box(result, kind):
+    values = result.tolist()
+    if kind == INTEGER:
+        return [_integer(value) for value in values]
+    if kind == FLOAT:
+        return [_float(value) for value in values]
+    return [TRUE if value else FALSE for value in values]
+
+
+def vectorize_map(func, scalar_stage):
+    """
+    Stage mapping func over batches columnar when it can, with scalar_stage for the other batches.
+    """
+    columnar = columnar_function(func)
+    if columnar is None:
+        return scalar_stage
+
+    def stage(batch):
+        result = columnar(batch)
+        if result is None:
+            return scalar_stage(batch)
+        return _box(*result)
+
+    return stage
+
+
+def vectorize_filter(predicate, scalar_stage):
+    """
+    Stage filtering batches by predicate columnar when it can, with scalar_stage for the other batches.
+    """
+    columnar = columnar_function(predicate)
+    if columnar is None:
+        return scalar_stage
+
+    def stage(batch):
+        result = columnar(batch)
+        if result is None or result[1] != BOOLEAN:
+            return scalar_stage(batch)
+        return [element for element, keep in zip(batch, result[0].tolist()) if keep]
+
+    return stage
+
+
+def vectorize_reduce(reducer):
+    """
+    Python operator of a reducer returning the sum or the product of its two parameters, None for other reducers.
+    """
+    parts = _function_parts(reducer)
+    if parts is None:
+        return None
+    names, body = parts
+    if len(names) != 2 or len(body) != 1 or not isinstance(body[0], ReturnNode):
+        return None
+    expression = body[0].value
+    if not isinstance(expression, BinaryOperationNode) or expression.operator not in ('+', '*'):
+        return None
+    if not (isinstance(expression.left, IdentifierNode) and isinstance(expression.right, IdentifierNode)):
+        return None
+    if {expression.left.name, expression.right.name} != set(names) or names[0] == names[1]:
+        return None
+    return operator.add if expression.operator == '+' else operator.mul
+
+
+def reduce_batch(operation, accumulator, batch):
+    """
+    Fold a batch into an unboxed accumulator, None when the batch and accumulator are not all Integers or all Floats.
+    """
+    element_type = SLInteger if type(accumulator) is int else SLFloat
+    for element in batch:
+        if type(element) is not element_type:
+            return None
+    return reduce(operation, [element.value for element in batch], accumulator)
@@ -0,0 +1,368 @@
+"""
+Dispatch loop virtual machine for StreamLanguage bytecode.
+
+Calls between bytecode functions push a Frame onto the machine's own frame stack instead of recursing in Python,
+so the depth of StreamLanguage recursion is bounded only by Context.MAX_RECURSION_DEPTH and not by the host stack.
+Locals resolved by sl_ast.resolver occupy the first registers of their function's frame.
+"""
+from StreamLanguage.exceptions import SLException
+from StreamLanguage.interpreter import bytecode as op
+from StreamLanguage.interpreter.callframe import error_stack_trace
+from StreamLanguage.interpreter.frame import UNBOUND, check_declaration, declare_function_slot, lookup_slot_function
+from StreamLanguage.interpreter.function_metadata import FunctionMetadata
+from StreamLanguage.interpreter.memoization import MemoizedFunction, MISSING, argument_key
+from StreamLanguage.interpreter.operations import BINARY_OPERATORS, UNARY_OPERATORS, RaiseSignal
+from StreamLanguage.sl_ast.block_types import BlockType
+from StreamLanguage.sl_ast.callables import CallableFunction
+from StreamLanguage.sl_ast.exceptions import ParserError, VariableRedeclaredError, SLTypeError
+from StreamLanguage.sl_ast.resolver import GLOBAL
+from StreamLanguage.sl_types.data_instances.collections.array import SLArray
+
+
+# Operator functions indexed by opcode
+BINARY_FUNCTIONS = [None] * (op.FEEDBACK + 1)
+for _symbol, _opcode in op.BINARY_OPCODES.items():
+    BINARY_FUNCTIONS[_opcode] = BINARY_OPERATORS[_symbol]
+
+UNARY_FUNCTIONS = {opcode: UNARY_OPERATORS[symbol] for symbol, opcode in op.UNARY_OPCODES.items()}
+
+
+class Frame:
+    """
+    Activation record of a code object running in the virtual machine.
+    """
+    __slots__ = ('code', 'function', 'registers', 'pc', 'return_register', 'handlers', 'block_depth', 'exception',
+                 'parent', 'memo')
+
+    def __init__(self, code, function, block_depth):
+        self.code = code
+        self.function = function  # None for the program frame
+        self.registers = [UNBOUND] * code.register_count
+        self.pc = 0
+        self.return_register = -1
+        self.handlers = None  # Stack of (handler target, block depth) pushed by SETUP_TRY
+        self.block_depth = block_depth
+        self.exception = None
+        self.parent = function.parent_frame if function is not None else None
+        self.memo = None  # (cache, key) the returned value is stored under, for calls of memoized functions
+
+    def outer(self, depth):
+        frame = self
+        for _ in range(depth):
+            frame = frame.parent
+        return frame
+
+
+class VMFunction(CallableFunction):
+    """
+    A user function compiled to bytecode. Declared in the context like any other CallableFunction so overload
+    resolution is shared with the other engines. Calls from inside the machine push a frame instead of calling invoke.
+    """
+
+    def __init__(self, name, parameters, body, code, return_type=None, nonlocals=None, pure=False):
+        super().__init__(name, parameters, body, return_type, nonlocals, pure)
+        self.code = code
+        self.parent_frame = None  # Frame the function was declared in, for nonlocal names
+
+    def bind(self, frame):
+        """
+        Copy of the function declared in the given frame.
+        """
+        function = VMFunction(self.name, self.parameters, self.body, self.code, self.return_type, self.nonlocals,
+                              self.pure)
+        function.parent_frame = frame
+        return function
+
+    def invoke(self, *args, context):
+        return VirtualMachine(context).execute(self.code, function=self, arguments=args)
+
+
+class BytecodeProgram:
+    """
+    The result of compiling a ProgramNode to bytecode. Can be run any number of times against a context.
+    """
+
+    def __init__(self, program_node, code):
+        self.program_node = program_node
+        self.code = code
+
+    def run(self, context):
+        program = self.program_node
+        try:
+            with context.block_context(BlockType.PROGRAM, program.block_uuid):
+                VirtualMachine(context).execute(self.code)
+        except RaiseSignal as e:
+            program.handle_error(SLException(f"Uncaught exception {e.exception}"), context)
+        except SLException as e:
+            program.handle_error(e, context)
+
+
+class VirtualMachine:
+
+    def __init__(self, context):
+        self.context = context
+
+    def execute(self, code, function=None, arguments=()):
+        """
+        Run a code object until its frame returns and give back the returned value.
+        When function is given the code runs as the body of a call to it with the given arguments.
+        """
+        context = self.context
+        frame = Frame(code, function, len(context.blocks_stack))
+        if function is not None:
+            self._enter_frame(frame, arguments)
+        callers = []  # Suspended frames, the innermost caller last
+
+        binary_functions = BINARY_FUNCTIONS
+        unary_functions = UNARY_FUNCTIONS
+        blocks_stack = context.blocks_stack
+
+        instructions = code.instructions()
+        constants = code.constants
+        names = code.names
+        registers = frame.registers
+        pc = 0
+
+        while True:
+            try:
+                while True:
+                    opcode, a, b, c = instructions[pc]
+                    pc += 1
+
+                    if opcode == op.MOVE:
+                        registers[a] = registers[b]
+                    elif op.ADD <= opcode <= op.FEEDBACK:
+                        registers[a] = binary_functions[opcode](registers[b], registers[c])
+                    elif opcode == op.LOAD_CONST:
+                        registers[a] = constants[b]
+                    elif opcode == op.LOAD_NAME:
+                        registers[a] = context.current_symbol_table.lookup(names[b], constants[c]).value
+                    elif opcode == op.LOAD_GLOBAL:
+                        registers[a] = context.global_symbol_table.lookup_global(names[b], constants[c]).value
+                    elif opcode == op.JUMP_IF_FALSE:
+                        if not registers[a]:
+                            pc = b
+                    elif opcode == op.JUMP:
+                        pc = a
+                    elif opcode == op.STORE_NAME:
+                        context.current_symbol_table.update(names[b], registers[a])
+                    elif opcode == op.STORE_GLOBAL:
+                        context.global_symbol_table.update(names[b], registers[a])
+                    elif opcode == op.CALL or opcode == op.TAIL_CALL:
+                        name, argument_count, address, cache, entry_cache = constants[c]
+                        arguments = registers[b:b + argument_count]
+                        if address is GLOBAL:
+                            overload = context.global_symbol_table.lookup_function(name, arguments, cache)
+                        elif address is None:
+                            overload = context.current_symbol_table.lookup_function(name, arguments, cache,
+                                                                                    entry_cache)
+                        else:
+                            overload = lookup_slot_function(frame.outer(address[0]).registers[address[1]], name,
+                                                            arguments, cache)
+                        implementation = overload.implementation
+                        if opcode == op.TAIL_CALL and implementation.unwrap() is frame.function:
+                            # Restart the running frame with the new arguments instead of pushing another one
+                            self._leave_frame(frame)
+                            registers = frame.registers = [UNBOUND] * frame.code.register_count
+                            self._enter_frame(frame, arguments)
+                            pc = 0
+                            continue
+                        memo = None
+                        if isinstance(implementation, MemoizedFunction) and \
+                                isinstance(implementation.function, VMFunction):
+                            key = argument_key(arguments)
+                            if key is not None:
+                                value = implementation.cache.lookup(key)
+                                if value is not MISSING:
+                                    registers[a] = value
+                                    continue
+                                memo = (implementation.cache, key)
+                            implementation = implementation.function
+                        if isinstance(implementation, VMFunction):
+                            callee = Frame(implementation.code, implementation, len(blocks_stack))
+                            callee.memo = memo
+                            self._enter_frame(callee, arguments)
+                            frame.pc = pc
+                            frame.return_register = a
+                            callers.append(frame)
+                            frame = callee
+                            instructions = frame.code.instructions()
+                            constants = frame.code.constants
+                            names = frame.code.names
+                            registers = frame.registers
+                            pc = 0
+                        else:
+                            registers[a] = implementation.invoke(*arguments, context=context)
+                    elif opcode == op.RETURN:
+                        value = registers[a] if a >= 0 else None
+                        if frame.memo is not None:
+                            frame.memo[0].store(frame.memo[1], value)
+                        self._leave_frame(frame)
+                        if not callers:
+                            return value
+                        frame = callers.pop()
+                        instructions = frame.code.instructions()
+                        constants = frame.code.constants
+                        names = frame.code.names
+                        registers = frame.registers
+                        pc = frame.pc
+                        registers[frame.return_register] = value
+                    elif opcode == op.ENTER_BLOCK:
+                        context.enter_block(constants[a], constants[b], c)
+                    elif opcode == op.EXIT_BLOCK:
+                        context.exit_block()
+                    elif opcode == op.CLEAR_LOCALS:
+                        registers[a:b] = [UNBOUND] * (b - a)
+                    elif opcode == op.DECLARE_LOCAL:
+                        registers[b] = self._declare_local(registers, b, registers[a] if a >= 0 else None, a >= 0,
+                                                           constants[c])
+                    elif opcode == op.LOAD_DEREF:
+                        registers[a] = frame.outer(b).registers[c]
+                    elif opcode == op.STORE_DEREF:
+                        frame.outer(b).registers[c] = registers[a]
+                    elif opcode == op.DECLARE_NAME:
+                        self._declare_name(names[b], registers[a] if a >= 0 else None, a >= 0,
+                                           constants[c] if c >= 0 else None)
+                    elif opcode in unary_functions:
+                        registers[a] = unary_functions[opcode](registers[b])
+                    elif opcode == op.JUMP_IF_TRUE:
+                        if registers[a]:
+                            pc = b
+                    elif opcode == op.DECLARE_FUNCTION:
+                        function_object = constants[a]
+                        if b >= 0:
+                            if not context.can_define_function():
+                                raise Exception("Cannot define functions in the current context")
+                            metadata = FunctionMetadata(function_object.name, function_object.parameters,
+                                                        function_object.bind(frame), function_object.return_type)
+                            declare_function_slot(registers, b, metadata)
+                        else:
+                            context.declare_function(function_object.name, function_object,
+                                                     function_object.parameters, function_object.return_type)
+                    elif opcode == op.SETUP_TRY:
+                        if frame.handlers is None:
+                            frame.handlers = []
+                        frame.handlers.append((a, len(blocks_stack)))
+                    elif opcode == op.POP_TRY:
+                        frame.handlers.pop()
+                    elif opcode == op.LOAD_EXCEPTION:
+                        registers[a] = frame.exception
+                    elif opcode == op.MATCH_EXCEPTION:
+                        registers[a] = registers[b].type_descriptor.is_subtype_of(constants[c])
+                    elif opcode == op.RAISE:
+                        raise RaiseSignal(registers[a])
+                    elif opcode == op.MAKE_ARRAY:
+                        registers[a] = SLArray(registers[b:b + c])
+                    elif opcode == op.EVALUATE_NODE:
+                        registers[a] = constants[b].evaluate(context)
+                    elif opcode == op.ERROR:
+                        error_type, message = constants[a]
+                        raise error_type(message)
+                    else:
+                        raise ParserError(f"Unknown opcode {opcode} in code object '{frame.code.name}'")
+
+            except RaiseSignal as signal:
+                # Unwind to the innermost active handler, leaving frames that have none
+                frame.pc = pc
+                while not frame.handlers:
+                    self._leave_frame(frame)
+                    if not callers:
+                        raise
+                    frame = callers.pop()
+                pc, block_depth = frame.handlers.pop()
+                while len(blocks_stack) > block_depth:
+                    context.exit_block()
+                frame.exception = signal.exception
+                instructions = frame.code.instructions()
+                constants = frame.code.constants
+                names = frame.code.names
+                registers = frame.registers
+
+            except SLException as e:
+                frame.pc = pc
+                raise self._abort(frame, callers, e)
+
+            except BaseException:
+                self._abort(frame, callers, None)
+                raise
+
+    def _enter_frame(self, frame, arguments):
+        """
+        Enter the function call a new frame executes: its parameters become the first registers when the code
+        uses resolved locals, and are declared in a restricted symbol table otherwise.
+        """
+        if frame.code.frame_size is None:
+            self.context.enter_function_call(frame.function, arguments)
+        else:
+            self.context.enter_function_frame(frame.function, arguments)
+            frame.registers[:len(arguments)] = arguments
+
+    def _declare_local(self, registers, slot, value, has_value, declaration):
+        name, type_hint = declaration
+        check_declaration(self.context, registers, slot, name)
+        if not has_value:
+            return None
+        value_type = value.type_descriptor
+        if type_hint and value_type != type_hint:
+            raise SLTypeError(f"Type mismatch: Variable '{name}' expected type {type_hint}, but got {value_type}")
+        return value
+
+    def _declare_name(self, name, value, has_value, type_hint):
+        context = self.context
+        if context.current_symbol_table.is_declared(name):
+            raise VariableRedeclaredError(f"Variable '{name}' already declared in the current scope")
+        if not has_value:
+            context.declare_variable(name, t=type_hint, v=None)
+            return
+        value_type = value.type_descriptor
+        if type_hint and value_type != type_hint:
+            raise SLTypeError(f"Type mismatch: Variable '{name}' expected type {type_hint}, but got {value_type}")
+        context.declare_variable(name, t=value_type, v=value)
+
+    def _leave_frame(self, frame):
+        """
+        Exit the blocks a frame entered and, for function frames, the function call itself.
+        """
+        context = self.context
+        while len(context.blocks_stack) > frame.block_depth:
+            context.exit_block()
+        if frame.function is not None:
+            if frame.code.frame_size is None:
+                context.exit_function_call()
+            else:
+                context.exit_function_frame()
+
+    def _abort(self, frame, callers, error):
+        """
+        Leave every active frame after an interpreter error and build the error to report, wrapped like the tree
+        walker wraps it: by the nodes the failing instruction of each frame runs inside (CodeObject.guards) and by
+        the functions the error passed through.
+        """
+        stack_trace = None
+        if error is not None:
+            stack_trace = error_stack_trace(error) or self.context.capture_stack()
+
+        while True:
+            if error is not None:
+                error = self._wrap(frame, error)
+            self._leave_frame(frame)
+            if error is not None and frame.function is not None:
+                error = SLException(f"Error in function '{frame.function.name}': {str(error)}")
+                error.stack_trace = stack_trace
+            if not callers:
+                return error
+            frame = callers.pop()
+
+    def _wrap(self, frame, error):
+        """
+        The error after the handle_error of every node guarding the instruction a frame stopped at, innermost first.
+        """
+        for node, errors in reversed(frame.code.guards[frame.pc - 1]):
+            if isinstance(error, errors):
+                try:
+                    node.handle_error(error, self.context)
+                except ParserError as wrapped:
+                    # Raising the error replaces the context the tree walker would find the stack trace through
+                    wrapped.stack_trace = error_stack_trace(error)
+                    error = wrapped
+        return error
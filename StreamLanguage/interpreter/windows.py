@@ -0,0 +1,291 @@
+"""
+Incremental window aggregations over streams, the stages of the streams SLStream.tumbling, sliding and session return.
+
+A window stage folds every element into the aggregate of its current window as the element arrives and emits the
+aggregate, an Integer, Float or element of the stream, when the window closes:
+- tumbling windows split the stream into consecutive windows of size elements, or of size seconds
+- sliding windows of size elements or seconds start every step elements or seconds, so they overlap
+- session windows hold elements arriving less than gap seconds apart
+
+Each aggregate costs O(1) per element, amortized. Sums and means never subtract an element leaving a sliding window,
+which would lose the precision of Floats: they keep two stacks, the newest elements with their running total and the
+oldest ones with the totals of their suffixes, computed when the newest are moved over. Minimums and maximums keep a
+monotonic deque, the candidates for the extreme of the current window in arrival order. Either way an element is
+appended and removed at most once.
+
+Time windows take the time of an element from the timestamp function, or the arrival time of its batch without one.
+Elements are expected in time order. Time windows are closed by the first element past their end, or when every
+source of the stream is exhausted. Count windows only emit full windows.
+"""
+from abc import ABC, abstractmethod
+from collections import deque
+from time import monotonic
+
+from StreamLanguage.interpreter.dataflow import END_OF_STREAM
+from StreamLanguage.sl_types.data_instances.primatives.float import _float
+from StreamLanguage.sl_types.data_instances.primatives.integer import _integer
+
+SUM = 'sum'
+COUNT = 'count'
+MIN = 'min'
+MAX = 'max'
+MEAN = 'mean'
+AGGREGATES = (SUM, COUNT, MIN, MAX, MEAN)
+
+
+class WindowState:
+    """
+    Aggregate of the elements in a window, each identified by a position (index or time) increasing in arrival order.
+    """
+    __slots__ = ('aggregate', 'summing', 'elements', 'front', 'total')
+
+    def __init__(self, aggregate):
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{aggregate}', expected one of {AGGREGATES}")
+        self.aggregate = aggregate
+        self.summing = aggregate in (SUM, MEAN)
+        # (position, element) of every element in the window, of the candidates for its extreme for MIN and MAX, or
+        # of the elements not moved to front yet for SUM and MEAN
+        self.elements = deque()
+        self.front = []  # (position, total of the element and the ones after it) for SUM and MEAN, oldest last
+        self.total = 0  # Total of elements for SUM and MEAN
+
+    def add(self, position, element):
+        elements = self.elements
+        if self.aggregate == MIN:
+            value = element.value
+            while elements and elements[-1][1].value >= value:
+                elements.pop()  # Can no longer be the minimum, element leaves the window after it
+        elif self.aggregate == MAX:
+            value = element.value
+            while elements and elements[-1][1].value <= value:
+                elements.pop()
+        elif self.aggregate != COUNT:
+            self.total += element.value
+        elements.append((position, element))
+
+    def evict(self, start):
+        """
+        Remove the elements positioned before start.
+        """
+        elements = self.elements
+        if not self.summing:
+            while elements and elements[0][0] < start:
+                elements.popleft()
+            return
+        front = self.front
+        while True:
+            if not front:
+                if not elements or elements[0][0] >= start:
+                    return
+                self._move_to_front()
+            if front[-1][0] >= start:
+                return
+            front.pop()
+
+    def _move_to_front(self):
+        front, suffix = self.front, 0
+        for position, element in reversed(self.elements):
+            suffix = element.value + suffix
+            front.append((position, suffix))
+        self.elements.clear()
+        self.total = 0
+
+    def clear(self):
+        self.elements.clear()
+        self.front.clear()
+        self.total = 0
+
+    def result(self):
+        if self.aggregate in (MIN, MAX):
+            return self.elements[0][1]
+        if self.aggregate == COUNT:
+            return _integer(len(self.elements))
+        total = self.front[-1][1] + self.total if self.front else self.total
+        if self.aggregate == MEAN:
+            return _float(total / (len(self.front) + len(self.elements)))
+        return _integer(total) if type(total) is int else _float(total)
+
+    def __bool__(self):
+        # For MIN and MAX the latest element is always a candidate, so there are candidates while there are elements
+        return bool(self.elements) or bool(self.front)
+
+
+class Window(ABC):
+    """
+    Stage of a window stream: called with each batch, returns the aggregates of the windows the batch closed.
+    """
+
+    def __init__(self, aggregate, timestamp=None):
+        self.state = WindowState(aggregate)
+        self.timestamp = timestamp
+
+    @property
+    def open(self):
+        """
+        Whether closing the window would emit anything.
+        """
+        return False
+
+    def times(self, batch):
+        if self.timestamp is None:
+            now = monotonic()
+            return [now] * len(batch)
+        return [self.timestamp(element) for element in batch]
+
+    def __call__(self, batch):
+        if batch is END_OF_STREAM:
+            return self.close()
+        results = []
+        self.fold(batch, results)
+        return results
+
+    @abstractmethod
+    def fold(self, batch, results):
+        """
+        Fold the elements of a batch into the window, appending the aggregates of the windows they close to results.
+        """
+
+    def close(self):
+        return []
+
+
+def _check_size(size, name="size"):
+    if size <= 0:
+        raise ValueError(f"A window {name} must be positive")
+
+
+class CountTumblingWindow(Window):
+    def __init__(self, size, aggregate):
+        _check_size(size)
+        super().__init__(aggregate)
+        self.size = size
+        self.count = 0
+
+    def fold(self, batch, results):
+        state, size = self.state, self.size
+        for element in batch:
+            state.add(0, element)
+            self.count += 1
+            if self.count == size:
+                results.append(state.result())
+                state.clear()
+                self.count = 0
+
+
+class CountSlidingWindow(Window):
+    def __init__(self, size, step, aggregate):
+        _check_size(size)
+        _check_size(step, "step")
+        super().__init__(aggregate)
+        self.size = size
+        self.step = step
+        self.index = 0  # Position of the next element
+
+    def fold(self, batch, results):
+        state, size, step = self.state, self.size, self.step
+        for element in batch:
+            state.add(self.index, element)
+            self.index += 1
+            if self.index >= size and (self.index - size) % step == 0:
+                state.evict(self.index - size)
+                results.append(state.result())
+
+
+class TimeTumblingWindow(Window):
+    def __init__(self, size, aggregate, timestamp=None):
+        _check_size(size)
+        super().__init__(aggregate, timestamp)
+        self.size = size
+        self.end = None  # End of the current window
+
+    @property
+    def open(self):
+        return bool(self.state)
+
+    def fold(self, batch, results):
+        state, size = self.state, self.size
+        for element, time in zip(batch, self.times(batch)):
+            if self.end is None or time >= self.end:
+                if state:
+                    results.append(state.result())
+                    state.clear()
+                self.end = (time // size + 1) * size
+            state.add(time, element)
+
+    def close(self):
+        results = [self.state.result()] if self.state else []
+        self.state.clear()
+        return results
+
+
+class TimeSlidingWindow(Window):
+    def __init__(self, size, step, aggregate, timestamp=None):
+        _check_size(size)
+        _check_size(step, "step")
+        super().__init__(aggregate, timestamp)
+        self.size = size
+        self.step = step
+        self.end = None  # End of the earliest window not emitted yet
+
+    @property
+    def open(self):
+        return bool(self.state)
+
+    def emit_until(self, time, results):
+        """
+        Emit the windows ending at or before time.
+        """
+        state = self.state
+        while self.end <= time:
+            state.evict(self.end - self.size)
+            if not state:
+                # No window until the one holding time has elements
+                self.end = max(self.end, (time // self.step + 1) * self.step)
+                return
+            results.append(state.result())
+            self.end += self.step
+
+    def fold(self, batch, results):
+        for element, time in zip(batch, self.times(batch)):
+            if self.end is None:
+                self.end = (time // self.step + 1) * self.step
+            else:
+                self.emit_until(time, results)
+            self.state.add(time, element)
+
+    def close(self):
+        state = self.state
+        results = []
+        while state:
+            state.evict(self.end - self.size)
+            if state:
+                results.append(state.result())
+            self.end += self.step
+        return results
+
+
+class SessionWindow(Window):
+    def __init__(self, gap, aggregate, timestamp=None):
+        _check_size(gap, "gap")
+        super().__init__(aggregate, timestamp)
+        self.gap = gap
+        self.last = None  # Time of the latest element
+
+    @property
+    def open(self):
+        return bool(self.state)
+
+    def fold(self, batch, results):
+        state = self.state
+        for element, time in zip(batch, self.times(batch)):
+            if self.last is not None and time - self.last > self.gap and state:
+                results.append(state.result())
+                state.clear()
+            state.add(time, element)
+            self.last = time
+
+    def close(self):
+        results = [self.state.result()] if self.state else []
+        self.state.clear()
+        return results
@@ -147,9 +147,19 @@ class Lexer:
     def t_eof(self, t):
         return None
 
+    # Module holding the master regular expression, so frozen() does not compile the token rules again
+    LEXTAB = 'StreamLanguage.lexer.lextab'
+
     def __init__(self, **kwargs):
         self.lexer = lex.lex(module=self, **kwargs)
 
+    @classmethod
+    def frozen(cls):
+        """
+        Build the lexer from the tables in LEXTAB (see parser/freeze.py).
+        """
+        return cls(optimize=True, lextab=cls.LEXTAB)
+
     def input(self, data):
         self.lexer.input(data)
 
@@ -0,0 +1,10 @@
+# lextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('AND', 'ASSIGN', 'ATTACH', 'BREAK', 'CALL', 'CHAIN', 'COMMA', 'CONST', 'CONTINUE', 'DIVIDE', 'ELSE', 'EOF', 'EQUALS', 'EVENT', 'FALSE', 'FEEDBACK', 'FILTEROP', 'FLOAT', 'FN', 'FOR', 'GE', 'GT', 'IDENTIFIER', 'IF', 'INT', 'LAMBDA', 'LBRACE', 'LBRACKET', 'LE', 'LPAREN', 'LT', 'MAP', 'MINUS', 'MODULUS', 'MULTIPLY', 'NE', 'NEWLINE', 'NOT', 'OR', 'PLUS', 'RBRACE', 'RBRACKET', 'REDUCE', 'RETURN', 'RPAREN', 'SBOOL', 'SEMICOLON', 'SEVENT', 'SFLOAT', 'SINT', 'SSTREAM', 'SSTRING', 'STREAM', 'STREAMMERGE', 'STREAMSPLIT', 'STRING', 'TO_STREAM', 'TRUE', 'TYPEHINTCOLON', 'VAR', 'WHILE'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive', 'MULTILINECOMMENT': 'exclusive', 'COMMENT': 'exclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_STRING>\\"[^\\"]*\\")|(?P<t_FLOAT>\\d+\\.\\d+)|(?P<t_INT>\\d+)|(?P<t_IDENTIFIER>[a-zA-Z_][a-zA-Z0-9_]*)|(?P<t_COMMENT>//.*)|(?P<t_newline>\\n+)|(?P<t_MULTILINECOMMENT>/\\*)|(?P<t_TO_STREAM>\\.toStream\\(\\))|(?P<t_OR>\\|\\|)|(?P<t_STREAMMERGE>\\+\\+)|(?P<t_AND>&&)|(?P<t_ATTACH>->)|(?P<t_CALL>\\.)|(?P<t_CHAIN>>>)|(?P<t_EQUALS>==)|(?P<t_FEEDBACK><<)|(?P<t_FILTEROP>\\?)|(?P<t_GE>>=)|(?P<t_LAMBDA>=>)|(?P<t_LBRACE>\\{)|(?P<t_LBRACKET>\\[)|(?P<t_LE><=)|(?P<t_LPAREN>\\()|(?P<t_MAP>\\$)|(?P<t_MULTIPLY>\\*)|(?P<t_NE>!=)|(?P<t_NEWLINE>\\n)|(?P<t_PLUS>\\+)|(?P<t_RBRACE>\\})|(?P<t_RBRACKET>\\])|(?P<t_REDUCE>\\^)|(?P<t_RPAREN>\\))|(?P<t_STREAMSPLIT>\\|)|(?P<t_ASSIGN>=)|(?P<t_COMMA>,)|(?P<t_DIVIDE>/)|(?P<t_GT>>)|(?P<t_LT><)|(?P<t_MINUS>-)|(?P<t_MODULUS>%)|(?P<t_NOT>!)|(?P<t_SEMICOLON>;)|(?P<t_TYPEHINTCOLON>:)', [None, ('t_STRING', 'STRING'), ('t_FLOAT', 'FLOAT'), ('t_INT', 'INT'), ('t_IDENTIFIER', 'IDENTIFIER'), ('t_COMMENT', 'COMMENT'), ('t_newline', 'newline'), ('t_MULTILINECOMMENT', 'MULTILINECOMMENT'), (None, 'TO_STREAM'), (None, 'OR'), (None, 'STREAMMERGE'), (None, 'AND'), (None, 'ATTACH'), (None, 'CALL'), (None, 'CHAIN'), (None, 'EQUALS'), (None, 'FEEDBACK'), (None, 'FILTEROP'), (None, 'GE'), (None, 'LAMBDA'), (None, 'LBRACE'), (None, 'LBRACKET'), (None, 'LE'), (None, 'LPAREN'), (None, 'MAP'), (None, 'MULTIPLY'), (None, 'NE'), (None, 'NEWLINE'), (None, 'PLUS'), (None, 'RBRACE'), (None, 'RBRACKET'), (None, 'REDUCE'), (None, 'RPAREN'), (None, 'STREAMSPLIT'), (None, 'ASSIGN'), (None, 'COMMA'), (None, 'DIVIDE'), (None, 'GT'), (None, 'LT'), (None, 'MINUS'), (None, 'MODULUS'), (None, 'NOT'), (None, 'SEMICOLON'), (None, 'TYPEHINTCOLON')])], 'MULTILINECOMMENT': [('(?P<t_MULTILINECOMMENT_newline>\\n+)|(?P<t_MULTILINECOMMENT_end>\\*/)', [None, ('t_MULTILINECOMMENT_newline', 'newline'), ('t_MULTILINECOMMENT_end', 'end')])], 'COMMENT': [('(?P<t_COMMENT_end>\\n)', [None, ('t_COMMENT_end', 'end')])]}
+_lexstateignore = {'COMMENT': ' \t', 'MULTILINECOMMENT': ' \t', 'INITIAL': ' \t'}
+_lexstateerrorf = {'COMMENT': 't_COMMENT_error', 'MULTILINECOMMENT': 't_MULTILINECOMMENT_error', 'INITIAL': 't_error'}
+_lexstateeoff = {'INITIAL': 't_eof'}
@@ -0,0 +1,41 @@
+"""
+Regenerate the tables used by Parser.frozen() and Lexer.frozen():
+
+    python -m StreamLanguage.parser.freeze
+
+Run it after changing the grammar, the precedence table or the token rules; tests/test_startup.py fails while the
+shipped tables are out of date.
+"""
+import importlib
+import os
+
+from ply import lex, yacc
+
+from StreamLanguage.lexer.lexer import Lexer
+from StreamLanguage.parser.parser import Parser
+
+
+def _module_path(module_name):
+    package, _, name = module_name.rpartition('.')
+    return os.path.join(os.path.dirname(importlib.import_module(package).__file__), name + '.py')
+
+
+def freeze():
+    """
+    Rebuild the lexer and parser tables from scratch and write them into the package. Returns the written paths.
+    """
+    paths = [_module_path(Lexer.LEXTAB), _module_path(Parser.PARSETAB)]
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+    lex.lex(module=Lexer.__new__(Lexer), optimize=True, lextab=Lexer.LEXTAB,
+            outputdir=os.path.dirname(paths[0]))
+    parser = Parser.__new__(Parser)
+    yacc.yacc(module=parser, tabmodule=Parser.PARSETAB, outputdir=os.path.dirname(paths[1]), debug=False)
+    return paths
+
+
+if __name__ == '__main__':
+    for written in freeze():
+        print(f"Wrote {written}")
@@ -0,0 +1,299 @@
+"""
+Opt-in cache of parsed programs, so running the same script again skips lexing and parsing entirely.
+
+Programs are stored in a compact form: every node becomes a tuple of plain values ``(tag, fields...)`` that marshal
+can write. Entries are kept in an in-memory LRU and, when a directory is given, in one file per program on disk.
+Keys hash the source text together with a fingerprint of the grammar (the contents of parser/parsetab.py and
+CACHE_FORMAT), so trees parsed with other parser tables are never returned. When parsetab.py changes the in-memory
+entries are dropped and the files written for the previous grammar are removed from the directory.
+
+Usage:
+    interpreter = Interpreter(parse_cache=ParseCache(directory=".slcache"))
+"""
+import hashlib
+import marshal
+import os
+from collections import OrderedDict
+
+from StreamLanguage.sl_ast.nodes.expressions import AssignmentNode, IdentifierNode, BinaryOperationNode, \
+    UnaryOperationNode
+from StreamLanguage.sl_ast.nodes.flow_control import IfNode, WhileNode, ForNode, BreakNode, ContinueNode
+from StreamLanguage.sl_ast.nodes.functions import FunctionNode, FunctionCallNode, ReturnNode
+from StreamLanguage.sl_ast.nodes.node_types import PrimitiveIntNode, PrimitiveFloatNode, PrimitiveStringNode, \
+    PrimitiveBoolNode, ArrayNode
+from StreamLanguage.sl_ast.nodes.structure import ProgramNode, VariableDeclarationNode
+from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
+from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat
+from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
+from StreamLanguage.sl_types.data_instances.primatives.string import SLString
+from StreamLanguage.sl_types.type_registry import TypeRegistry
+
+
+CACHE_FORMAT = 2  # Bump when the encoding below changes
+PARSETAB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parsetab.py')
+FILE_SUFFIX = '.slc'
+GRAMMAR_FILE = 'grammar'  # Fingerprint of the grammar the files in a cache directory were written for
+
+
+class UnencodableNodeError(Exception):
+    """
+    Raised when a tree contains something the cache cannot serialize. Such programs are simply not cached.
+    """
+
+
+def grammar_fingerprint(parsetab_path=PARSETAB_PATH):
+    digest = hashlib.sha256(f"StreamLanguage parse cache format {CACHE_FORMAT}\n".encode())
+    try:
+        with open(parsetab_path, 'rb') as file:
+            digest.update(file.read())
+    except OSError:
+        digest.update(b"no parser tables")
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    In-memory LRU of encoded programs, optionally backed by a directory.
+
+    Attributes:
+        hits (int): Lookups answered from memory or disk.
+        disk_hits (int): The part of hits that had to be read from disk.
+        misses (int): Lookups that had to parse the source.
+    """
+
+    def __init__(self, directory=None, max_entries=128, parsetab_path=PARSETAB_PATH):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.parsetab_path = parsetab_path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._parsetab_stamp = None
+        self._fingerprint = None
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self._check_grammar()
+
+    def parse(self, parser, text):
+        """
+        Return the ProgramNode for text, parsing it with parser only when it is not cached.
+        Every call returns a new tree, so callers may annotate or modify it.
+        """
+        self._check_grammar()
+        key = self.key(text)
+
+        encoded = self._entries.get(key)
+        if encoded is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return decode(encoded)
+
+        encoded = self._read(key)
+        if encoded is not None:
+            self._remember(key, encoded)
+            self.hits += 1
+            self.disk_hits += 1
+            return decode(encoded)
+
+        self.misses += 1
+        tree = parser.parse(text)
+        if tree is not None:  # Programs with syntax errors are not cached
+            try:
+                encoded = encode(tree)
+            except UnencodableNodeError:
+                return tree
+            self._remember(key, encoded)
+            self._write(key, encoded)
+        return tree
+
+    def key(self, text):
+        return hashlib.sha256(f"{self._fingerprint}\n{text}".encode()).hexdigest()
+
+    def stats(self):
+        return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+    def clear(self):
+        """
+        Forget every entry, in memory and on disk. The counters are kept.
+        """
+        self._entries.clear()
+        if self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith(FILE_SUFFIX):
+                    os.remove(os.path.join(self.directory, name))
+
+    def _check_grammar(self):
+        """
+        Recompute the grammar fingerprint when parsetab.py changed, dropping everything cached for the old grammar.
+        """
+        try:
+            status = os.stat(self.parsetab_path)
+            stamp = (status.st_mtime_ns, status.st_size)
+        except OSError:
+            stamp = None
+        if self._fingerprint is not None and stamp == self._parsetab_stamp:
+            return
+
+        self._parsetab_stamp = stamp
+        fingerprint = grammar_fingerprint(self.parsetab_path)
+        if fingerprint == self._fingerprint:
+            return
+        self._fingerprint = fingerprint
+        self._entries.clear()
+
+        if self.directory is not None:
+            grammar_file = os.path.join(self.directory, GRAMMAR_FILE)
+            try:
+                with open(grammar_file) as file:
+                    stored = file.read().strip()
+            except OSError:
+                stored = None
+            if stored != fingerprint:
+                self.clear()
+                with open(grammar_file, 'w') as file:
+                    file.write(fingerprint)
+
+    def _remember(self, key, encoded):
+        self._entries[key] = encoded
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + FILE_SUFFIX)
+
+    def _read(self, key):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                return marshal.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError):
+            # Truncated or corrupt entry, parse again and overwrite it
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def _write(self, key, encoded):
+        if self.directory is None:
+            return
+        path = self._path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, 'wb') as file:
+                marshal.dump(encoded, file)
+            os.replace(temporary, path)  # Readers never see a partially written entry
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+
+# Encoding
+
+def _type_name(meta_type):
+    return meta_type.name if meta_type is not None else None
+
+
+def _meta_type(name):
+    return TypeRegistry.get_meta_type_by_name(name) if name is not None else None
+
+
+def _encode_block(nodes):
+    return tuple(encode(node) for node in nodes)
+
+
+def encode(node):
+    """
+    Encode a tree produced by the parser as nested tuples of plain values.
+    """
+    encoder = _ENCODERS.get(type(node))
+    if encoder is None:
+        raise UnencodableNodeError(f"Cannot encode {type(node).__name__}")
+    return encoder(node)
+
+
+def _encode_primitive(tag, value_type):
+    def encoder(node):
+        if not isinstance(node.value, value_type):
+            raise UnencodableNodeError(f"Cannot encode primitive value {node.value!r}")
+        return tag, node.value.value
+    return encoder
+
+
+_ENCODERS = {
+    ProgramNode: lambda node: ('program', _encode_block(node.nodes)),
+    VariableDeclarationNode: lambda node: (
+        'var', node.identifier.name, _type_name(node.type_hint), encode(node.value) if node.value else None,
+        node.constant),
+    FunctionNode: lambda node: (
+        'fn', node.name, tuple(parameter.name for parameter in node.parameters), _encode_block(node.body),
+        _type_name(node.return_type), tuple(node.nonlocals) if node.nonlocals is not None else None),
+    FunctionCallNode: lambda node: ('call', node.function.name, _encode_block(node.arguments)),
+    ReturnNode: lambda node: ('return', encode(node.value) if node.value is not None else None),
+    IfNode: lambda node: (
+        'if', encode(node.condition), _encode_block(node.then_block),
+        _encode_block(node.else_block) if node.else_block else None),
+    WhileNode: lambda node: ('while', encode(node.condition), _encode_block(node.body)),
+    ForNode: lambda node: (
+        'for', encode(node.initializer), encode(node.condition), encode(node.increment), _encode_block(node.body)),
+    BreakNode: lambda node: ('break',),
+    ContinueNode: lambda node: ('continue',),
+    IdentifierNode: lambda node: ('id', node.name),
+    AssignmentNode: lambda node: ('assign', node.target.name, encode(node.value)),
+    BinaryOperationNode: lambda node: ('binop', node.operator, encode(node.left), encode(node.right)),
+    UnaryOperationNode: lambda node: ('unop', node.operator, encode(node.operand)),
+    ArrayNode: lambda node: ('array', _encode_block(node.elements)),
+    PrimitiveIntNode: _encode_primitive('int', SLInteger),
+    PrimitiveFloatNode: _encode_primitive('float', SLFloat),
+    PrimitiveStringNode: _encode_primitive('string', SLString),
+    PrimitiveBoolNode: _encode_primitive('bool', SLBoolean),
+}
+
+
+# Decoding
+
+def _decode_block(encoded_nodes):
+    return [decode(encoded) for encoded in encoded_nodes]
+
+
+def decode(encoded):
+    """
+    Rebuild a tree from the output of encode.
+    """
+    return _DECODERS[encoded[0]](*encoded[1:])
+
+
+_DECODERS = {
+    'program': lambda nodes: ProgramNode(_decode_block(nodes)),
+    'var': lambda name, type_hint, value, constant: VariableDeclarationNode(
+        IdentifierNode(name), _meta_type(type_hint), decode(value) if value is not None else None, constant),
+    'fn': lambda name, parameters, body, return_type, nonlocals: FunctionNode(
+        IdentifierNode(name), [IdentifierNode(parameter) for parameter in parameters], _decode_block(body),
+        return_type=_meta_type(return_type), nonlocals=list(nonlocals) if nonlocals is not None else None),
+    'call': lambda name, arguments: FunctionCallNode(IdentifierNode(name), _decode_block(arguments)),
+    'return': lambda value: ReturnNode(decode(value) if value is not None else None),
+    'if': lambda condition, then_block, else_block: IfNode(
+        decode(condition), _decode_block(then_block), _decode_block(else_block) if else_block is not None else None),
+    'while': lambda condition, body: WhileNode(decode(condition), _decode_block(body)),
+    'for': lambda initializer, condition, increment, body: ForNode(
+        decode(initializer), decode(condition), decode(increment), _decode_block(body)),
+    'break': lambda: BreakNode(),
+    'continue': lambda: ContinueNode(),
+    'id': lambda name: IdentifierNode(name),
+    'assign': lambda name, value: AssignmentNode(IdentifierNode(name), decode(value)),
+    'binop': lambda operator, left, right: BinaryOperationNode(operator, decode(left), decode(right)),
+    'unop': lambda operator, operand: UnaryOperationNode(operator, decode(operand)),
+    'array': lambda elements: ArrayNode(_decode_block(elements)),
+    'int': lambda value: PrimitiveIntNode(SLInteger(value)),
+    'float': lambda value: PrimitiveFloatNode(SLFloat(value)),
+    'string': lambda value: PrimitiveStringNode(SLString(value)),
+    'bool': lambda value: PrimitiveBoolNode(SLBoolean(value)),
+}
@@ -159,7 +159,7 @@ class Parser:
             identifier = IdentifierNode(p[2][0])
             type_hint = p[2][1]
             value = p[2][2]
-            p[0] = VariableDeclarationNode(identifier, type_hint, value)
+            p[0] = VariableDeclarationNode(identifier, type_hint, value, constant=p[1] == 'const')
 
     # Variable Declaration
     def p_declaration_base(self, p):
@@ -367,11 +367,23 @@ class Parser:
         else:
             print("Syntax error at EOF")
 
-    def __init__(self, **kwargs):
+    # Module holding the LALR tables generated for this grammar
+    PARSETAB = 'StreamLanguage.parser.parsetab'
+
+    def __init__(self, lexer=None, **kwargs):
         self.parser = yacc.yacc(module=self, **kwargs)
-        self.lexer = Lexer()
+        self.lexer = lexer if lexer is not None else Lexer()
         self.string_lines = []
 
+    @classmethod
+    def frozen(cls):
+        """
+        Build the parser from the tables shipped in the package, for short-lived processes: the tables are not checked
+        against the grammar and nothing (parser.out, parsetab.py, lextab.py) is written. The shipped tables are checked
+        by the tests; regenerate them with `python -m StreamLanguage.parser.freeze` after changing the grammar.
+        """
+        return cls(lexer=Lexer.frozen(), tabmodule=cls.PARSETAB, optimize=True, write_tables=False, debug=False)
+
     def parse(self, data, lexer=None, debug=False):
         if lexer is None:
             lexer = self.lexer
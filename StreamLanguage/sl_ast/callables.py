@@ -3,6 +3,8 @@ from contextlib import contextmanager
 
 from StreamLanguage.sl_ast.exceptions import ReturnException, SLTypeError
 from StreamLanguage.exceptions import SLException
+from StreamLanguage.interpreter.callframe import error_stack_trace
+from StreamLanguage.interpreter.flow_manager import JUMPS, RETURN
 
 
 @contextmanager
@@ -52,6 +54,12 @@ class Callable:
         """
         raise NotImplementedError("This method should be overridden by subclasses")
 
+    def unwrap(self):
+        """
+        The callable whose body runs when this one is invoked; wrappers return the callable they wrap.
+        """
+        return self
+
     def _check_argument_count(self, args):
         """
         Check if the number of arguments passed matches the expected count.
@@ -94,7 +102,7 @@ class Callable:
 
 
 class CallableFunction(Callable):
-    def __init__(self, name, parameters, body, return_type=None):
+    def __init__(self, name, parameters, body, return_type=None, nonlocals=None, pure=False):
 
         if parameters is None:
             parameters = []
@@ -102,28 +110,43 @@ class CallableFunction(Callable):
         self.name = name
         self.parameters = parameters
         self.body = body
+        self.nonlocals = nonlocals  # Names resolved in the calling scopes instead of the global scope
+        self.pure = pure  # Result depends only on the arguments (sl_ast.purity), so calls may be memoized
 
     def invoke(self, *args, context):
         """
         Invoke the function with the provided arguments within the given context.
         """
-        with function_call_context(context, self, args):
-            # Evaluate each statement in the function body
-            for node in self.body:
-                node.evaluate(context)
-
-                # Check for return signal
-                if context.control_flow.should_return:
-                    return_value = context.control_flow.return_value
-                    metadata = context.control_flow.return_metadata
-
-                    self.handle_return_metadata(metadata)
-                    return return_value
-
-                # Handle unexpected break/continue signals
-                if context.control_flow.should_break or context.control_flow.should_continue:
+        while True:
+            with function_call_context(context, self, args):
+                # Evaluate each statement in the function body
+                for node in self.body:
+                    node.evaluate(context)
+
+                    state = context.control_flow.state & JUMPS
+                    if not state:
+                        continue
+
+                    # Check for return signal
+                    if state & RETURN:
+                        tail_call = context.control_flow.tail_call
+                        if tail_call is not None:
+                            function, arguments = tail_call
+                            if function.unwrap() is not self:
+                                return function.invoke(*arguments, context=context)
+                            args = arguments
+                            break  # Leave this call and restart it with the new arguments
+
+                        return_value = context.control_flow.return_value
+                        metadata = context.control_flow.return_metadata
+
+                        self.handle_return_metadata(metadata)
+                        return return_value
+
+                    # Unexpected break/continue signal
                     raise SLException("Invalid 'break' or 'continue' outside of a loop")
-            return None  # Function completed without a return statement
+                else:
+                    return None  # Function completed without a return statement
 
     def handle_return_metadata(self, metadata):
         # Process or log the metadata as needed
@@ -135,4 +158,6 @@ class CallableFunction(Callable):
 
 def handle_error(self, e, context):
     error_message = f"Error in function '{self.name}': {str(e)}"
-    raise SLException(error_message)
+    error = SLException(error_message)
+    error.stack_trace = error_stack_trace(e) or context.capture_stack()
+    raise error
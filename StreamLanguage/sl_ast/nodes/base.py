@@ -1,10 +1,31 @@
-import uuid
+from functools import partial
+from itertools import count
+
 from StreamLanguage.sl_ast.exceptions import ParserError
 
+_block_ids = count(1)
+
+
+def new_block_id() -> int:
+    """
+    Allocate a process-wide unique block identifier. Nodes only ask for one when an identifier is first read
+    (entering the block, an error message), so parsing does not pay for identifiers nobody uses.
+    """
+    return next(_block_ids)
+
+
 class ParserNode:
+    __slots__ = ('token', '_block_uuid')
+
     def __init__(self, token, block_uuid=None):
         self.token = token  # The token representing the node in the syntax tree
-        self.block_uuid = block_uuid or str(uuid.uuid4())  # Unique identifier for the block
+        self._block_uuid = block_uuid  # Unique identifier for the block, allocated by block_uuid when first read
+
+    @property
+    def block_uuid(self):
+        if self._block_uuid is None:
+            self._block_uuid = new_block_id()
+        return self._block_uuid
 
     def children(self) -> list['ParserNode']:
         # Default implementation returns an empty list, override in derived classes
@@ -13,6 +34,13 @@ class ParserNode:
     def evaluate(self, context):
         raise NotImplementedError("Each node must implement 'evaluate' method for execution.")
 
+    def deferred(self, context):
+        """
+        The value of this node as a function taking no arguments, evaluated only if and when it is called. Lets an
+        operation skip the operands it does not need, see interpreter.operations.LAZY_OPERATORS.
+        """
+        return partial(self.evaluate, context)
+
     def get_type(self, context):
         raise NotImplementedError("Each node must implement 'get_type' method for type checking.")
 
@@ -1,21 +1,34 @@
-import uuid
-
 from StreamLanguage.sl_ast.block_types import BlockType, BlockFlags
-from StreamLanguage.sl_ast.nodes.base import ParserNode
+from StreamLanguage.sl_ast.nodes.base import ParserNode, new_block_id
 from StreamLanguage.sl_ast.nodes.functions import ReturnNode
 from StreamLanguage.sl_ast.exceptions import ReturnException, ParserError
 from StreamLanguage.exceptions import SLException
+from StreamLanguage.interpreter.flow_manager import RAISE
 
 
 
 
 class TryCatchNode(ParserNode):
     BLOCK_TYPE = BlockType.TRY
+    __slots__ = ('try_block', 'catch_clauses', 'finally_block', 'try_slots', 'catch_slots', 'catch_addresses',
+                 'finally_slots', 'try_scoped', 'catch_scoped', 'finally_scoped', '_handlers')
+
     def __init__(self, try_block, catch_clauses, finally_block=None):
         super().__init__('try_catch')
         self.try_block = try_block
         self.catch_clauses = catch_clauses  # List of tuples (exception_var, exception_type, handler_block)
         self.finally_block = finally_block
+        # Frame slots declared in each block and lexical addresses of the exception variables, set by sl_ast.resolver
+        self.try_slots = None
+        self.catch_slots = [None] * len(catch_clauses)
+        self.catch_addresses = [None] * len(catch_clauses)
+        self.finally_slots = None
+        # Whether each block needs a symbol table, cleared by sl_ast.scopes
+        self.try_scoped = True
+        self.catch_scoped = [True] * len(catch_clauses)
+        self.finally_scoped = True
+        # Index of the catch clause handling each exception type raised here so far, see handler_index
+        self._handlers = {}
 
     def set_block_types(self, context):
         # Set block type for the try block
@@ -23,11 +36,11 @@ class TryCatchNode(ParserNode):
 
         # Set block type for the catch block if it exists
         if self.catch_clauses:
-            context.enter_block(str(uuid.uuid4()), BlockType.CATCH)
+            context.enter_block(new_block_id(), BlockType.CATCH)
 
         # Set block type for the finally block if it exists
         if self.finally_block:
-            context.enter_block(str(uuid.uuid4()), BlockType.FINALLY)
+            context.enter_block(new_block_id(), BlockType.FINALLY)
 
 
     def children(self):
@@ -41,50 +54,44 @@ class TryCatchNode(ParserNode):
     def evaluate(self, context):
         exception_caught = False
         try:
-            with context.block_context(BlockType.TRY, self.block_uuid):
+            with context.block_context(BlockType.TRY, self.block_uuid, self.try_scoped):
                 for node in self.try_block:
                     node.evaluate(context)
                     # Check for control flow signals
-                    if (context.control_flow.should_return or context.control_flow.should_break or
-                            context.control_flow.should_continue or context.control_flow.should_raise):
+                    if context.control_flow.state:
                         break
         except SLException as e:
             # Should not occur; exceptions are handled via control flow manager
             self.handle_error(e, context)
         finally:
-            if context.control_flow.should_raise and not exception_caught:
+            if context.control_flow.state & RAISE and not exception_caught:
                 exception = context.control_flow.exception
                 # Attempt to handle the exception in the catch clauses
-                handled = False
-                for exception_var, exception_type, handler_block in self.catch_clauses:
-                    if self.exception_matches(exception, exception_type):
-                        handled = True
-                        exception_caught = True
-                        with context.block_context(BlockType.CATCH, str(uuid.uuid4())):
-                            # Bind the exception to a variable in the catch block
-                            if exception_var:
-                                context.declare_variable(exception_var, t=exception.type_descriptor, v=exception)
-                            for node in handler_block:
-                                node.evaluate(context)
-                                # Check for control flow signals
-                                if (context.control_flow.should_return or context.control_flow.should_break or
-                                        context.control_flow.should_continue or context.control_flow.should_raise):
-                                    break
-                        # Reset the exception signal since it's been handled
-                        context.control_flow.should_raise = False
-                        context.control_flow.exception = None
-                        break
-                if not handled:
+                index = self.handler_index(exception.type_descriptor)
+                if index is None:
                     # If not handled, propagate the exception upwards
                     return
+                exception_caught = True
+                exception_var, _, handler_block = self.catch_clauses[index]
+                with context.block_context(BlockType.CATCH, new_block_id(), self.catch_scoped[index]):
+                    # Bind the exception to a variable in the catch block
+                    if exception_var:
+                        context.declare_variable(exception_var, t=exception.type_descriptor, v=exception)
+                    for node in handler_block:
+                        node.evaluate(context)
+                        # Check for control flow signals
+                        if context.control_flow.state:
+                            break
+                # Reset the exception signal since it's been handled
+                context.control_flow.clear(RAISE)
+                context.control_flow.exception = None
             # Always execute the finally block if it exists
             if self.finally_block:
-                with context.block_context(BlockType.FINALLY, str(uuid.uuid4())):
+                with context.block_context(BlockType.FINALLY, new_block_id(), self.finally_scoped):
                     for node in self.finally_block:
                         node.evaluate(context)
                         # Check for control flow signals
-                        if (context.control_flow.should_return or context.control_flow.should_break or
-                                context.control_flow.should_continue or context.control_flow.should_raise):
+                        if context.control_flow.state:
                             break
 
     def exception_matches(self, exception_instance, exception_type):
@@ -93,6 +100,23 @@ class TryCatchNode(ParserNode):
         """
         return exception_instance.type_descriptor.is_subtype_of(exception_type)
 
+    def handler_index(self, exception_type):
+        """
+        Index of the first catch clause matching exceptions of the given type, or None if no clause does. The answer
+        is cached per type, the clause types of a node are fixed once it is built.
+        """
+        try:
+            return self._handlers[exception_type]
+        except KeyError:
+            pass
+        index = None
+        for i, (_, catch_type, _) in enumerate(self.catch_clauses):
+            if exception_type.is_subtype_of(catch_type):
+                index = i
+                break
+        self._handlers[exception_type] = index
+        return index
+
     def get_type(self, context):
         try:
             context.enter_block(self.block_uuid, BlockType.TRY)
@@ -100,12 +124,12 @@ class TryCatchNode(ParserNode):
                 node.get_type(context)
             if self.catch_block:
                 exception_type, handler_block = self.catch_block
-                context.enter_block(str(uuid.uuid4()), BlockType.CATCH)  # Enter catch block
+                context.enter_block(new_block_id(), BlockType.CATCH)  # Enter catch block
                 for node in handler_block:
                     node.get_type(context)
                 context.exit_block()
             if self.finally_block:
-                context.enter_block(str(uuid.uuid4()), BlockType.FINALLY)  # Enter finally block
+                context.enter_block(new_block_id(), BlockType.FINALLY)  # Enter finally block
                 for node in self.finally_block:
                     node.get_type(context)
                 context.exit_block()
@@ -116,6 +140,8 @@ class TryCatchNode(ParserNode):
 
 
 class ThrowNode(ParserNode):
+    __slots__ = ('exception_expression',)
+
     def __init__(self, exception_expression):
         super().__init__('throw')
         self.exception_expression = exception_expression
@@ -1,5 +1,7 @@
 from StreamLanguage.interpreter.contextN import Context
-from StreamLanguage.interpreter.symbol_table import SymbolTableEntry
+from StreamLanguage.interpreter.symbol_table import SymbolTableEntry, EntryCache
+from StreamLanguage.interpreter.flow_manager import RAISE
+from StreamLanguage.interpreter.operations import LAZY_OPERATORS, RaiseSignal
 from StreamLanguage.sl_ast.nodes.base import ParserNode
 from StreamLanguage.sl_ast.exceptions import ParserError, SLTypeError, VariableNotDeclaredError, SLValueError
 from StreamLanguage.exceptions import SLException
@@ -24,8 +26,10 @@ class AssignmentNode(ParserNode):
         value (ParserNode): The expression that evaluates to the value to be assigned.
     """
 
+    __slots__ = ('target', 'value')
+
     def __init__(self, target: "IdentifierNode", value: ParserNode):
-        super().__init__('=')  # Generate a unique UUID for this assignment node
+        super().__init__('=')
         self.target = target
         self.value = value
 
@@ -42,8 +46,7 @@ class AssignmentNode(ParserNode):
         value = self.value.evaluate(context)
 
         # Check for control flow signals
-        if (context.control_flow.should_return or context.control_flow.should_break or
-                context.control_flow.should_continue or context.control_flow.should_raise):
+        if context.control_flow.state:
             # Propagate the signal upwards
             return
 
@@ -84,11 +87,22 @@ class IdentifierNode(ParserNode):
 
     Attributes:
         name (str): The name of the identifier.
+        entry_cache (EntryCache): Global symbol table entry the name last resolved to, created on first use.
     """
 
+    __slots__ = ('name', 'address', '_entry_cache')
+
     def __init__(self, name: str):
-        super().__init__(name)  # Generate a unique UUID for this identifier
+        super().__init__(name)
         self.name = name
+        self.address = None  # Lexical address set by sl_ast.resolver, None means lookup by name
+        self._entry_cache = None
+
+    @property
+    def entry_cache(self):
+        if self._entry_cache is None:
+            self._entry_cache = EntryCache()
+        return self._entry_cache
 
     def children(self):
         # Identifiers typically don't have child nodes as they are the atomic elements of syntax
@@ -100,7 +114,10 @@ class IdentifierNode(ParserNode):
         This typically involves looking up the identifier in the context to retrieve its current value or reference.
         """
         try:
-            value = context.lookup(self.name)
+            cache = self._entry_cache
+            if cache is None:
+                cache = self._entry_cache = EntryCache()
+            value = context.lookup(self.name, cache)
             return value
         except VariableNotDeclaredError as e:
             self.handle_error(e, context)
@@ -138,11 +155,18 @@ class BinaryOperationNode(ParserNode):
         right (ParserNode): The right operand.
     """
 
+    __slots__ = ('operator', 'left', 'right', '_left_type', '_right_type', '_implementation')
+
     def __init__(self, operator: str, left: ParserNode, right: ParserNode):
         super().__init__(operator)
         self.operator = operator
         self.left = left
         self.right = right
+        # Operand types of the last evaluation and their TypeRegistry operator implementation (None when the table
+        # has none), so repeated evaluations with the same types skip the table lookup
+        self._left_type = None
+        self._right_type = None
+        self._implementation = None
 
     def children(self):
         return [self.left, self.right]
@@ -152,22 +176,44 @@ class BinaryOperationNode(ParserNode):
         left_value = self.left.evaluate(context)
 
         # Check for control flow signals
-        if (context.control_flow.should_return or context.control_flow.should_break or
-                context.control_flow.should_continue or context.control_flow.should_raise):
+        if context.control_flow.state:
             return
 
+        lazy_operation = LAZY_OPERATORS.get(self.operator)
+        if lazy_operation is not None:
+            # The right operand is only evaluated when the left one does not decide the result
+            try:
+                return self._extract_value(lazy_operation(self._extract_value(left_value),
+                                                          self.right.deferred(context)))
+            except SLException as e:
+                self.handle_error(e, context)
+
         # Evaluate right operand
         right_value = self.right.evaluate(context)
 
         # Check for control flow signals
-        if (context.control_flow.should_return or context.control_flow.should_break or
-                context.control_flow.should_continue or context.control_flow.should_raise):
+        if context.control_flow.state:
             return
 
         # Extract values
         left_value = self._extract_value(left_value)
         right_value = self._extract_value(right_value)
 
+        left_type = type(left_value)
+        right_type = type(right_value)
+        if left_type is not self._left_type or right_type is not self._right_type:
+            entry = TypeRegistry.lookup_operator(self.operator, left_type, right_type)
+            self._left_type = left_type
+            self._right_type = right_type
+            self._implementation = entry[0] if entry is not None else None
+        if self._implementation is not None:
+            try:
+                return self._implementation(left_value, right_value)
+            except RaiseSignal as signal:
+                # Division by zero, handled by the user's try/catch
+                context.control_flow.set_exception(signal.exception)
+                return None
+
         try:
             result = self.perform_operation(left_value, right_value, context)
             return result
@@ -175,8 +221,6 @@ class BinaryOperationNode(ParserNode):
             self.handle_error(e, context)
 
     def perform_operation(self, left_value: SLType, right_value: SLType, context: Context):
-        value_error_type = TypeRegistry.get_meta_type_by_name("ValueError")
-
         def division(a, b):
             """
             Perform division operation with error handling for division by zero.
@@ -188,6 +232,7 @@ class BinaryOperationNode(ParserNode):
             :return: Arithmetic result of the division
             """
             if b == 0:
+                value_error_type = TypeRegistry.get_meta_type_by_name("ValueError")
                 exception_instance = SLExceptionInstance(value_error_type, "Division by zero")
                 # Set the exception in the control flow manager
                 context.control_flow.set_exception(exception_instance)
@@ -203,6 +248,7 @@ class BinaryOperationNode(ParserNode):
             :return:
             """
             if b == 0:
+                value_error_type = TypeRegistry.get_meta_type_by_name("ValueError")
                 exception_instance = SLExceptionInstance(value_error_type, "Division by zero")
                 # Set the exception in the control flow manager
                 context.control_flow.set_exception(exception_instance)
@@ -233,7 +279,7 @@ class BinaryOperationNode(ParserNode):
 
         if self.operator in operation_methods:
             result = operation_methods[self.operator](left_value, right_value)
-            if context.control_flow.should_raise:
+            if context.control_flow.state & RAISE:
                 return None  # Stop further evaluation
             return result
         else:
@@ -309,6 +355,8 @@ class UnaryOperationNode(ParserNode):
         operand (ParserNode): The operand of the operation.
     """
 
+    __slots__ = ('operator', 'operand')
+
     def __init__(self, operator: str, operand: ParserNode):
         super().__init__(operator)
         self.operator = operator
@@ -322,8 +370,7 @@ class UnaryOperationNode(ParserNode):
         operand_value = self.operand.evaluate(context)
 
         # Check for control flow signals
-        if (context.control_flow.should_return or context.control_flow.should_break or
-                context.control_flow.should_continue or context.control_flow.should_raise):
+        if context.control_flow.state:
             return
 
         # Extract value
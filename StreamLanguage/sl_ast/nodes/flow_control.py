@@ -1,10 +1,9 @@
-import uuid
-
-from StreamLanguage.sl_ast.nodes.base import ParserNode
+from StreamLanguage.sl_ast.nodes.base import ParserNode, new_block_id
 from StreamLanguage.sl_ast.exceptions import ParserError
 from StreamLanguage.sl_ast.block_types import BlockType
 from StreamLanguage.exceptions import SLException
 from StreamLanguage.interpreter.contextN import Context
+from StreamLanguage.interpreter.flow_manager import JUMPS, RETURN, BREAK, CONTINUE
 
 
 class IfNode(ParserNode):
@@ -13,14 +12,32 @@ class IfNode(ParserNode):
     """
 
     BlockType = BlockType.IF
+    __slots__ = ('condition', '_then_block_uuid', '_else_block_uuid', 'then_block', 'else_block', 'then_slots',
+                 'else_slots', 'then_scoped', 'else_scoped')
 
     def __init__(self, condition: ParserNode, then_block: list[ParserNode], else_block:list[ParserNode] | None = None):
         super().__init__('if')
         self.condition = condition
-        self.then_block_uuid = str(uuid.uuid4())
-        self.else_block_uuid = str(uuid.uuid4()) if else_block else None
+        self._then_block_uuid = None  # Allocated when first read, like ParserNode.block_uuid
+        self._else_block_uuid = None
         self.then_block = then_block
         self.else_block = else_block
+        self.then_slots = None  # Frame slots declared in each block, set by sl_ast.resolver
+        self.else_slots = None
+        self.then_scoped = True  # Whether each block needs a symbol table, cleared by sl_ast.scopes
+        self.else_scoped = True
+
+    @property
+    def then_block_uuid(self):
+        if self._then_block_uuid is None:
+            self._then_block_uuid = new_block_id()
+        return self._then_block_uuid
+
+    @property
+    def else_block_uuid(self):
+        if self._else_block_uuid is None and self.else_block:
+            self._else_block_uuid = new_block_id()
+        return self._else_block_uuid
 
     def children(self) -> list:
         children = [self.condition] + self.then_block
@@ -31,18 +48,18 @@ class IfNode(ParserNode):
     def evaluate(self, context: Context):
         try:
             if self.condition.evaluate(context):
-                with context.block_context(BlockType.IF, self.then_block_uuid):
+                with context.block_context(BlockType.IF, self.then_block_uuid, self.then_scoped):
                     for node in self.then_block:
                         node.evaluate(context)
                         # Check for control flow signals
-                        if context.control_flow.should_return or context.control_flow.should_break or context.control_flow.should_continue:
+                        if context.control_flow.state & JUMPS:
                             break  # Stop evaluating further nodes
             elif self.else_block:
-                with context.block_context(BlockType.IF, self.else_block_uuid):
+                with context.block_context(BlockType.IF, self.else_block_uuid, self.else_scoped):
                     for node in self.else_block:
                         node.evaluate(context)
                         # Check for control flow signals
-                        if context.control_flow.should_return or context.control_flow.should_break or context.control_flow.should_continue:
+                        if context.control_flow.state & JUMPS:
                             break  # Stop evaluating further nodes
             # No need to return a value; control flow is managed via ControlFlowManager
         except SLException as e:
@@ -75,32 +92,45 @@ class WhileNode(ParserNode):
 
     BlockType = BlockType.LOOP
 
+    __slots__ = ('condition', '_body_uuid', 'body', 'body_slots', 'body_scoped')
+
     def __init__(self, condition: ParserNode, body: list[ParserNode]):
         super().__init__('while')
         self.condition = condition
-        self.body_uuid = str(uuid.uuid4())
+        self._body_uuid = None  # Allocated when first read, like ParserNode.block_uuid
         self.body = body
+        self.body_slots = None  # Frame slots declared in the loop block, set by sl_ast.resolver
+        self.body_scoped = True  # Whether the loop block needs a symbol table, cleared by sl_ast.scopes
+
+    @property
+    def body_uuid(self):
+        if self._body_uuid is None:
+            self._body_uuid = new_block_id()
+        return self._body_uuid
 
     def children(self):
         return [self.condition] + self.body
 
     def evaluate(self, context):
         try:
-            with context.block_context(BlockType.LOOP, self.body_uuid):
+            with context.block_context(BlockType.LOOP, self.body_uuid, self.body_scoped):
                 while self.condition.evaluate(context):
                     for node in self.body:
                         node.evaluate(context)
                         # Check for control flow signals
-                        if context.control_flow.should_return:
+                        state = context.control_flow.state & JUMPS
+                        if not state:
+                            continue
+                        if state & RETURN:
                             # Propagate the return signal upwards
                             return
-                        if context.control_flow.should_break:
+                        if state & BREAK:
                             # Reset the break signal and exit the loop
-                            context.control_flow.should_break = False
+                            context.control_flow.clear(BREAK)
                             return
-                        if context.control_flow.should_continue:
+                        if state & CONTINUE:
                             # Reset the continue signal and proceed to next iteration
-                            context.control_flow.should_continue = False
+                            context.control_flow.clear(CONTINUE)
                             break  # Break out of body loop to re-evaluate condition
         except SLException as e:
             self.handle_error(e, context)
@@ -128,35 +158,48 @@ class ForNode(ParserNode):
 
     BlockType = BlockType.LOOP
 
+    __slots__ = ('initializer', 'condition', 'increment', '_body_uuid', 'body', 'body_slots', 'body_scoped')
+
     def __init__(self, initializer: ParserNode, condition: ParserNode, increment: ParserNode, body: list[ParserNode]):
         super().__init__('for')
         self.initializer = initializer
         self.condition = condition
         self.increment = increment
-        self.body_uuid = str(uuid.uuid4())
+        self._body_uuid = None  # Allocated when first read, like ParserNode.block_uuid
         self.body = body
+        self.body_slots = None  # Frame slots declared in the loop block, set by sl_ast.resolver
+        self.body_scoped = True  # Whether the loop block needs a symbol table, cleared by sl_ast.scopes
+
+    @property
+    def body_uuid(self):
+        if self._body_uuid is None:
+            self._body_uuid = new_block_id()
+        return self._body_uuid
 
     def children(self):
         return [self.initializer, self.condition, self.increment] + self.body
 
     def evaluate(self, context):
         try:
-            with context.block_context(BlockType.LOOP, self.body_uuid):
+            with context.block_context(BlockType.LOOP, self.body_uuid, self.body_scoped):
                 self.initializer.evaluate(context)
                 while self.condition.evaluate(context):
                     for node in self.body:
                         node.evaluate(context)
                         # Check for control flow signals
-                        if context.control_flow.should_return:
+                        state = context.control_flow.state & JUMPS
+                        if not state:
+                            continue
+                        if state & RETURN:
                             # Propagate the return signal upwards
                             return
-                        if context.control_flow.should_break:
+                        if state & BREAK:
                             # Reset the break signal and exit the loop
-                            context.control_flow.should_break = False
+                            context.control_flow.clear(BREAK)
                             return
-                        if context.control_flow.should_continue:
+                        if state & CONTINUE:
                             # Reset the continue signal and proceed to increment and next iteration
-                            context.control_flow.should_continue = False
+                            context.control_flow.clear(CONTINUE)
                             break  # Break out to increment and re-evaluate condition
                     self.increment.evaluate(context)
         except SLException as e:
@@ -185,6 +228,8 @@ class BreakNode(ParserNode):
     A node that represents a break statement.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__('break')
 
@@ -206,6 +251,8 @@ class ContinueNode(ParserNode):
     A node that represents a continue statement.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__('continue')
 
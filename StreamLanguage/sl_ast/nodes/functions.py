@@ -1,15 +1,13 @@
-from importlib.metadata import metadata
-
 from StreamLanguage.sl_ast.nodes.base import ParserNode
 from StreamLanguage.sl_ast.nodes.expressions import IdentifierNode
 from StreamLanguage.sl_ast.nodes.flow_control import IfNode
 from StreamLanguage.sl_ast.exceptions import ParserError, FunctionNotFoundError, SLRecursionError, ReturnException, SLTypeError
 from StreamLanguage.exceptions import SLException
 from StreamLanguage.interpreter.contextN import Context
+from StreamLanguage.interpreter.function_metadata import InlineCache
 from StreamLanguage.interpreter.symbol_table import SymbolTableEntry
 from StreamLanguage.sl_ast.callables import CallableFunction
 from StreamLanguage.sl_ast.block_types import BlockType
-import uuid
 
 
 class FunctionNode(ParserNode):
@@ -24,27 +22,39 @@ class FunctionNode(ParserNode):
         parameters (list): The parameters of the function, as a list of IdentifierNodes.
         body (list): The body of the function, as a list of ParserNodes.
         return_type (type, optional): The return type of the function if explicitly specified.
+        nonlocals (list, optional): Names the function reads and assigns in the enclosing scopes instead of the
+            global scope.
+        frame_size (int): Number of frame slots of the function, set by sl_ast.resolver (None when unresolved).
+        address (int): Frame slot a nested function is declared in, set by sl_ast.resolver.
+        pure (bool): Whether calls can be memoized, set by sl_ast.purity.
     """
 
     BLOCKTYPE = BlockType.FUNCTION
-    def __init__(self, identifier_node, parameters, body, return_type=None):
+    __slots__ = ('name', 'parameters', 'body', 'return_type', 'nonlocals', 'frame_size', 'address', 'pure')
+
+    def __init__(self, identifier_node, parameters, body, return_type=None, nonlocals=None):
         if isinstance(identifier_node, str):
             identifier_node = IdentifierNode(identifier_node)
         if not isinstance(identifier_node, IdentifierNode):
             raise TypeError("Function name must be an IdentifierNode or a string")
 
-        super().__init__(identifier_node.name)  # Generate a unique UUID for this function node
+        super().__init__(identifier_node.name)
         self.name = identifier_node.name
         self.parameters = parameters
         self.body = body
         self.return_type = return_type
+        self.nonlocals = nonlocals
+        self.frame_size = None
+        self.address = None
+        self.pure = False
 
     def children(self):
         # Return all parameters and body nodes as children
         return self.parameters + self.body
 
     def evaluate(self, context: Context):
-        callable_function = CallableFunction(self.name, self.parameters, self.body, self.return_type)
+        callable_function = CallableFunction(self.name, self.parameters, self.body, self.return_type, self.nonlocals,
+                                             self.pure)
         context.declare_function(self.name, callable_function, self.parameters, self.return_type)
 
 
@@ -117,12 +127,22 @@ class FunctionCallNode(ParserNode):
     Attributes:
         function (ParserNode): The function identifier or expression resulting in a function.
         arguments (list): A list of expressions representing the function call arguments.
+        inline_cache (InlineCache): Overloads this call resolved to, created on the first call.
     """
 
+    __slots__ = ('function', 'arguments', '_inline_cache')
+
     def __init__(self, function: IdentifierNode, arguments: list[ParserNode]):
-        super().__init__('call', block_uuid=str(uuid.uuid4()))  # Generate a unique UUID for this function call
+        super().__init__('call')
         self.function = function  # IdentifierNode or similar
         self.arguments = arguments  # List of ParserNodes
+        self._inline_cache = None
+
+    @property
+    def inline_cache(self):
+        if self._inline_cache is None:
+            self._inline_cache = InlineCache()
+        return self._inline_cache
 
     def children(self):
         # Returns all nodes related to the function and its arguments
@@ -130,7 +150,8 @@ class FunctionCallNode(ParserNode):
 
     def evaluate(self, context):
         try:
-            return context.execute_function(self.function.name, self.arguments)
+            return context.execute_function(self.function.name, self.arguments, self.inline_cache,
+                                            self.function.entry_cache)
         except SLException as e:
             self.handle_error(e, context)
 
@@ -165,11 +186,16 @@ class ReturnNode(ParserNode):
 
     Attributes:
         value (ParserNode): The node representing the value being returned.
+        tail_call (bool): Whether the value is a call of the enclosing function that restarts it instead of nesting,
+            set by sl_ast.tail_calls.
     """
 
+    __slots__ = ('value', 'tail_call')
+
     def __init__(self, value):
-        super().__init__('return', block_uuid=str(uuid.uuid4()))  # Generate a unique UUID for this return statement
+        super().__init__('return')
         self.value = value
+        self.tail_call = False
 
     def children(self):
         # Return the value node as it is the only child of a return statement
@@ -183,7 +209,16 @@ class ReturnNode(ParserNode):
         This evaluates the expression of the return value and handles the control transfer back to the caller.
         """
         try:
-            with context.block_context(BlockType.RETURN, self.block_uuid):
+            # The returned expression declares nothing, the block only marks where returns are allowed
+            with context.block_context(BlockType.RETURN, self.block_uuid, scoped=False):
+                if self.tail_call:
+                    # The calling function decides whether the call restarts it, see CallableFunction.invoke
+                    arguments = [argument.evaluate(context) for argument in self.value.arguments]
+                    call = self.value
+                    overload = context.lookup_function(call.function.name, arguments, call.inline_cache,
+                                                       call.function.entry_cache)
+                    context.control_flow.set_tail_call(overload.implementation, arguments)
+                    return
                 return_value = self.value.evaluate(context) if self.value else None
 
                 # Capture block info and stack trace
@@ -192,8 +227,8 @@ class ReturnNode(ParserNode):
                     'node': self,
                 }
 
-                # Get the current stack trace from the context's call stack
-                stack_trace = context.get_call_stack_trace()
+                # Snapshot of the context's call stack, only formatted if it is ever reported
+                stack_trace = context.capture_stack()
 
                 metadata = {
                     'block_info': block_info,
@@ -231,6 +266,8 @@ class ReturnNode(ParserNode):
 
 
 class LambdaNode(ParserNode):
+    __slots__ = ('parameters', 'body')
+
     def __init__(self, parameters, body):
         super().__init__('lambda')
         self.parameters = parameters
@@ -258,6 +295,8 @@ class LambdaNode(ParserNode):
 
 
 class ApplyNode(ParserNode):
+    __slots__ = ('function', 'arguments')
+
     def __init__(self, function, arguments):
         super().__init__('apply')
         self.function = function
@@ -1,6 +1,7 @@
 from StreamLanguage.sl_ast.nodes.base import ParserNode
 from StreamLanguage.sl_ast.exceptions import ParserError
 from StreamLanguage.exceptions import SLException
+from StreamLanguage.interpreter.flow_manager import JUMPS
 from StreamLanguage.sl_types.data_instances.collections.array import SLArray
 from StreamLanguage.sl_types.meta_type.collections.array_type import SLArrayType
 from StreamLanguage.sl_types.meta_type.primatives.boolean_type import SLBooleanType
@@ -17,8 +18,10 @@ class PrimitiveDataNode(ParserNode):
         value: The actual data value stored in the node.
     """
 
+    __slots__ = ('value', 'node_type')
+
     def __init__(self, value, node_type = None):
-        super().__init__(str(value))  # Generate a unique UUID for this primitive data node
+        super().__init__(str(value))
         self.value = value
         self.node_type = node_type
 
@@ -46,26 +49,36 @@ class PrimitiveDataNode(ParserNode):
 
 
 class PrimitiveIntNode(PrimitiveDataNode):
+    __slots__ = ()
+
     def __init__(self, value):
         super().__init__(value, SLIntegerType())
 
 
 class PrimitiveFloatNode(PrimitiveDataNode):
+    __slots__ = ()
+
     def __init__(self, value):
         super().__init__(value, SLFloatType())
 
 
 class PrimitiveStringNode(PrimitiveDataNode):
+    __slots__ = ()
+
     def __init__(self, value):
         super().__init__(value, SLStringType())
 
 
 class PrimitiveBoolNode(PrimitiveDataNode):
+    __slots__ = ()
+
     def __init__(self, value):
         super().__init__(value, SLBooleanType())
 
 
 class ArrayNode(ParserNode):
+    __slots__ = ('elements',)
+
     def __init__(self, elements):
         super().__init__('array')
         self.elements = elements
@@ -80,7 +93,7 @@ class ArrayNode(ParserNode):
             for element in self.elements:
                 value = element.evaluate(context)
                 # Check for control flow signals
-                if context.control_flow.should_return or context.control_flow.should_break or context.control_flow.should_continue:
+                if context.control_flow.state & JUMPS:
                     # Propagate the signal upwards
                     return
                 result.append(value)
@@ -2,11 +2,15 @@ from StreamLanguage.sl_ast.nodes.base import ParserNode
 from StreamLanguage.sl_ast.exceptions import ParserError, VariableRedeclaredError, SLTypeError
 from StreamLanguage.sl_ast.block_types import BlockType
 from StreamLanguage.exceptions import SLException
+from StreamLanguage.interpreter.callframe import error_stack_trace
 from StreamLanguage.interpreter.contextN import Context
+from StreamLanguage.interpreter.flow_manager import JUMPS, RETURN, BREAK, CONTINUE
 from StreamLanguage.sl_types.base import SLType
 
 
 class ProgramNode(ParserNode):
+    __slots__ = ('nodes',)
+
     def __init__(self, nodes):
         super().__init__('program')
         self.nodes = nodes
@@ -20,15 +24,16 @@ class ProgramNode(ParserNode):
                 for node in self.nodes:
                     node.evaluate(context)
                     # Check for control flow signals
-                    if context.control_flow.should_return:
-                        context.control_flow.should_return = False
+                    state = context.control_flow.state & JUMPS
+                    if not state:
+                        continue
+                    if state & RETURN:
+                        context.control_flow.clear(RETURN)
                         context.control_flow.return_value = None
                         raise ParserError("Return statement outside function", node=node)
-                    if context.control_flow.should_break or context.control_flow.should_continue:
-                        # Reset break and continue signals
-                        context.control_flow.should_break = False
-                        context.control_flow.should_continue = False
-                        raise ParserError(f"{'Break' if context.control_flow.should_break else 'Continue'} statement outside loop", node=node)
+                    # Reset break and continue signals
+                    context.control_flow.clear(BREAK | CONTINUE)
+                    raise ParserError(f"{'Break' if state & BREAK else 'Continue'} statement outside loop", node=node)
         except SLException as e:
             self.handle_error(e, context)
 
@@ -41,7 +46,9 @@ class ProgramNode(ParserNode):
 
     def handle_error(self, error, context):
         error_message = f"Error in program block UUID {self.block_uuid}: {str(error)}"
-        raise ParserError(error_message, node=self)
+        reported = ParserError(error_message, node=self)
+        reported.stack_trace = error_stack_trace(error)  # Where the error left the innermost function
+        raise reported
 
 
 class VariableDeclarationNode(ParserNode):
@@ -50,18 +57,23 @@ class VariableDeclarationNode(ParserNode):
     - identifier (IdentifierNode): The name of the variable being declared.
     - type_hint (type, optional): Optional type hint for the variable, for statically typed languages or type inference.
     - value (ParserNode, optional): The initial value assigned to the variable.
+    - constant (bool): Whether the variable was declared with 'const'.
 
     Attributes:
         identifier (IdentifierNode): The identifier node for the variable name.
         type_hint (type): Optional type hint for the variable.
         value (ParserNode): Optional initial value node.
+        constant (bool): True for 'const' declarations, which sl_ast.optimizer may propagate.
     """
 
-    def __init__(self, identifier, type_hint=None, value=None):
+    __slots__ = ('identifier', 'type_hint', 'value', 'constant')
+
+    def __init__(self, identifier, type_hint=None, value=None, constant=False):
         super().__init__('var_decl')
         self.identifier = identifier
         self.type_hint = type_hint
         self.value = value
+        self.constant = constant
 
     def children(self):
         children = [self.identifier]
@@ -81,7 +93,7 @@ class VariableDeclarationNode(ParserNode):
                 value_type = value.type_descriptor
 
                 # If a type hint is provided, check for type compatibility
-                if self.type_hint and value_type != self.type_hint:
+                if self.type_hint and value_type is not self.type_hint and value_type != self.type_hint:
                     raise SLTypeError(f"Type mismatch: Variable '{self.identifier.name}' expected type {self.type_hint}, but got {value_type}")
 
                 context.declare_variable(self.identifier.name, t=value_type, v=value)
@@ -0,0 +1,373 @@
+"""
+Constant folding pass, run on a parsed ProgramNode before any engine executes it.
+
+- Binary and unary operations whose operands are primitives are computed once and replaced by a primitive node.
+  Operations that fail (division or modulus by zero, unsupported operand types) are left in place, so they fail when
+  executed exactly as before: division by zero still reaches ControlFlowManager.set_exception and user try/catch.
+- 'const' declarations with a constant value are propagated to the references that can only see that declaration,
+  as long as no assignment anywhere in the program targets the name.
+- Identities are removed where the result cannot change: x * 1, 1 * x and x - 0 for numeric x, x + 0 and 0 + x for
+  integer x (a float -0.0 would become 0.0), and !!b where only the truth of the value is used (conditions and the
+  operand of '!', so !!!b becomes !b).
+
+Whether x is numeric is decided per name over the whole program: a variable is an integer (or a number) when every
+declaration and assignment of that name stores an integer (or number) expression. Parameters, catch variables and
+declarations without a value make a name unknown.
+
+Programs containing nodes this pass does not know (lambdas, apply) only get operations on literals folded.
+"""
+from StreamLanguage.interpreter.operations import BINARY_OPERATORS, UNARY_OPERATORS
+from StreamLanguage.sl_ast.nodes.error_handling import TryCatchNode, ThrowNode
+from StreamLanguage.sl_ast.nodes.expressions import AssignmentNode, IdentifierNode, BinaryOperationNode, \
+    UnaryOperationNode
+from StreamLanguage.sl_ast.nodes.flow_control import IfNode, WhileNode, ForNode, BreakNode, ContinueNode
+from StreamLanguage.sl_ast.nodes.functions import FunctionNode, FunctionCallNode, ReturnNode
+from StreamLanguage.sl_ast.nodes.node_types import PrimitiveDataNode, PrimitiveIntNode, PrimitiveFloatNode, \
+    PrimitiveStringNode, PrimitiveBoolNode, ArrayNode
+from StreamLanguage.sl_ast.nodes.structure import ProgramNode, VariableDeclarationNode
+from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
+from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat
+from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
+from StreamLanguage.sl_types.data_instances.primatives.string import SLString
+
+
+PRIMITIVE_NODES = {
+    SLInteger: PrimitiveIntNode,
+    SLFloat: PrimitiveFloatNode,
+    SLString: PrimitiveStringNode,
+    SLBoolean: PrimitiveBoolNode,
+}
+
+# Kinds of values, from most to least precise
+INT = 'int'
+NUMBER = 'number'
+
+_NUMERIC_OPERATORS = ('+', '-', '*', '/', '%')
+
+
+def _join(first, second):
+    if first is None or second is None:
+        return None
+    return INT if first == second == INT else NUMBER
+
+
+def _is_int_literal(node, value):
+    return type(node) is PrimitiveIntNode and type(node.value) is SLInteger and node.value.value == value
+
+
+class _Definitions:
+    """
+    Everything stored in each name anywhere in the program: the assignments made to it and the expressions stored by
+    declarations and assignments (None for values not known statically).
+    """
+
+    def __init__(self):
+        self.assigned = set()
+        self.values = {}
+        self.complete = True  # False when the program contains nodes that were not scanned
+
+    def define(self, name, value):
+        self.values.setdefault(name, []).append(value)
+
+    def scan_block(self, nodes):
+        for node in nodes:
+            self.scan(node)
+
+    def scan(self, node):
+        if node is None or isinstance(node, (IdentifierNode, PrimitiveDataNode, BreakNode, ContinueNode)):
+            return
+        if isinstance(node, VariableDeclarationNode):
+            self.define(node.identifier.name, node.value)
+            self.scan(node.value)
+        elif isinstance(node, AssignmentNode):
+            self.assigned.add(node.target.name)
+            self.define(node.target.name, node.value)
+            self.scan(node.value)
+        elif isinstance(node, FunctionNode):
+            self.define(node.name, None)
+            for parameter in node.parameters:
+                self.define(parameter.name, None)
+            self.scan_block(node.body)
+        elif isinstance(node, ProgramNode):
+            self.scan_block(node.nodes)
+        elif isinstance(node, BinaryOperationNode):
+            self.scan(node.left)
+            self.scan(node.right)
+        elif isinstance(node, UnaryOperationNode):
+            self.scan(node.operand)
+        elif isinstance(node, FunctionCallNode):
+            self.scan_block(node.arguments)
+        elif isinstance(node, ArrayNode):
+            self.scan_block(node.elements)
+        elif isinstance(node, ReturnNode):
+            self.scan(node.value)
+        elif isinstance(node, ThrowNode):
+            self.scan(node.exception_expression)
+        elif isinstance(node, IfNode):
+            self.scan(node.condition)
+            self.scan_block(node.then_block)
+            self.scan_block(node.else_block or [])
+        elif isinstance(node, WhileNode):
+            self.scan(node.condition)
+            self.scan_block(node.body)
+        elif isinstance(node, ForNode):
+            self.scan(node.initializer)
+            self.scan(node.condition)
+            self.scan(node.increment)
+            self.scan_block(node.body)
+        elif isinstance(node, TryCatchNode):
+            self.scan_block(node.try_block)
+            for exception_var, _, handler_block in node.catch_clauses:
+                if exception_var:
+                    self.define(exception_var, None)
+                self.scan_block(handler_block)
+            self.scan_block(node.finally_block or [])
+        else:
+            self.complete = False
+
+
+class ConstantFolder:
+    def __init__(self):
+        self.scopes = None  # Name to constant primitive node (None for other variables), innermost scope last
+        self.kinds = {}  # Name to INT or NUMBER for variables that only ever hold such values
+        self.assigned = set()  # Names assigned anywhere, their 'const' declarations are not propagated
+        self.propagate = False
+
+    def fold_program(self, program: ProgramNode):
+        definitions = _Definitions()
+        definitions.scan(program)
+        self.propagate = definitions.complete
+        self.assigned = definitions.assigned
+        self.kinds = self.infer_kinds(definitions) if definitions.complete else {}
+
+        self.scopes = [{}]  # The program scope, also seen by functions
+        nodes = program.nodes
+        for index, node in enumerate(nodes):
+            nodes[index] = self.fold_statement(node)
+        return program
+
+    def infer_kinds(self, definitions):
+        """
+        Find the names that only ever hold integers or numbers. Starts from every name being an integer and widens
+        until every definition fits, so variables defined in terms of themselves (i = i + 1) keep their kind.
+        """
+        kinds = {name: INT for name in definitions.values}
+        changed = True
+        while changed:
+            changed = False
+            for name, values in definitions.values.items():
+                kind = kinds[name]
+                if kind is None:
+                    continue
+                for value in values:
+                    kind = _join(kind, self.kind_of(value, kinds) if value is not None else None)
+                if kind != kinds[name]:
+                    kinds[name] = kind
+                    changed = True
+        return {name: kind for name, kind in kinds.items() if kind is not None}
+
+    def kind_of(self, node, kinds=None):
+        kinds = self.kinds if kinds is None else kinds
+        node_type = type(node)
+        if node_type is PrimitiveIntNode:
+            return INT if type(node.value) is SLInteger else None
+        if node_type is PrimitiveFloatNode:
+            return NUMBER if type(node.value) is SLFloat else None
+        if node_type is IdentifierNode:
+            return kinds.get(node.name)
+        if node_type is UnaryOperationNode and node.operator in ('+', '-'):
+            return self.kind_of(node.operand, kinds)
+        if node_type is BinaryOperationNode and node.operator in _NUMERIC_OPERATORS:
+            kind = _join(self.kind_of(node.left, kinds), self.kind_of(node.right, kinds))
+            return NUMBER if kind is not None and node.operator == '/' else kind
+        return None
+
+    # Scopes
+
+    def fold_block(self, nodes, declared=()):
+        """
+        Fold a list of statements in a new scope. Names in declared are hidden from the start of the block.
+        """
+        self.scopes.append(dict.fromkeys(declared))
+        try:
+            for index, node in enumerate(nodes):
+                nodes[index] = self.fold_statement(node)
+        finally:
+            self.scopes.pop()
+
+    def lookup_constant(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    @staticmethod
+    def declared_names(nodes):
+        return [node.identifier.name for node in nodes if isinstance(node, VariableDeclarationNode)]
+
+    # Statements
+
+    def fold_statement(self, node):
+        method = getattr(self, f"_statement_{type(node).__name__}", None)
+        if method is not None:
+            method(node)
+            return node
+        return self.fold_expression(node)
+
+    def _statement_VariableDeclarationNode(self, node: VariableDeclarationNode):
+        if node.value is not None:
+            node.value = self.fold_expression(node.value)
+        name = node.identifier.name
+        constant = None
+        if (node.constant and self.propagate and name not in self.assigned
+                and isinstance(node.value, PrimitiveDataNode) and type(node.value.value) in PRIMITIVE_NODES):
+            constant = node.value
+        self.scopes[-1][name] = constant
+
+    def _statement_FunctionNode(self, node: FunctionNode):
+        self.scopes[-1][node.name] = None
+        # Functions see their own locals and the program scope only, like the restricted scope of a call
+        enclosing = self.scopes
+        self.scopes = [enclosing[0]]
+        hidden = [parameter.name for parameter in node.parameters] + list(node.nonlocals or ())
+        try:
+            self.fold_block(node.body, hidden)
+        finally:
+            self.scopes = enclosing
+
+    def _statement_ReturnNode(self, node: ReturnNode):
+        if node.value is not None:
+            node.value = self.fold_expression(node.value)
+
+    def _statement_BreakNode(self, node: BreakNode):
+        pass
+
+    def _statement_ContinueNode(self, node: ContinueNode):
+        pass
+
+    def _statement_IfNode(self, node: IfNode):
+        node.condition = self.fold_condition(node.condition)
+        self.fold_block(node.then_block)
+        if node.else_block:
+            self.fold_block(node.else_block)
+
+    def _statement_WhileNode(self, node: WhileNode):
+        # Later iterations can see the declarations of the previous one, so they are hidden for the whole loop
+        self.scopes.append(dict.fromkeys(self.declared_names(node.body)))
+        try:
+            node.condition = self.fold_condition(node.condition)
+            self.fold_block(node.body)
+        finally:
+            self.scopes.pop()
+
+    def _statement_ForNode(self, node: ForNode):
+        self.scopes.append(dict.fromkeys(self.declared_names(node.body)))
+        try:
+            node.initializer = self.fold_statement(node.initializer)
+            node.condition = self.fold_condition(node.condition)
+            self.fold_block(node.body)
+            node.increment = self.fold_expression(node.increment)
+        finally:
+            self.scopes.pop()
+
+    def _statement_TryCatchNode(self, node: TryCatchNode):
+        self.fold_block(node.try_block)
+        for exception_var, _, handler_block in node.catch_clauses:
+            self.fold_block(handler_block, [exception_var] if exception_var else [])
+        if node.finally_block:
+            self.fold_block(node.finally_block)
+
+    def _statement_ThrowNode(self, node: ThrowNode):
+        node.exception_expression = self.fold_expression(node.exception_expression)
+
+    # Expressions
+
+    def fold_expression(self, node):
+        method = getattr(self, f"_expression_{type(node).__name__}", None)
+        if method is not None:
+            return method(node)
+        return node
+
+    def fold_condition(self, node):
+        """
+        Fold an expression only tested for truth, where !!b can be replaced by b.
+        """
+        node = self.fold_expression(node)
+        while self.is_double_negation(node):
+            node = node.operand.operand
+        return node
+
+    @staticmethod
+    def is_double_negation(node):
+        return (type(node) is UnaryOperationNode and node.operator == '!'
+                and type(node.operand) is UnaryOperationNode and node.operand.operator == '!')
+
+    def _expression_IdentifierNode(self, node: IdentifierNode):
+        constant = self.lookup_constant(node.name)
+        if constant is None:
+            return node
+        return type(constant)(constant.value)
+
+    def _expression_AssignmentNode(self, node: AssignmentNode):
+        node.value = self.fold_expression(node.value)
+        return node
+
+    def _expression_FunctionCallNode(self, node: FunctionCallNode):
+        node.arguments = [self.fold_expression(argument) for argument in node.arguments]
+        return node
+
+    def _expression_ArrayNode(self, node: ArrayNode):
+        node.elements = [self.fold_expression(element) for element in node.elements]
+        return node
+
+    def _expression_UnaryOperationNode(self, node: UnaryOperationNode):
+        if node.operator == '!':
+            # Only the truth of the operand matters, so !!!b becomes !b
+            node.operand = self.fold_condition(node.operand)
+            return node
+        node.operand = self.fold_expression(node.operand)
+        function = UNARY_OPERATORS.get(node.operator)
+        if function is not None and isinstance(node.operand, PrimitiveDataNode):
+            return self.constant(function, node.operand.value) or node
+        return node
+
+    def _expression_BinaryOperationNode(self, node: BinaryOperationNode):
+        node.left = self.fold_expression(node.left)
+        node.right = self.fold_expression(node.right)
+        left, right, operator = node.left, node.right, node.operator
+
+        if isinstance(left, PrimitiveDataNode) and isinstance(right, PrimitiveDataNode):
+            function = BINARY_OPERATORS.get(operator)
+            if function is not None:
+                return self.constant(function, left.value, right.value) or node
+            return node
+
+        if operator == '*':
+            if _is_int_literal(right, 1) and self.kind_of(left) is not None:
+                return left
+            if _is_int_literal(left, 1) and self.kind_of(right) is not None:
+                return right
+        elif operator == '+':
+            if _is_int_literal(right, 0) and self.kind_of(left) == INT:
+                return left
+            if _is_int_literal(left, 0) and self.kind_of(right) == INT:
+                return right
+        elif operator == '-':
+            if _is_int_literal(right, 0) and self.kind_of(left) is not None:
+                return left
+        return node
+
+    @staticmethod
+    def constant(function, *operands):
+        """
+        Compute an operation on constant operands, returning None when it fails or its result is not a primitive.
+        """
+        if any(type(operand) not in PRIMITIVE_NODES for operand in operands):
+            return None
+        try:
+            result = function(*operands)
+        except Exception:
+            # Division by zero (raised as a user exception by the engines), unsupported operand types, overflow...
+            return None
+        node_type = PRIMITIVE_NODES.get(type(result))
+        return node_type(result) if node_type is not None else None
@@ -0,0 +1,180 @@
+"""
+Effect analysis deciding which functions can be memoized, see interpreter.memoization.
+
+Walks a ProgramNode and sets FunctionNode.pure on the functions declared directly at program level whose result
+depends only on their arguments. A function is pure when its body:
+
+- calls only program level functions that are pure themselves, with an argument count one of their declarations
+  accepts. Builtins (print, read_int, ...) are never pure, recursion between pure functions is allowed.
+- assigns only its parameters and the variables it declares itself, and lists no nonlocals.
+- reads, besides its own variables, only program level variables declared once and never assigned anywhere, so
+  their value cannot differ between two calls.
+- uses no stream operations (>>, |, ++, <<, .to_stream()), declares no nested functions and builds no arrays.
+
+Throwing is allowed: a call that raises stores nothing in the cache. Bodies containing nodes this pass does not
+know (lambdas, apply) are impure.
+"""
+from StreamLanguage.sl_ast.nodes.error_handling import TryCatchNode, ThrowNode
+from StreamLanguage.sl_ast.nodes.expressions import AssignmentNode, IdentifierNode, BinaryOperationNode, \
+    UnaryOperationNode
+from StreamLanguage.sl_ast.nodes.flow_control import IfNode, WhileNode, ForNode, BreakNode, ContinueNode
+from StreamLanguage.sl_ast.nodes.functions import FunctionNode, FunctionCallNode, ReturnNode
+from StreamLanguage.sl_ast.nodes.node_types import PrimitiveDataNode
+from StreamLanguage.sl_ast.nodes.structure import ProgramNode, VariableDeclarationNode
+from StreamLanguage.sl_ast.optimizer import _Definitions
+
+
+STREAM_BINARY_OPERATORS = ('>>', '|', '++', '<<')
+STREAM_UNARY_OPERATORS = ('to_stream',)
+
+
+class _Impure(Exception):
+    """
+    Raised inside a function body at the first node with an effect.
+    """
+
+
+def _declared_names(nodes, names):
+    """
+    Collect the names declared by the given statements and their nested blocks, without entering functions.
+    """
+    for node in nodes:
+        if isinstance(node, VariableDeclarationNode):
+            names.append(node.identifier.name)
+        elif isinstance(node, IfNode):
+            _declared_names(node.then_block, names)
+            _declared_names(node.else_block or [], names)
+        elif isinstance(node, WhileNode):
+            _declared_names(node.body, names)
+        elif isinstance(node, ForNode):
+            _declared_names([node.initializer] if node.initializer is not None else [], names)
+            _declared_names(node.body, names)
+        elif isinstance(node, TryCatchNode):
+            _declared_names(node.try_block, names)
+            for exception_var, _, handler_block in node.catch_clauses:
+                if exception_var:
+                    names.append(exception_var)
+                _declared_names(handler_block, names)
+            _declared_names(node.finally_block or [], names)
+    return names
+
+
+class PurityAnalyzer:
+    def __init__(self):
+        self.functions = {}  # Name to the program level FunctionNodes declaring it
+        self.program_variables = set()  # Names declared outside of functions
+        self.readable = set()  # Program variables whose value never changes once declared
+        self.locals = set()  # Parameters and declared names of the function being checked
+        self.found_calls = []  # (name, argument count) of the calls made by the function being checked
+
+    def analyze_program(self, program: ProgramNode):
+        """
+        Set FunctionNode.pure on the program level functions of the program. Returns the program.
+        """
+        definitions = _Definitions()
+        definitions.scan(program)
+        self.program_variables = set(_declared_names(program.nodes, []))
+        self.readable = {node.identifier.name for node in program.nodes
+                         if isinstance(node, VariableDeclarationNode)
+                         and node.identifier.name not in definitions.assigned
+                         and len(definitions.values[node.identifier.name]) == 1}
+
+        calls = {}
+        for node in program.nodes:
+            if isinstance(node, FunctionNode):
+                self.functions.setdefault(node.name, []).append(node)
+                node.pure = False
+                if not definitions.complete:
+                    continue  # Assignments may hide in nodes that were not scanned
+                try:
+                    calls[node] = self.check_function(node)
+                except _Impure:
+                    pass
+
+        # Greatest fixpoint: drop functions calling anything not (or no longer) pure until nothing changes
+        pure = set(calls)
+        changed = True
+        while changed:
+            changed = False
+            for node in list(pure):
+                if not all(self._pure_call(name, count, pure) for name, count in calls[node]):
+                    pure.discard(node)
+                    changed = True
+        for node in pure:
+            node.pure = True
+        return program
+
+    def _pure_call(self, name, count, pure):
+        overloads = [node for node in self.functions.get(name, ()) if len(node.parameters) == count]
+        return bool(overloads) and all(node in pure for node in overloads)
+
+    def check_function(self, node: FunctionNode):
+        """
+        Check the body of a function for effects, raising _Impure at the first one.
+        Returns the (name, argument count) pairs of the calls it makes.
+        """
+        if node.nonlocals:
+            raise _Impure(node.name)
+        local_names = _declared_names(node.body, [])
+        # A local sharing its name with a program variable is read from the program scope before its declaration
+        if any(name in self.program_variables for name in local_names):
+            raise _Impure(node.name)
+        self.locals = {parameter.name for parameter in node.parameters} | set(local_names)
+        self.found_calls = []
+        self.check_block(node.body)
+        return self.found_calls
+
+    def check_block(self, nodes):
+        for node in nodes:
+            self.check(node)
+
+    def check(self, node):
+        if node is None or isinstance(node, (PrimitiveDataNode, BreakNode, ContinueNode)):
+            return
+        if isinstance(node, IdentifierNode):
+            if node.name not in self.locals and node.name not in self.readable:
+                raise _Impure(node.name)
+        elif isinstance(node, VariableDeclarationNode):
+            self.check(node.value)
+        elif isinstance(node, AssignmentNode):
+            if node.target.name not in self.locals:
+                raise _Impure(node.target.name)
+            self.check(node.value)
+        elif isinstance(node, BinaryOperationNode):
+            if node.operator in STREAM_BINARY_OPERATORS:
+                raise _Impure(node.operator)
+            self.check(node.left)
+            self.check(node.right)
+        elif isinstance(node, UnaryOperationNode):
+            if node.operator in STREAM_UNARY_OPERATORS:
+                raise _Impure(node.operator)
+            self.check(node.operand)
+        elif isinstance(node, FunctionCallNode):
+            if node.function.name in self.locals:
+                raise _Impure(node.function.name)
+            self.found_calls.append((node.function.name, len(node.arguments)))
+            self.check_block(node.arguments)
+        elif isinstance(node, ReturnNode):
+            self.check(node.value)
+        elif isinstance(node, ThrowNode):
+            self.check(node.exception_expression)
+        elif isinstance(node, IfNode):
+            self.check(node.condition)
+            self.check_block(node.then_block)
+            self.check_block(node.else_block or [])
+        elif isinstance(node, WhileNode):
+            self.check(node.condition)
+            self.check_block(node.body)
+        elif isinstance(node, ForNode):
+            self.check(node.initializer)
+            self.check(node.condition)
+            self.check(node.increment)
+            self.check_block(node.body)
+        elif isinstance(node, TryCatchNode):
+            self.check_block(node.try_block)
+            for _, _, handler_block in node.catch_clauses:
+                self.check_block(handler_block)
+            self.check_block(node.finally_block or [])
+        else:
+            # Nested functions, arrays and nodes this pass does not know
+            raise _Impure(type(node).__name__)
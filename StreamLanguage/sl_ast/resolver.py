@@ -0,0 +1,246 @@
+"""
+Lexical addressing pass used by the compiling engines.
+
+Walks a ProgramNode once and annotates the AST so variable access inside functions no longer searches a chain of
+symbol tables:
+
+- IdentifierNode.address (also the identifiers of assignments, declarations and calls):
+    None            looked up by name through the current symbol table (program level, as the tree walker does)
+    GLOBAL          looked up by name in the global symbol table (a name a restricted function scope does not own)
+    (depth, slot)   slot of a frame; depth counts the function frames to walk out through, 0 being the current one
+- FunctionNode.frame_size is the number of slots of the function's frame, None when the function is left to run
+  with symbol tables. FunctionNode.address is the slot a nested function is declared in.
+- IfNode, WhileNode, ForNode and TryCatchNode get (first, end) ranges of the slots declared inside each of their
+  blocks (then_slots, else_slots, body_slots, try_slots, catch_slots, finally_slots). Engines reset these slots when
+  the block is entered, so re-entering a block can declare its variables again.
+
+Function scopes are restricted like the SymbolTable created by Context.enter_function_call: a name the function
+does not declare refers to the global scope, unless the function lists it in FunctionNode.nonlocals, in which case it
+refers to the nearest enclosing function declaring it. Every declaration site gets its own slot, so a redeclaration
+of a variable visible in the function reuses the visible slot and is reported when executed. As in the tree walker,
+declaring a global name is reported too, while the variables of the caller are not visible (see frame.check_declaration
+and SymbolTable.is_declared).
+
+Functions containing nodes this pass does not know (lambdas, apply) are left entirely to symbol tables, since the
+tree walker evaluates those nodes by name.
+"""
+from StreamLanguage.sl_ast.nodes.error_handling import TryCatchNode, ThrowNode
+from StreamLanguage.sl_ast.nodes.expressions import AssignmentNode, IdentifierNode, BinaryOperationNode, \
+    UnaryOperationNode
+from StreamLanguage.sl_ast.nodes.flow_control import IfNode, WhileNode, ForNode, BreakNode, ContinueNode
+from StreamLanguage.sl_ast.nodes.functions import FunctionNode, FunctionCallNode, ReturnNode
+from StreamLanguage.sl_ast.nodes.node_types import PrimitiveDataNode, ArrayNode
+from StreamLanguage.sl_ast.nodes.structure import ProgramNode, VariableDeclarationNode
+
+
+GLOBAL = 'global'
+
+
+class _Unresolvable(Exception):
+    """
+    Raised inside a function body when it contains a node that must find its variables by name.
+    """
+
+
+class _FunctionScope:
+    def __init__(self, node, parent):
+        self.node = node
+        self.parent = parent  # Enclosing resolved function scope, None at program level
+        self.blocks = [{}]  # Name to slot mappings, innermost block last
+        self.size = 0
+        self.nonlocals = set(node.nonlocals or ())
+
+    def find(self, name):
+        for block in reversed(self.blocks):
+            if name in block:
+                return block[name]
+        return None
+
+    def declare(self, name):
+        """
+        Give a declaration site its slot; a name already visible keeps its slot so the redeclaration is detected.
+        """
+        slot = self.find(name)
+        if slot is None:
+            slot = self.size
+            self.size += 1
+            self.blocks[-1][name] = slot
+        return slot
+
+
+class Resolver:
+    def __init__(self):
+        self.scope = None  # None while resolving program level code or a function left to symbol tables
+
+    def resolve_program(self, program: ProgramNode):
+        self.scope = None
+        self.resolve_block(program.nodes)
+        return program
+
+    # Scopes
+
+    def resolve_block(self, nodes):
+        """
+        Resolve a list of statements in a new block and return the range of slots declared in it.
+        """
+        first = self.open_block()
+        for node in nodes:
+            self.resolve_statement(node)
+        return self.close_block(first)
+
+    def open_block(self):
+        scope = self.scope
+        if scope is None:
+            return None
+        scope.blocks.append({})
+        return scope.size
+
+    def close_block(self, first):
+        scope = self.scope
+        if scope is None:
+            return None
+        scope.blocks.pop()
+        return (first, scope.size) if scope.size > first else None
+
+    def lookup(self, name):
+        scope = self.scope
+        if scope is None:
+            return None
+        slot = scope.find(name)
+        if slot is not None:
+            return 0, slot
+        if name not in scope.nonlocals:
+            return GLOBAL
+
+        # Nonlocal names are found in the closest enclosing function that declares them
+        depth = 1
+        scope = scope.parent
+        while scope is not None:
+            slot = scope.find(name)
+            if slot is not None:
+                return depth, slot
+            depth += 1
+            scope = scope.parent
+        return None
+
+    # Statements
+
+    def resolve_statement(self, node):
+        method = getattr(self, f"_statement_{type(node).__name__}", None)
+        if method is not None:
+            method(node)
+        else:
+            self.resolve_expression(node)
+
+    def _statement_VariableDeclarationNode(self, node: VariableDeclarationNode):
+        if node.value:
+            self.resolve_expression(node.value)
+        identifier = node.identifier
+        identifier.address = (0, self.scope.declare(identifier.name)) if self.scope is not None else None
+
+    def _statement_FunctionNode(self, node: FunctionNode):
+        enclosing = self.scope
+        node.address = enclosing.declare(node.name) if enclosing is not None else None
+
+        scope = _FunctionScope(node, enclosing)
+        for parameter in node.parameters:
+            parameter.address = (0, scope.declare(parameter.name))
+        self.scope = scope
+        try:
+            for statement in node.body:
+                self.resolve_statement(statement)
+            node.frame_size = scope.size
+        except _Unresolvable:
+            # The whole function keeps using symbol tables
+            for parameter in node.parameters:
+                parameter.address = None
+            self.scope = None
+            for statement in node.body:
+                self.resolve_statement(statement)
+            node.frame_size = None
+        finally:
+            self.scope = enclosing
+
+    def _statement_ReturnNode(self, node: ReturnNode):
+        if node.value is not None:
+            self.resolve_expression(node.value)
+
+    def _statement_BreakNode(self, node: BreakNode):
+        pass
+
+    def _statement_ContinueNode(self, node: ContinueNode):
+        pass
+
+    def _statement_IfNode(self, node: IfNode):
+        self.resolve_expression(node.condition)
+        node.then_slots = self.resolve_block(node.then_block)
+        node.else_slots = self.resolve_block(node.else_block) if node.else_block else None
+
+    def _statement_WhileNode(self, node: WhileNode):
+        # The condition is evaluated inside the loop block
+        first = self.open_block()
+        self.resolve_expression(node.condition)
+        for statement in node.body:
+            self.resolve_statement(statement)
+        node.body_slots = self.close_block(first)
+
+    def _statement_ForNode(self, node: ForNode):
+        # Initializer, condition, body and increment share the loop block, resolved in the order they run
+        first = self.open_block()
+        self.resolve_statement(node.initializer)
+        self.resolve_expression(node.condition)
+        for statement in node.body:
+            self.resolve_statement(statement)
+        self.resolve_expression(node.increment)
+        node.body_slots = self.close_block(first)
+
+    def _statement_TryCatchNode(self, node: TryCatchNode):
+        node.try_slots = self.resolve_block(node.try_block)
+        node.catch_addresses = []
+        node.catch_slots = []
+        for exception_var, exception_type, handler_block in node.catch_clauses:
+            # The exception variable is declared in the catch block itself
+            first = self.open_block()
+            if exception_var and self.scope is not None:
+                node.catch_addresses.append((0, self.scope.declare(exception_var)))
+            else:
+                node.catch_addresses.append(None)
+            for statement in handler_block:
+                self.resolve_statement(statement)
+            node.catch_slots.append(self.close_block(first))
+        node.finally_slots = self.resolve_block(node.finally_block) if node.finally_block else None
+
+    def _statement_ThrowNode(self, node: ThrowNode):
+        self.resolve_expression(node.exception_expression)
+
+    # Expressions
+
+    def resolve_expression(self, node):
+        method = getattr(self, f"_expression_{type(node).__name__}", None)
+        if method is not None:
+            method(node)
+        elif not isinstance(node, PrimitiveDataNode) and self.scope is not None:
+            raise _Unresolvable(type(node).__name__)
+
+    def _expression_IdentifierNode(self, node: IdentifierNode):
+        node.address = self.lookup(node.name)
+
+    def _expression_AssignmentNode(self, node: AssignmentNode):
+        self.resolve_expression(node.value)
+        node.target.address = self.lookup(node.target.name)
+
+    def _expression_BinaryOperationNode(self, node: BinaryOperationNode):
+        self.resolve_expression(node.left)
+        self.resolve_expression(node.right)
+
+    def _expression_UnaryOperationNode(self, node: UnaryOperationNode):
+        self.resolve_expression(node.operand)
+
+    def _expression_FunctionCallNode(self, node: FunctionCallNode):
+        for argument in node.arguments:
+            self.resolve_expression(argument)
+        node.function.address = self.lookup(node.function.name)
+
+    def _expression_ArrayNode(self, node: ArrayNode):
+        for element in node.elements:
+            self.resolve_expression(element)
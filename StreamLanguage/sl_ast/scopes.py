@@ -0,0 +1,64 @@
+"""
+Scope elision for blocks that declare nothing.
+
+Entering a block pushes a Block marker for the BlockFlags checks and a new SymbolTable for the names declared in it.
+Most if branches, loop bodies and try blocks only assign and call, so the table is allocated and dropped without ever
+holding a name. This pass clears the *_scoped flags of such blocks and the engines then call Context.enter_block with
+scoped=False, which pushes the marker alone: lookups, assignments and calls inside the block reach the enclosing
+table exactly as they reached it through the empty one.
+
+A block declares something when one of its own statements is a variable declaration or a function, a for loop also
+when its initializer is a declaration and a catch clause also when it binds the exception to a variable. Statements
+of nested blocks do not count, each nested block decides for itself. Return statements never declare, their block is
+always entered without a table.
+
+Nodes this pass never saw keep their flags set, so unanalyzed trees are scoped as before.
+"""
+from StreamLanguage.sl_ast.nodes.error_handling import TryCatchNode
+from StreamLanguage.sl_ast.nodes.flow_control import IfNode, WhileNode, ForNode
+from StreamLanguage.sl_ast.nodes.functions import FunctionNode
+from StreamLanguage.sl_ast.nodes.structure import ProgramNode, VariableDeclarationNode
+
+
+def declares_names(nodes):
+    """
+    Whether any of the statements declares a name in the block holding them.
+    """
+    return any(isinstance(node, (VariableDeclarationNode, FunctionNode)) for node in nodes)
+
+
+class ScopeElider:
+    def mark_program(self, program: ProgramNode):
+        """
+        Mark the blocks of the program that need a symbol table of their own. Returns the program.
+        """
+        self.mark_block(program.nodes)
+        return program
+
+    def mark_block(self, nodes):
+        for node in nodes:
+            self.mark(node)
+
+    def mark(self, node):
+        if isinstance(node, FunctionNode):
+            self.mark_block(node.body)
+        elif isinstance(node, IfNode):
+            node.then_scoped = declares_names(node.then_block)
+            node.else_scoped = declares_names(node.else_block or [])
+            self.mark_block(node.then_block)
+            self.mark_block(node.else_block or [])
+        elif isinstance(node, WhileNode):
+            node.body_scoped = declares_names(node.body)
+            self.mark_block(node.body)
+        elif isinstance(node, ForNode):
+            node.body_scoped = declares_names([node.initializer] + node.body)
+            self.mark_block(node.body)
+        elif isinstance(node, TryCatchNode):
+            node.try_scoped = declares_names(node.try_block)
+            node.catch_scoped = [bool(exception_var) or declares_names(handler_block)
+                                 for exception_var, _, handler_block in node.catch_clauses]
+            node.finally_scoped = declares_names(node.finally_block or [])
+            self.mark_block(node.try_block)
+            for _, _, handler_block in node.catch_clauses:
+                self.mark_block(handler_block)
+            self.mark_block(node.finally_block or [])
@@ -0,0 +1,55 @@
+"""
+Tail call detection for self-recursive functions.
+
+Sets ReturnNode.tail_call on every return statement whose value is a call of the enclosing function by its own name,
+with as many arguments as the function has parameters. The engines run such a call by restarting the current call
+with the new arguments instead of nesting a new one, so the recursion uses constant host stack and never reaches
+Context.MAX_FUNCTION_RECURSION_DEPTH:
+
+- tree walker: ReturnNode.evaluate hands the arguments to CallableFunction.invoke through the ControlFlowManager.
+- closure engine: the return closure gives CompiledFunction.invoke a TailCallSignal.
+- virtual machine: the call compiles to TAIL_CALL, which reuses the frame.
+
+Whether the call really reaches the running function is only known when it executes (the name may resolve to a
+function declared elsewhere); when it does not, the engines perform an ordinary call. A tail call through a memoized
+wrapper of the running function restarts it as well, only the result of the outermost call is cached.
+
+Returns inside a try, catch or finally block are never tail calls, the handlers must stay active during the call.
+"""
+from StreamLanguage.sl_ast.nodes.error_handling import TryCatchNode
+from StreamLanguage.sl_ast.nodes.flow_control import IfNode, WhileNode, ForNode
+from StreamLanguage.sl_ast.nodes.functions import FunctionNode, FunctionCallNode, ReturnNode
+from StreamLanguage.sl_ast.nodes.structure import ProgramNode
+
+
+class TailCallMarker:
+    def mark_program(self, program: ProgramNode):
+        """
+        Mark the tail calls of every function in the program. Returns the program.
+        """
+        self.mark_block(program.nodes, None)
+        return program
+
+    def mark_block(self, nodes, function):
+        for node in nodes:
+            self.mark(node, function)
+
+    def mark(self, node, function):
+        if isinstance(node, FunctionNode):
+            self.mark_block(node.body, node)
+        elif isinstance(node, ReturnNode):
+            call = node.value
+            node.tail_call = (function is not None and isinstance(call, FunctionCallNode)
+                              and call.function.name == function.name
+                              and len(call.arguments) == len(function.parameters))
+        elif isinstance(node, IfNode):
+            self.mark_block(node.then_block, function)
+            self.mark_block(node.else_block or [], function)
+        elif isinstance(node, (WhileNode, ForNode)):
+            self.mark_block(node.body, function)
+        elif isinstance(node, TryCatchNode):
+            # Only nested functions can hold tail calls here
+            self.mark_block(node.try_block, None)
+            for _, _, handler_block in node.catch_clauses:
+                self.mark_block(handler_block, None)
+            self.mark_block(node.finally_block or [], None)
@@ -6,6 +6,8 @@ class SLType:
     Base class for all SL sl_types (both instance and meta sl_types).
     Contains shared functionality for type manipulation.
     """
+    __slots__ = ()
+
     def to_slstring(self):
         raise NotImplementedError("Conversion to SLString not implemented.")
 
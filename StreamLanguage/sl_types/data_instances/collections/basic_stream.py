@@ -0,0 +1,34 @@
+from StreamLanguage.sl_types.data_instances.collections.ring_buffer import RingBuffer, DROP_OLDEST
+from StreamLanguage.sl_types.data_instances.collections.stream import SLStream
+
+DEFAULT_CAPACITY = 1024
+
+
+class SLBasicStream(SLStream):
+    """
+    A stream with a limited buffer at its sink. When elements arrive faster than they are read, the overflow policy of
+    the buffer decides which are kept, see sl_types.data_instances.collections.ring_buffer.
+    """
+
+    def __init__(self, generator_func=None, element_type=None, capacity=DEFAULT_CAPACITY, overflow=DROP_OLDEST,
+                 max_capacity=None):
+        super().__init__(generator_func, element_type)
+        self.sink = RingBuffer(capacity, overflow, max_capacity)
+
+    @property
+    def capacity(self):
+        return self.sink.capacity
+
+    @property
+    def dropped(self):
+        """
+        Number of elements the overflow policy dropped.
+        """
+        return self.sink.dropped
+
+    @property
+    def high_water_mark(self):
+        """
+        Most elements the buffer held at once.
+        """
+        return self.sink.high_water_mark
@@ -0,0 +1,111 @@
+"""
+Fixed capacity FIFO buffer backing the sink of a basic stream (SLBasicStream).
+
+The elements live in a preallocated list used as a ring, so a buffer's memory stays flat however bursty its producers
+are. What happens to an element arriving at a full buffer is the overflow policy:
+- DROP_OLDEST: the oldest element is overwritten, what the language definition asks of a basic stream
+- DROP_NEWEST: the arriving element is dropped
+- BLOCK: the element is not taken, the dataflow graph holds it and stops until the buffer is read
+- GROW: the ring doubles in size up to max_capacity, then the oldest element is dropped
+"""
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+BLOCK = 'block'
+GROW = 'grow'
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK, GROW)
+
+
+class RingBuffer:
+    """
+    FIFO of at most capacity elements, with the deque methods the dataflow graph uses for a sink.
+    """
+    __slots__ = ('items', 'head', 'size', 'overflow', 'max_capacity', 'dropped', 'high_water_mark')
+
+    def __init__(self, capacity, overflow=DROP_OLDEST, max_capacity=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}', expected one of {OVERFLOW_POLICIES}")
+        if capacity < 1:
+            raise ValueError("A ring buffer needs room for at least one element")
+        self.items = [None] * capacity
+        self.head = 0  # Index of the oldest element
+        self.size = 0
+        self.overflow = overflow
+        self.max_capacity = max(capacity, max_capacity or 0) if overflow == GROW else capacity
+        self.dropped = 0  # Elements lost to the overflow policy
+        self.high_water_mark = 0  # Most elements held at once
+
+    @property
+    def capacity(self):
+        return len(self.items)
+
+    @property
+    def room(self):
+        """
+        Number of elements the buffer takes before its overflow policy applies, growing included.
+        """
+        return self.max_capacity - self.size
+
+    def append(self, value):
+        """
+        Add an element at the end, False when the buffer is full and blocks.
+        """
+        items = self.items
+        capacity = len(items)
+        if self.size == capacity:
+            if self.overflow == DROP_NEWEST:
+                self.dropped += 1
+                return True
+            if self.overflow == BLOCK:
+                return False
+            if self.overflow == GROW and capacity < self.max_capacity:
+                self._grow()
+                items = self.items
+                capacity = len(items)
+            else:
+                # Overwrite the oldest element
+                items[self.head] = value
+                self.head = (self.head + 1) % capacity
+                self.dropped += 1
+                return True
+        items[(self.head + self.size) % capacity] = value
+        self.size += 1
+        if self.size > self.high_water_mark:
+            self.high_water_mark = self.size
+        return True
+
+    def extend(self, values):
+        """
+        Add elements in order. Returns the elements a blocking buffer had no room for, None when all were handled.
+        """
+        for index, value in enumerate(values):
+            if not self.append(value):
+                return values[index:]
+        return None
+
+    def popleft(self):
+        if not self.size:
+            raise IndexError("pop from an empty ring buffer")
+        value = self.items[self.head]
+        self.items[self.head] = None  # Do not keep a reference to the element
+        self.head = (self.head + 1) % len(self.items)
+        self.size -= 1
+        return value
+
+    def clear(self):
+        self.items = [None] * len(self.items)
+        self.head = 0
+        self.size = 0
+
+    def _grow(self):
+        capacity = min(len(self.items) * 2, self.max_capacity)
+        self.items = list(self) + [None] * (capacity - self.size)
+        self.head = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        items, capacity = self.items, len(self.items)
+        for offset in range(self.size):
+            yield items[(self.head + offset) % capacity]
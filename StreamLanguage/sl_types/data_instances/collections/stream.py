@@ -1,60 +1,231 @@
+from collections import deque
+from functools import reduce
+from itertools import chain, compress
+
+from StreamLanguage.interpreter.dataflow import DataflowGraph, SOURCE, STREAM, MAP, FILTER, WINDOW
+from StreamLanguage.interpreter.windows import SUM, CountTumblingWindow, CountSlidingWindow, TimeTumblingWindow, \
+    TimeSlidingWindow, SessionWindow
+from StreamLanguage.interpreter.vectorize import vectorize_map, vectorize_filter, vectorize_reduce, reduce_batch
+from StreamLanguage.sl_ast.exceptions import SLTypeError
 from StreamLanguage.sl_types.data_instances.instance_base import SLInstanceType
+from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat, _float
+from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger, _integer
+
+_END = object()  # Result of SLStream._take when the stream has no more elements
+
+
+def _element_function(func, context):
+    """
+    func as a Python function of stream elements. User functions are invoked in context when one is given.
+    """
+    if context is not None and hasattr(func, 'invoke'):
+        return lambda *args: func.invoke(*args, context=context)
+    return func
+
 
 class SLStream(SLInstanceType):
+    """
+    A stream of elements, a vertex of the dataflow graph in interpreter.dataflow. The generator function, when given,
+    is the source of its elements; without one the stream is fed by push or by the streams connected to it.
+    """
     type_descriptor = None  # Will be set during registration
 
-    def __init__(self, generator_func, element_type = None):
-        if not callable(generator_func):
+    def __init__(self, generator_func=None, element_type = None):
+        if generator_func is not None and not callable(generator_func):
             raise TypeError("SLStream requires a callable generator function")
         self.generator_func = generator_func
         self.iterator = None
         self.element_type = element_type  # Enforced type hint for stream elements
+        self.kind = SOURCE if generator_func is not None else STREAM
+        self.stage = None  # Function from an input batch to the output batch, None passes elements unchanged
+        self.element_step = None  # (MAP or FILTER, function) when stage calls a function per element, for fusion
+        self.route = None  # Set by DataflowGraph.plan
+        self.fused = None
+        self.downstream = []  # Streams the elements leaving this one enter
+        self.sink = deque()  # Elements that left this stream and have not been read yet
+        self.checked_types = set()  # Instance types whose elements are known to match element_type
+        DataflowGraph().add(self)
 
     def start(self):
+        """
+        Restart the source of the stream from its first element.
+        """
         self.iterator = iter(self.generator_func())
+        if self not in self.graph.sources:
+            self.graph.sources.append(self)
+        self.graph.exhausted = False
+
+    def push(self, value):
+        """
+        Add an element at the mouth of the stream.
+        """
+        self.graph.push(self, [value])
 
     def next(self):
-        if not self.iterator:
-            self.start()
-        try:
-            value = next(self.iterator)
-            self._validate_type(value)
-            return value
-        except StopIteration:
-            return None  # End of stream
+        value = self._take()
+        return None if value is _END else value  # None at the end of the stream
+
+    def _take(self):
+        if not self.sink:
+            self.graph.run_until(self)
+            if not self.sink:
+                return _END
+        return self.sink.popleft()
+
+    def _validate_batch(self, batch):
+        """
+        Validate the elements of a batch, checking one element per instance type.
+        """
+        checked = self.checked_types
+        for value in batch:
+            if type(value) not in checked:
+                self._validate_element(value)
+
+    def _validate_element(self, value):
+        """
+        Validate an element. Elements of an instance type whose meta type is a class attribute all share it, so the
+        first one checked settles the others.
+        """
+        self._validate_type(value)
+        instance_type = type(value)
+        descriptor = getattr(instance_type, 'type_descriptor', None)
+        if descriptor is not None and descriptor is value.type_descriptor:
+            self.checked_types.add(instance_type)
 
     def _validate_type(self, value):
-        if not isinstance(value, self.element_type.python_type):
-            raise TypeError(f"Stream element expected to be of type {self.element_type}, got {type(value)}")
-
-    def map(self, func):
-        # func should accept an argument of type element_type and return a value
-        def mapped_generator():
-            for item in self:
-                self._validate_type(item)
-                result = func(item)
-                yield result
+        descriptor = getattr(value, 'type_descriptor', None)
+        if descriptor is self.element_type or descriptor == self.element_type:
+            return
+        if isinstance(self.element_type, type) and (isinstance(value, self.element_type)
+                                                    or isinstance(descriptor, self.element_type)):
+            return
+        raise TypeError(f"Stream element expected to be of type {self.element_type}, got {type(value)}")
+
+    def _then(self, kind, stage, element_type, element_step=None):
+        """
+        A new stream fed by this one, whose elements are the batches of this one passed through stage.
+        """
+        stream = SLStream(element_type=element_type)
+        stream.kind = kind
+        stream.stage = stage
+        stream.element_step = element_step
+        self.graph.connect(self, stream)
+        return stream
+
+    def map(self, func, context=None):
+        # func should accept an argument of type element_type and return a value, user functions are invoked in context
         # Return a new SLStream with possibly a different element type
-        return SLStream(mapped_generator, element_type=func.return_type)
+        if getattr(func, 'vectorized', False):
+            return self._then(MAP, func, getattr(func, 'return_type', None))
+        call = _element_function(func, context)
+        scalar = lambda batch: [call(item) for item in batch]
+        stage = vectorize_map(func, scalar)
+        return self._then(MAP, stage, getattr(func, 'return_type', None), (MAP, call) if stage is scalar else None)
 
-    def filter(self, predicate):
+    def filter(self, predicate, context=None):
         # predicate should accept an argument of type element_type and return a bool
-        def filtered_generator():
-            for item in self:
-                self._validate_type(item)
-                if predicate(item):
-                    yield item
         # Return a new SLStream with the same element type
-        return SLStream(filtered_generator, element_type=self.element_type)
+        if getattr(predicate, 'vectorized', False):
+            return self._then(FILTER, lambda batch: list(compress(batch, predicate(batch))), self.element_type)
+        call = _element_function(predicate, context)
+        scalar = lambda batch: [item for item in batch if call(item)]
+        stage = vectorize_filter(predicate, scalar)
+        return self._then(FILTER, stage, self.element_type, (FILTER, call) if stage is scalar else None)
 
-    def reduce(self, reducer, initial=None):
-        # reducer should accept two arguments: accumulator and current item
-        from functools import reduce
-        self.start()
-        if initial is not None:
-            return reduce(reducer, self.iterator, initial)
+    def tumbling(self, size, aggregate=SUM, by_time=False, timestamp=None):
+        """
+        A stream of the aggregates of consecutive windows of size elements, or of size seconds when by_time is set.
+        timestamp gives the time of an element, by default the time it arrives. See interpreter.windows.
+        """
+        if by_time:
+            window = TimeTumblingWindow(size, aggregate, timestamp)
         else:
-            return reduce(reducer, self.iterator)
+            window = CountTumblingWindow(size, aggregate)
+        return self._then(WINDOW, window, None)
+
+    def sliding(self, size, step=1, aggregate=SUM, by_time=False, timestamp=None):
+        """
+        A stream of the aggregates of windows of size elements (or seconds) starting every step elements (or seconds).
+        """
+        if by_time:
+            window = TimeSlidingWindow(size, step, aggregate, timestamp)
+        else:
+            window = CountSlidingWindow(size, step, aggregate)
+        return self._then(WINDOW, window, None)
+
+    def session(self, gap, aggregate=SUM, timestamp=None):
+        """
+        A stream of the aggregates of the runs of elements arriving less than gap seconds apart.
+        """
+        return self._then(WINDOW, SessionWindow(gap, aggregate, timestamp), None)
+
+    def reduce(self, reducer, initial=None, context=None):
+        # reducer should accept two arguments: accumulator and current item
+        call = _element_function(reducer, context)
+        operation = vectorize_reduce(reducer)
+        batches = self._batches()
+        accumulator = initial
+        if accumulator is None:
+            first = next(batches, None)
+            if first is None:
+                raise TypeError("reduce() of empty stream with no initial value")
+            accumulator = first[0]
+            batches = chain([first[1:]], batches)
+        for batch in batches:
+            if operation is not None and type(accumulator) in (SLInteger, SLFloat):
+                # Sums and products of numbers fold the unboxed values
+                value = reduce_batch(operation, accumulator.value, batch)
+                if value is not None:
+                    accumulator = _integer(value) if type(accumulator) is SLInteger else _float(value)
+                    continue
+            accumulator = reduce(call, batch, accumulator)
+        return accumulator
+
+    def chain(self, other):
+        """
+        a >> b: the elements leaving this stream enter other. A function instead of a stream maps the elements.
+        """
+        if not isinstance(other, SLStream):
+            if callable(other):
+                return self.map(other)
+            raise SLTypeError(f"Cannot chain a stream to {other}")
+        self.graph.connect(self, other)
+        return other
+
+    def split(self, other):
+        """
+        a | b: other receives a copy of every element leaving this stream, next to its other downstream streams.
+        """
+        if not isinstance(other, SLStream):
+            raise SLTypeError(f"Cannot split a stream into {other}")
+        self.graph.connect(self, other)
+        return self
+
+    def merge(self, other):
+        """
+        a ++ b: a new stream with the elements of both streams, in the order they arrive.
+        """
+        if not isinstance(other, SLStream):
+            raise SLTypeError(f"Cannot merge a stream with {other}")
+        merged = SLStream(element_type=self.element_type)
+        self.graph.connect(self, merged)
+        merged.graph.connect(other, merged)
+        return merged
+
+    def feedback(self, other):
+        """
+        a << b: the elements leaving other enter this stream again.
+        """
+        if not isinstance(other, SLStream):
+            raise SLTypeError(f"Cannot feed {other} back into a stream")
+        self.graph.connect(other, self)
+        return self
+
+    def explain(self):
+        """
+        The routes of the graph of this stream after fusion, see DataflowGraph.explain.
+        """
+        return self.graph.explain()
 
     def to_slstring(self):
         from StreamLanguage.sl_types.data_instances.primatives.string import SLString
@@ -63,7 +234,25 @@ class SLStream(SLInstanceType):
     def __str__(self):
         return "<stream object>"
 
+    def _batches(self):
+        """
+        The elements of the stream, as lists of the elements its sink holds at a time.
+        """
+        sink = self.sink
+        while True:
+            if not sink:
+                self.graph.run_until(self)
+                if not sink:
+                    return
+            batch = list(sink)
+            sink.clear()
+            yield batch
+
     def __iter__(self):
-        if not self.iterator:
-            self.start()
-        return self.iterator
\ No newline at end of file
+        sink = self.sink
+        while True:
+            while sink:
+                yield sink.popleft()
+            self.graph.run_until(self)
+            if not sink:
+                return
@@ -4,6 +4,7 @@ class SLInstanceType(SLType):
     """
     Base class for all SL instance sl_types.
     """
+    __slots__ = ('value',)
     type_descriptor = None  # Will be set when the type is initialized
 
     def __init__(self, value):
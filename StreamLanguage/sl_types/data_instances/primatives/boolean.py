@@ -3,18 +3,25 @@ from StreamLanguage.sl_types.data_instances.instance_base import SLInstanceType
 from StreamLanguage.sl_types.meta_type.meta_base import SLMetaType
 
 class SLBoolean(SLInstanceType):
+    """
+    There are only two SLBoolean instances, TRUE and FALSE: SLBoolean(value) returns one of them. Code producing a
+    boolean from a Python condition can use them directly.
+    """
+    __slots__ = ()
     type_descriptor = None  # Will be set when SLBooleanType is initialized
 
-    def __init__(self, value):
+    def __new__(cls, value):
         if isinstance(value, SLBoolean):
-            self.value = value.value  # Same instance, avoid duplication
+            return value  # Same instance, avoid duplication
         elif isinstance(value, bool):
-            self.value = value
+            return TRUE if value else FALSE
         else:
             raise SLTypeError("SLBoolean requires a boolean")
 
+    def __init__(self, value):
+        pass  # The instances are shared, their value is set once below the class
+
     def to_slstring(self):
-        from StreamLanguage.sl_types.data_instances.primatives.string import SLString
         return SLString(str(self.value))
 
     def __bool__(self):
@@ -22,48 +29,57 @@ class SLBoolean(SLInstanceType):
 
     def __and__(self, other):
         if isinstance(other, SLBoolean):
-            return SLBoolean(self.value and other.value)
+            return TRUE if self.value and other.value else FALSE
         return NotImplemented
 
     def __or__(self, other):
         if isinstance(other, SLBoolean):
-            return SLBoolean(self.value or other.value)
+            return TRUE if self.value or other.value else FALSE
         return NotImplemented
 
     def __xor__(self, other):
         if isinstance(other, SLBoolean):
-            return SLBoolean(self.value ^ other.value)
+            return TRUE if self.value ^ other.value else FALSE
         return NotImplemented
 
     def __invert__(self):
-        return SLBoolean(not self.value)
+        return FALSE if self.value else TRUE
 
     def __eq__(self, other):
         if isinstance(other, SLBoolean):
-            return SLBoolean(self.value == other.value)
+            return TRUE if self.value == other.value else FALSE
         return NotImplemented
 
     def __ne__(self, other):
         if isinstance(other, SLBoolean):
-            return SLBoolean(self.value != other.value)
+            return TRUE if self.value != other.value else FALSE
         return NotImplemented
 
     def __lt__(self, other):
         if isinstance(other, SLBoolean):
-            return SLBoolean(self.value < other.value)
+            return TRUE if self.value < other.value else FALSE
         return NotImplemented
 
     def __le__(self, other):
         if isinstance(other, SLBoolean):
-            return SLBoolean(self.value <= other.value)
+            return TRUE if self.value <= other.value else FALSE
         return NotImplemented
 
     def __gt__(self, other):
         if isinstance(other, SLBoolean):
-            return SLBoolean(self.value > other.value)
+            return TRUE if self.value > other.value else FALSE
         return NotImplemented
 
     def __ge__(self, other):
         if isinstance(other, SLBoolean):
-            return SLBoolean(self.value >= other.value)
-        return NotImplemented
\ No newline at end of file
+            return TRUE if self.value >= other.value else FALSE
+        return NotImplemented
+
+
+TRUE = object.__new__(SLBoolean)
+TRUE.value = True
+FALSE = object.__new__(SLBoolean)
+FALSE.value = False
+
+# Imported last, string.py imports this module as well
+from StreamLanguage.sl_types.data_instances.primatives.string import SLString
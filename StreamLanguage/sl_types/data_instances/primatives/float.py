@@ -2,7 +2,17 @@ from StreamLanguage.sl_types.base import SLType
 from StreamLanguage.sl_types.data_instances.instance_base import SLInstanceType
 
 
+def _float(value):
+    """
+    SLFloat of a Python float result, skipping the conversions of SLFloat(value).
+    """
+    number = object.__new__(SLFloat)
+    number.value = value
+    return number
+
+
 class SLFloat(SLInstanceType):
+    __slots__ = ()
     type_descriptor = None  # Will be set when SLFloatType is initialized
 
     def __init__(self, value):
@@ -12,68 +22,58 @@ class SLFloat(SLInstanceType):
             self.value = value
         elif isinstance(value, int):
             self.value = float(value)
+        elif isinstance(value, SLInteger):
+            self.value = float(value.value)
         else:
-            from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
-            if isinstance(value, SLInteger):
-                self.value = float(value.value)
-            else:
-                raise TypeError("SLFloat requires a float, SLFloat, or SLInteger")
+            raise TypeError("SLFloat requires a float, SLFloat, or SLInteger")
 
     def to_slstring(self):
-        from StreamLanguage.sl_types.data_instances.primatives.string import SLString
         return SLString(str(self.value))
 
 
     def __add__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
         if isinstance(other, SLFloat):
-            return SLFloat(self.value + other.value)
+            return _float(self.value + other.value)
         if isinstance(other, SLInteger):
-            return SLFloat(self.value + other.value)
+            return _float(self.value + other.value)
         return NotImplemented
 
     def __sub__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
         if isinstance(other, SLFloat):
-            return SLFloat(self.value - other.value)
+            return _float(self.value - other.value)
         if isinstance(other, SLInteger):
-            return SLFloat(self.value - other.value)
+            return _float(self.value - other.value)
         return NotImplemented
 
     def __mul__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
         if isinstance(other, SLFloat):
-            return SLFloat(self.value * other.value)
+            return _float(self.value * other.value)
         if isinstance(other, SLInteger):
-            return SLFloat(self.value * other.value)
+            return _float(self.value * other.value)
         return NotImplemented
 
     def __truediv__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
         if isinstance(other, SLFloat):
-            return SLFloat(self.value / other.value)
+            return _float(self.value / other.value)
         if isinstance(other, SLInteger):
-            return SLFloat(self.value / other.value)
+            return _float(self.value / other.value)
         return NotImplemented
 
     def __floordiv__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
         if isinstance(other, SLFloat):
-            return SLFloat(self.value // other.value)
+            return _float(self.value // other.value)
         if isinstance(other, SLInteger):
-            return SLFloat(self.value // other.value)
+            return _float(self.value // other.value)
         return NotImplemented
 
     def __mod__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
         if isinstance(other, SLFloat):
-            return SLFloat(self.value % other.value)
+            return _float(self.value % other.value)
         if isinstance(other, SLInteger):
-            return SLFloat(self.value % other.value)
+            return _float(self.value % other.value)
         return NotImplemented
 
     def __pow__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
         if isinstance(other, SLFloat):
             return SLFloat(self.value ** other.value)
         if isinstance(other, SLInteger):
@@ -81,55 +81,54 @@ class SLFloat(SLInstanceType):
         return NotImplemented
 
     def __eq__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
-        from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
         if isinstance(other, SLFloat):
-            return SLBoolean(self.value == other.value)
+            return TRUE if self.value == other.value else FALSE
         elif isinstance(other, SLInteger):
-            return SLBoolean(self.value == other.value)
+            return TRUE if self.value == other.value else FALSE
         elif isinstance(other, int):
-            return SLBoolean(self.value == other)
+            return TRUE if self.value == other else FALSE
         elif isinstance(other, float):
-            return SLBoolean(self.value == other)
+            return TRUE if self.value == other else FALSE
         elif isinstance(other, SLType):
-            return SLBoolean(False)
+            return FALSE
         return NotImplemented
 
     def __ne__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLFloat):
-            return SLBoolean(self.value != other.value)
+            return TRUE if self.value != other.value else FALSE
         return NotImplemented
 
     def __lt__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLFloat):
-            return SLBoolean(self.value < other.value)
+            return TRUE if self.value < other.value else FALSE
         return NotImplemented
 
     def __le__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLFloat):
-            return SLBoolean(self.value <= other.value)
+            return TRUE if self.value <= other.value else FALSE
         return NotImplemented
 
     def __gt__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLFloat):
-            return SLBoolean(self.value > other.value)
+            return TRUE if self.value > other.value else FALSE
         return NotImplemented
 
     def __ge__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLFloat):
-            return SLBoolean(self.value >= other.value)
+            return TRUE if self.value >= other.value else FALSE
         return NotImplemented
 
     def __neg__(self):
-        return SLFloat(-self.value)
+        return _float(-self.value)
 
     def __pos__(self):
-        return SLFloat(+self.value)
+        return _float(+self.value)
 
     def __abs__(self):
-        return SLFloat(abs(self.value))
+        return _float(abs(self.value))
+
+
+# Imported last, these modules import this one as well
+from StreamLanguage.sl_types.data_instances.primatives.boolean import TRUE, FALSE
+from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
+from StreamLanguage.sl_types.data_instances.primatives.string import SLString
@@ -3,122 +3,139 @@ from StreamLanguage.sl_types.base import SLType
 from StreamLanguage.sl_types.data_instances.instance_base import SLInstanceType
 from StreamLanguage.sl_types.meta_type.meta_base import SLMetaType
 
+# Integers in this range are created once and shared, like Python's small int cache
+SMALL_INT_MIN = -128
+SMALL_INT_MAX = 1023
+
+
+def _integer(value):
+    """
+    SLInteger of a Python int result, skipping the conversions of SLInteger(value).
+    """
+    if SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+        return _small_integers[value - SMALL_INT_MIN]
+    integer = object.__new__(SLInteger)
+    integer.value = value
+    return integer
+
 
 class SLInteger(SLInstanceType):
+    __slots__ = ()
     type_descriptor = None  # Will be set when SLIntegerType is initialized
 
-    def __init__(self, value):
+    def __new__(cls, value):
+        if type(value) is int and SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+            return _small_integers[value - SMALL_INT_MIN]
+        integer = object.__new__(cls)
         if isinstance(value, SLInteger):
-            self.value = value.value  # Same instance, avoid duplication
+            integer.value = value.value  # Same instance, avoid duplication
         elif isinstance(value, int):
-            self.value = value
+            integer.value = value
+        elif isinstance(value, SLFloat):
+            integer.value = int(value.value)  # Convert SLFloat to SLInteger
         else:
-            from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat
-            if isinstance(value, SLFloat):
-                self.value = int(value.value)  # Convert SLFloat to SLInteger
-            else:
-                raise SLTypeError("SLInteger requires an integer, SLInteger, or SLFloat")
+            raise SLTypeError("SLInteger requires an integer, SLInteger, or SLFloat")
+        return integer
+
+    def __init__(self, value):
+        pass  # Set up by __new__, small integers are shared
 
     def to_slstring(self):
-        from StreamLanguage.sl_types.data_instances.primatives.string import SLString
         return SLString(str(self.value))
 
     def __add__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat
         if isinstance(other, SLInteger):
-            return SLInteger(self.value + other.value)
+            return _integer(self.value + other.value)
         if isinstance(other, SLFloat):
-            return SLFloat(self.value + other.value)
+            return _float(self.value + other.value)
         return NotImplemented
 
     def __pos__(self):
-        test = +self.value
-        return SLInteger(+self.value)
+        return _integer(+self.value)
 
     def __neg__(self):
-        return SLInteger(-self.value)
+        return _integer(-self.value)
 
     def __sub__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat
         if isinstance(other, SLInteger):
-            return SLInteger(self.value - other.value)
+            return _integer(self.value - other.value)
         if isinstance(other, SLFloat):
-            return SLFloat(self.value - other.value)
+            return _float(self.value - other.value)
         return NotImplemented
 
     def __mul__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat
         if isinstance(other, SLInteger):
-            return SLInteger(self.value * other.value)
+            return _integer(self.value * other.value)
         if isinstance(other, SLFloat):
-            return SLFloat(self.value * other.value)
+            return _float(self.value * other.value)
         return NotImplemented
 
     def __truediv__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat
         if isinstance(other, SLInteger):
-            return SLFloat(self.value / other.value)
+            return _float(self.value / other.value)
         if isinstance(other, SLFloat):
-            return SLFloat(self.value / other.value)
+            return _float(self.value / other.value)
         return NotImplemented
 
     def __floordiv__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat
         if isinstance(other, SLInteger):
-            return SLInteger(self.value // other.value)
+            return _integer(self.value // other.value)
         if isinstance(other, SLFloat):
-            return SLFloat(self.value // other.value)
+            return _float(self.value // other.value)
         return NotImplemented
 
     def __mod__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat
         if isinstance(other, SLInteger):
-            return SLInteger(self.value % other.value)
+            return _integer(self.value % other.value)
         if isinstance(other, SLFloat):
-            return SLFloat(self.value % other.value)
+            return _float(self.value % other.value)
         return NotImplemented
 
     def __eq__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
-        from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat
         if isinstance(other, SLInteger):
-            return SLBoolean(self.value == other.value)
+            return TRUE if self.value == other.value else FALSE
         elif isinstance(other, SLFloat):
-            return SLBoolean(self.value == other.value)
+            return TRUE if self.value == other.value else FALSE
         elif isinstance(other, int):
-            return SLBoolean(self.value == other)
+            return TRUE if self.value == other else FALSE
         elif isinstance(other, float):
-            return SLBoolean(self.value == other)
+            return TRUE if self.value == other else FALSE
         elif isinstance(other, SLType):
-            return SLBoolean(False)
+            return FALSE
         return NotImplemented
 
     def __ne__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLInteger):
-            return SLBoolean(self.value != other.value)
+            return TRUE if self.value != other.value else FALSE
         return NotImplemented
 
     def __lt__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLInteger):
-            return SLBoolean(self.value < other.value)
+            return TRUE if self.value < other.value else FALSE
         return NotImplemented
 
     def __le__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLInteger):
-            return SLBoolean(self.value <= other.value)
+            return TRUE if self.value <= other.value else FALSE
         return NotImplemented
 
     def __gt__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLInteger):
-            return SLBoolean(self.value > other.value)
+            return TRUE if self.value > other.value else FALSE
         return NotImplemented
 
     def __ge__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLInteger):
-            return SLBoolean(self.value >= other.value)
+            return TRUE if self.value >= other.value else FALSE
         return NotImplemented
+
+
+_small_integers = []
+for _value in range(SMALL_INT_MIN, SMALL_INT_MAX + 1):
+    _small_integers.append(object.__new__(SLInteger))
+    _small_integers[-1].value = _value
+
+# Imported last, these modules import this one as well
+from StreamLanguage.sl_types.data_instances.primatives.boolean import TRUE, FALSE
+from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat, _float
+from StreamLanguage.sl_types.data_instances.primatives.string import SLString
@@ -3,6 +3,7 @@ from StreamLanguage.sl_types.data_instances.instance_base import SLInstanceType
 from StreamLanguage.sl_types.meta_type.meta_base import SLMetaType
 
 class SLString(SLInstanceType):
+    __slots__ = ()
     type_descriptor = None  # Will be set when SLStringType is initialized
 
     def __init__(self, value):
@@ -38,37 +39,35 @@ class SLString(SLInstanceType):
         return NotImplemented
 
     def __eq__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLString):
-            return SLBoolean(self.value == other.value)
+            return TRUE if self.value == other.value else FALSE
         return NotImplemented
 
     def __ne__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLString):
-            return SLBoolean(self.value != other.value)
+            return TRUE if self.value != other.value else FALSE
         return NotImplemented
 
     def __lt__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLString):
-            return SLBoolean(self.value < other.value)
+            return TRUE if self.value < other.value else FALSE
         return NotImplemented
 
     def __le__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLString):
-            return SLBoolean(self.value <= other.value)
+            return TRUE if self.value <= other.value else FALSE
         return NotImplemented
 
     def __gt__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLString):
-            return SLBoolean(self.value > other.value)
+            return TRUE if self.value > other.value else FALSE
         return NotImplemented
 
     def __ge__(self, other):
-        from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean
         if isinstance(other, SLString):
-            return SLBoolean(self.value >= other.value)
-        return NotImplemented
\ No newline at end of file
+            return TRUE if self.value >= other.value else FALSE
+        return NotImplemented
+
+
+# Imported last, boolean.py imports this module as well
+from StreamLanguage.sl_types.data_instances.primatives.boolean import TRUE, FALSE
@@ -8,19 +8,18 @@ class SLExceptionType(SLMetaType):
     def __init__(self, name, base=None):
         super().__init__(name)
         self.base = base  # Optional base exception type for inheritance
+        # Names of this type and every type up its base chain, so subtype checks are one set lookup
+        self.ancestors = frozenset((name,)) | base.ancestors if base is not None else frozenset((name,))
 
     def is_subtype_of(self, other):
         """
         Check if this exception type is a subtype of another exception type.
         """
-        current = self
-        while current:
-            if current == other:
-                return True
-            current = current.base
-        return False
+        return isinstance(other, SLExceptionType) and other.name in self.ancestors
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if isinstance(other, SLExceptionType):
             return self.name == other.name
         return False
@@ -13,7 +13,8 @@ class SLMetaType(SLType):
         return f"MetaType: {self.name}"
 
     def __eq__(self, other):
-        return self.name == other.name
+        # Registered meta types are interned (see TypeRegistry.register_type), identity settles most comparisons
+        return self is other or (isinstance(other, SLMetaType) and self.name == other.name)
 
     def __hash__(self):
         return hash(self.name)
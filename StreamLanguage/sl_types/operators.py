@@ -0,0 +1,69 @@
+"""
+Binary operator implementations of the primitive instance types, registered in the TypeRegistry operator table by
+init_type_system.
+
+Each function takes two instances of exactly the registered types and works on their values directly, without the
+isinstance chains of the dunder methods it matches. Division and modulus by zero raise the user level ValueError as a
+RaiseSignal, like the compiled engines' operators.
+"""
+from StreamLanguage.interpreter.operations import raise_value_error
+from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean, TRUE, FALSE
+from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat, _float
+from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger, _integer
+from StreamLanguage.sl_types.data_instances.primatives.string import SLString
+
+
+def _integer_division(a, b):
+    if b.value == 0:
+        raise_value_error("Division by zero")
+    return _float(a.value / b.value)
+
+
+def _integer_modulus(a, b):
+    if b.value == 0:
+        raise_value_error("Division by zero")
+    return _integer(a.value % b.value)
+
+
+def _float_division(a, b):
+    if b.value == 0:
+        raise_value_error("Division by zero")
+    return _float(a.value / b.value)
+
+
+def _float_modulus(a, b):
+    if b.value == 0:
+        raise_value_error("Division by zero")
+    return _float(a.value % b.value)
+
+
+COMPARISONS = {
+    '<': lambda a, b: TRUE if a.value < b.value else FALSE,
+    '>': lambda a, b: TRUE if a.value > b.value else FALSE,
+    '==': lambda a, b: TRUE if a.value == b.value else FALSE,
+    '!=': lambda a, b: TRUE if a.value != b.value else FALSE,
+    '<=': lambda a, b: TRUE if a.value <= b.value else FALSE,
+    '>=': lambda a, b: TRUE if a.value >= b.value else FALSE,
+}
+
+# (operator, left instance type, right instance type, implementation, result instance type)
+PRIMITIVE_OPERATORS = [
+    ('+', SLInteger, SLInteger, lambda a, b: _integer(a.value + b.value), SLInteger),
+    ('-', SLInteger, SLInteger, lambda a, b: _integer(a.value - b.value), SLInteger),
+    ('*', SLInteger, SLInteger, lambda a, b: _integer(a.value * b.value), SLInteger),
+    ('/', SLInteger, SLInteger, _integer_division, SLFloat),
+    ('%', SLInteger, SLInteger, _integer_modulus, SLInteger),
+    ('+', SLFloat, SLFloat, lambda a, b: _float(a.value + b.value), SLFloat),
+    ('-', SLFloat, SLFloat, lambda a, b: _float(a.value - b.value), SLFloat),
+    ('*', SLFloat, SLFloat, lambda a, b: _float(a.value * b.value), SLFloat),
+    ('/', SLFloat, SLFloat, _float_division, SLFloat),
+    ('%', SLFloat, SLFloat, _float_modulus, SLFloat),
+    ('+', SLString, SLString, lambda a, b: SLString(a.value + b.value), SLString),
+]
+for _instance_type in (SLInteger, SLFloat, SLString, SLBoolean):
+    for _operator, _comparison in COMPARISONS.items():
+        PRIMITIVE_OPERATORS.append((_operator, _instance_type, _instance_type, _comparison, SLBoolean))
+
+# Operators the primitive types also accept with mixed operands; the table derives them through the implicit
+# conversions, which give the same results as the dunder methods
+IMPLICIT_CONVERSION_OPERATORS = ('+', '-', '*', '/', '%')
@@ -1,36 +1,110 @@
+import threading
+
 from StreamLanguage.sl_ast.exceptions import SLTypeError
 
 
+def _convert_left(implementation, convert):
+    return lambda a, b: implementation(convert(a), b)
+
+
+def _convert_right(implementation, convert):
+    return lambda a, b: implementation(a, convert(b))
+
+
 class TypeRegistry:
     """
     A global registry for managing type conversions and custom SLType registrations.
+
+    Meta types are interned by name, so a registered type can be compared by identity. Registrations take a lock and
+    replace the tables they change with updated copies instead of updating them in place, so readers never need the
+    lock: a lookup sees the registry either before or after a registration, and iterating a table never sees it change.
     """
+    _lock = threading.RLock()
     _type_registry = {}
+    _by_name = {}  # Indices of the registered meta types
+    _by_canonical_name = {}
+    _by_instance_type = {}
     _conversion_registry = {}
+    _implicit_conversions = {}  # The conversions applied to mixed operands of the operators, see derive_implicit_operators
     _global_namespace = {}
+    _operator_table = {}  # (operator, left instance type, right instance type) to (implementation, result meta type)
 
     @classmethod
     def register_type(cls, meta_type, instance_type):
         """
         Register a type in the global type registry, attach the meta_type to the instance_type, and allow the
         meta_type's name to be used as a callable constructor for the instance_type.
+        Returns the interned meta type: the one registered before under the same name and class, if any.
         """
-        # Register the type in the registry
-        cls._type_registry[meta_type] = instance_type
+        with cls._lock:
+            name = getattr(meta_type, 'name', None)
+            registered = cls._by_name.get(name)
+            if registered is not None and type(registered) is type(meta_type):
+                meta_type = registered
 
-        # Attach the meta type to the instance type
-        instance_type.type_descriptor = meta_type
+            # Register the type in the registry
+            cls._type_registry = {**cls._type_registry, meta_type: instance_type}
+            cls._by_instance_type = {**cls._by_instance_type, instance_type: meta_type}
 
-        # Add the callable to the global namespace using meta_type's name
-        if hasattr(meta_type, 'name'):
-            cls._global_namespace[meta_type.name] = instance_type
+            # Attach the meta type to the instance type
+            instance_type.type_descriptor = meta_type
+
+            # Add the callable to the global namespace using meta_type's name
+            if name is not None:
+                cls._by_name = {**cls._by_name, name: meta_type}
+                canonical_name = getattr(meta_type, 'canonical_name', name)
+                cls._by_canonical_name = {**cls._by_canonical_name, canonical_name: meta_type}
+                cls._global_namespace = {**cls._global_namespace, name: instance_type}
+        return meta_type
+
+    @classmethod
+    def register_conversion(cls, from_type, to_type, conversion_func, implicit=False):
+        """
+        Register a conversion function from one type to another. Implicit conversions widen the operands of mixed
+        operations, see derive_implicit_operators.
+        """
+        with cls._lock:
+            cls._conversion_registry = {**cls._conversion_registry, (from_type, to_type): conversion_func}
+            if implicit:
+                cls._implicit_conversions = {**cls._implicit_conversions, (from_type, to_type): conversion_func}
 
     @classmethod
-    def register_conversion(cls, from_type, to_type, conversion_func):
+    def register_operator(cls, operator, left_type, right_type, implementation, result_type):
         """
-        Register a conversion function from one type to another.
+        Register the implementation of a binary operator for operands of exactly the given instance types.
+        result_type is the instance type of the results, it must be registered already.
         """
-        cls._conversion_registry[(from_type, to_type)] = conversion_func
+        with cls._lock:
+            cls._operator_table = {**cls._operator_table,
+                                   (operator, left_type, right_type): (implementation, result_type.type_descriptor)}
+
+    @classmethod
+    def derive_implicit_operators(cls, operators):
+        """
+        Register the given operators for mixed operands, converting the operand that has an implicit conversion to
+        the other operand's type and applying the implementation registered for that type. Pairs that already have
+        an implementation keep it.
+        """
+        with cls._lock:
+            table = dict(cls._operator_table)
+            for (from_type, to_type), convert in cls._implicit_conversions.items():
+                for operator in operators:
+                    entry = table.get((operator, to_type, to_type))
+                    if entry is None:
+                        continue
+                    implementation, result_type = entry
+                    table.setdefault((operator, from_type, to_type),
+                                     (_convert_left(implementation, convert), result_type))
+                    table.setdefault((operator, to_type, from_type),
+                                     (_convert_right(implementation, convert), result_type))
+            cls._operator_table = table
+
+    @classmethod
+    def lookup_operator(cls, operator, left_type, right_type):
+        """
+        The (implementation, result meta type) of an operator for two instance types, None when it has none.
+        """
+        return cls._operator_table.get((operator, left_type, right_type))
 
     @classmethod
     def get_instance_type(cls, meta_type):
@@ -71,28 +145,31 @@ class TypeRegistry:
         """
         Get the meta type by its name.
         """
-        for meta_type in cls._type_registry.keys():
-            if meta_type.name == name:
-                return meta_type
-        return None
+        return cls._by_name.get(name)
 
+    @classmethod
     def get_meta_type_by_canonical_name(cls, name):  # I was going to use this method to get the meta type by its canonical name, but instead I used the get_meta_type_by_name method.
         """
-        Get the meta type by its canonical name.
+        Get the meta type by its canonical name, its name for meta types without one.
         """
-        for meta_type in cls._type_registry.keys():
-            if meta_type.canonical_name == name:
-                return meta_type
-        return None
+        return cls._by_canonical_name.get(name)
 
+    @classmethod
     def get_meta_type_by_instance(cls, instance):
         """
         Get the meta type by its instance.
         """
-        for meta_type in cls._type_registry.keys():
-            if meta_type == instance.type_descriptor:
-                return meta_type
-        return None
+        type_descriptor = getattr(instance, 'type_descriptor', None)
+        if type_descriptor is None:
+            return None
+        return cls._by_name.get(type_descriptor.name)
+
+    @classmethod
+    def get_meta_type_by_instance_type(cls, instance_type):
+        """
+        Get the meta type registered last for an instance type (one class may implement several meta types).
+        """
+        return cls._by_instance_type.get(instance_type)
 
     @classmethod
     def dump_registry(cls):
@@ -273,5 +273,15 @@ class TestASTModel(unittest.TestCase):
         func_call = FunctionCallNode(IdentifierNode('add'), [PrimitiveIntNode(SLInteger(5)), PrimitiveIntNode(SLInteger(3))])
         result = func_call.evaluate(self.context)
         self.assertEqual(result, SLInteger(8))
+
+    def test_block_ids_are_lazy(self):
+        """Nodes are slotted and only allocate block identifiers when they are read."""
+        node = IfNode(IdentifierNode('x'), [], None)
+        self.assertFalse(hasattr(node, '__dict__'))
+        self.assertIsNone(node._block_uuid)
+        self.assertIsNone(node.else_block_uuid)
+        self.assertEqual(node.then_block_uuid, node.then_block_uuid)
+        self.assertNotEqual(node.block_uuid, node.then_block_uuid)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,455 @@
+import contextlib
+import io
+import os
+import re
+import unittest
+
+from StreamLanguage.interpreter.bytecode_compiler import BytecodeCompiler
+from StreamLanguage.interpreter.closure_compiler import ClosureCompiler
+from StreamLanguage.interpreter.contextN import Context
+from StreamLanguage.interpreter.flow_manager import ControlFlowManager, JUMPS, BREAK, RAISE
+from StreamLanguage.interpreter.function_metadata import FunctionMetadata, InlineCache
+from StreamLanguage.interpreter.interpreter import Interpreter
+from StreamLanguage.interpreter.symbol_table import SymbolTable, EntryCache
+from StreamLanguage.sl_ast.block_types import BlockType
+from StreamLanguage.sl_ast.exceptions import FunctionNotFoundError, ParserError
+from StreamLanguage.sl_ast.nodes.error_handling import TryCatchNode
+from StreamLanguage.sl_ast.nodes.expressions import IdentifierNode, BinaryOperationNode, AssignmentNode
+from StreamLanguage.sl_ast.nodes.functions import ReturnNode, FunctionNode, FunctionCallNode
+from StreamLanguage.sl_ast.nodes.node_types import PrimitiveIntNode
+from StreamLanguage.sl_ast.nodes.structure import ProgramNode, VariableDeclarationNode
+from StreamLanguage.parser.parser import Parser
+from StreamLanguage.sl_ast.resolver import Resolver, GLOBAL
+from StreamLanguage.sl_ast.scopes import ScopeElider
+from StreamLanguage.sl_ast.tail_calls import TailCallMarker
+from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat
+from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
+from StreamLanguage.sl_types.type_registry import TypeRegistry
+from StreamLanguage.type_system import init_type_system, init_exception_types
+
+SAMPLES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOOP_PROGRAM = """
+fn count(limit) {
+    var i = 0;
+    var total = 0;
+    while (i < limit) {
+        i = i + 1;
+        if (i % 3 == 0) {
+            continue;
+        }
+        if (i > 20) {
+            break;
+        }
+        total = total + i;
+    }
+    return total;
+}
+print(count(100));
+"""
+
+
+SCOPE_PROGRAM = """
+var g = 10;
+fn inner(a) {
+    var total = 0;
+    var i = 0;
+    while (i < a) {
+        if (i % 2 == 0) {
+            var half = i / 2;
+            total = total + half;
+        } else {
+            var odd = i;
+            total = total + odd + g;
+        }
+        i = i + 1;
+    }
+    g = g + 1;
+    return total;
+}
+fn outer() {
+    var k = 0;
+    var sum = 0;
+    while (k < 3) {
+        sum = sum + inner(k + 4);
+        k = k + 1;
+    }
+    return sum;
+}
+print(outer());
+print(g);
+"""
+
+DEEP_RECURSION_PROGRAM = """
+fn depth(n) {
+    if (n == 0) {
+        return 0;
+    }
+    return 1 + depth(n - 1);
+}
+print(depth(700));
+"""
+
+TAIL_CALL_PROGRAM = """
+fn power(base, exponent, acc) {
+    if (exponent == 0) {
+        return acc;
+    }
+    return power(base, exponent - 1, acc * base);
+}
+fn sum(n, total) {
+    while (n >= 0) {
+        if (n == 0) {
+            return total;
+        }
+        return sum(n - 1, total + n);
+    }
+}
+fn plain(base, exponent) {
+    if (exponent == 0) {
+        return 1;
+    } else {
+        return plain(base, exponent - 1) * base;
+    }
+}
+print(power(3, 4, 1));
+print(sum(5000, 0));
+"""
+
+SHORT_CIRCUIT_PROGRAM = """
+var calls = 0;
+fn noisy(v) { calls = calls + 1; return v; }
+print(1 > 2 && noisy(1 == 1));
+print(1 < 2 || noisy(1 == 2));
+print(1 < 2 && noisy(1 == 2));
+print(1 > 2 || noisy(1 == 1));
+print(calls);
+var i = 0;
+while (i < 5 && noisy(i < 3)) {
+    i = i + 1;
+}
+print(i);
+print(calls);
+"""
+
+COMPILERS = (ClosureCompiler, BytecodeCompiler)
+
+
+def run_program(engine, text):
+    """Run a program on a fresh interpreter and return everything it printed."""
+    interpreter = Interpreter(engine=engine)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        interpreter.interpret(text)
+    return output.getvalue()
+
+
+class TestExecutionEngines(unittest.TestCase):
+    ENGINES = [engine for engine in Interpreter.ENGINES if engine != 'tree']
+
+    def setUp(self):
+        init_type_system()
+        init_exception_types()
+
+    def assertSameOutput(self, text):
+        expected = run_program('tree', text)
+        for engine in self.ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run_program(engine, text), expected)
+
+    def test_sample_programs(self):
+        """Compiled engines print exactly what the tree walker prints for the sample programs."""
+        for sample in ('power.sl', 'test.sl'):
+            with open(os.path.join(SAMPLES_DIR, sample)) as file:
+                self.assertSameOutput(file.read())
+
+    def test_loop_control_flow(self):
+        """Break and continue behave the same in every engine."""
+        self.assertSameOutput(LOOP_PROGRAM)
+
+    def test_control_flow_state(self):
+        """Signals share one state integer, the flag properties read and write its bits."""
+        control_flow = ControlFlowManager()
+        control_flow.set_break()
+        control_flow.set_exception(None)
+        self.assertEqual(control_flow.state, BREAK | RAISE)
+        self.assertFalse(control_flow.state & JUMPS & ~BREAK)
+        control_flow.should_break = False
+        self.assertTrue(control_flow.should_raise and not control_flow.should_break)
+        control_flow.clear(RAISE)
+        self.assertEqual(control_flow.state, 0)
+        with self.assertRaisesRegex(ParserError, "Break statement outside loop"):
+            Interpreter().interpret("var x = 1; break;")
+
+    def test_short_circuit_operators(self):
+        """The right operand of && and || only runs when the left one does not decide the result."""
+        self.assertEqual(run_program('tree', SHORT_CIRCUIT_PROGRAM), "False\nTrue\nFalse\nTrue\n2\n3\n6\n")
+        self.assertSameOutput(SHORT_CIRCUIT_PROGRAM)
+
+    def test_operator_table(self):
+        """Primitive operators come from the TypeRegistry table, mixed arithmetic through the implicit conversion."""
+        implementation, result_type = TypeRegistry.lookup_operator('+', SLInteger, SLFloat)
+        self.assertEqual(implementation(SLInteger(1), SLFloat(0.5)).value, 1.5)
+        self.assertEqual(result_type, SLFloat.type_descriptor)
+        self.assertIsNone(TypeRegistry.lookup_operator('<', SLInteger, SLFloat))  # Not accepted by the dunders either
+        self.assertEqual(run_program('tree', "var x = 7; print(x / 2.0); print(x % 3); print(2.5 - x); print(x < 8);"),
+                         "3.5\n1\n-4.5\nTrue\n")
+
+    def test_registrations_replace_tables(self):
+        """A registration leaves the tables readers already hold unchanged."""
+        class Celsius:
+            pass
+
+        table = TypeRegistry._operator_table
+        entries = dict(table)
+        TypeRegistry.register_operator('+', Celsius, Celsius, lambda a, b: a, SLInteger)
+        TypeRegistry.register_conversion(Celsius, SLInteger, lambda a: a, implicit=True)
+        TypeRegistry.derive_implicit_operators(['+'])
+        self.assertEqual(table, entries)
+        self.assertIsNotNone(TypeRegistry.lookup_operator('+', Celsius, Celsius))
+        self.assertIsNotNone(TypeRegistry.lookup_operator('+', Celsius, SLInteger))
+
+    def test_callers_locals_are_not_redeclared(self):
+        """A function may declare names its caller's blocks declared, not names of the global scope."""
+        recursive = "fn h(a){ if (a > 0) { var y = a; return y + h(a - 1); } return 0; } print(h(5));"
+        self.assertEqual(run_program('tree', recursive), "15\n")
+        self.assertSameOutput(recursive)
+        self.assertSameOutput("fn g(){ var z = 1; return z; } var c = 1; if (c > 0) { var z = 5; print(g()); }")
+        for engine in Interpreter.ENGINES:
+            with self.subTest(engine=engine):
+                with self.assertRaisesRegex(ParserError, "Variable 'y' already declared"):
+                    run_program(engine, "var y = 1; fn f(){ var y = 2; return y; } print(f());")
+
+    def test_block_scoped_locals(self):
+        """Locals declared in blocks re-entered by a loop, and globals assigned from functions."""
+        self.assertSameOutput(SCOPE_PROGRAM)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Interpreter(engine='jit')
+
+    def test_compiled_program_is_reusable(self):
+        """A compiled program can run against several contexts without recompiling."""
+        program = ProgramNode([
+            VariableDeclarationNode(IdentifierNode('x'), value=BinaryOperationNode(
+                '*', PrimitiveIntNode(SLInteger(6)), PrimitiveIntNode(SLInteger(7))))
+        ])
+        for compiler in COMPILERS:
+            compiled = compiler().compile_program(program)
+            for _ in range(2):
+                context = Context()
+                compiled.run(context)
+                self.assertEqual(context.lookup('x'), SLInteger(42))
+
+    def test_resolved_addresses(self):
+        function = FunctionNode('f', [IdentifierNode('a')], [
+            VariableDeclarationNode(IdentifierNode('b'), value=IdentifierNode('a')),
+            AssignmentNode(IdentifierNode('g'), IdentifierNode('b')),
+        ])
+        program = Resolver().resolve_program(ProgramNode([
+            VariableDeclarationNode(IdentifierNode('g'), value=PrimitiveIntNode(SLInteger(0))), function
+        ]))
+        self.assertIsNone(program.nodes[0].identifier.address)
+        self.assertEqual(function.frame_size, 2)
+        self.assertEqual(function.body[0].value.address, (0, 0))
+        self.assertEqual(function.body[0].identifier.address, (0, 1))
+        self.assertIs(function.body[1].target.address, GLOBAL)
+
+    def test_nonlocal_names(self):
+        """A nested function listing a name as nonlocal assigns the variable of its enclosing function."""
+        def build():
+            bump = FunctionNode('bump', [], [
+                AssignmentNode(IdentifierNode('count'), BinaryOperationNode(
+                    '+', IdentifierNode('count'), PrimitiveIntNode(SLInteger(1))))
+            ], nonlocals=['count'])
+            outer = FunctionNode('outer', [], [
+                VariableDeclarationNode(IdentifierNode('count'), value=PrimitiveIntNode(SLInteger(0))),
+                bump,
+                FunctionCallNode(IdentifierNode('bump'), []),
+                FunctionCallNode(IdentifierNode('bump'), []),
+                ReturnNode(IdentifierNode('count')),
+            ])
+            return ProgramNode([outer, VariableDeclarationNode(
+                IdentifierNode('result'), value=FunctionCallNode(IdentifierNode('outer'), []))])
+
+        context = Context()
+        build().evaluate(context)
+        self.assertEqual(context.lookup('result'), SLInteger(2))
+        for compiler in COMPILERS:
+            with self.subTest(compiler=compiler.__name__):
+                context = Context()
+                compiler().compile_program(build()).run(context)
+                self.assertEqual(context.lookup('result'), SLInteger(2))
+                self.assertEqual(context.call_stack, [])
+
+    def test_vm_recursion_does_not_use_host_stack(self):
+        """The VM keeps its own frame stack, so recursion is bounded by the context limits only."""
+        self.assertEqual(run_program('vm', DEEP_RECURSION_PROGRAM), "700\n")
+        self.assertEqual(Interpreter(engine='vm').get_context().call_stack, [])
+
+    def test_tail_calls_reuse_the_call(self):
+        """Self-recursive tail calls run in constant stack, far beyond the function recursion limit."""
+        text = TAIL_CALL_PROGRAM
+        expected = "81\n12502500\n"
+        self.assertEqual(run_program('tree', text), expected)
+        self.assertSameOutput(text)
+        program = Parser().parse(text)
+        TailCallMarker().mark_program(program)
+        self.assertTrue(program.nodes[0].body[1].tail_call)
+        self.assertFalse(program.nodes[2].body[0].else_block[0].tail_call)  # power(b, e) * b is not in tail position
+        self.assertIn("TAIL_CALL", BytecodeCompiler().compile_program(Parser().parse(text)).code.constants[0]
+                      .code.disassemble())
+
+    def test_inline_cache_follows_overloads(self):
+        """A call site keeps resolving to the right overload when the function's overloads change."""
+        one, two = object(), object()
+        metadata = FunctionMetadata('f', [IdentifierNode('a')], one)
+        other = FunctionMetadata('g', [IdentifierNode('a')], two)
+        cache = InlineCache()
+        self.assertIs(cache.resolve(metadata, [1]).implementation, one)
+        self.assertIs(cache.resolve(other, [1]).implementation, two)  # Polymorphic site
+        self.assertIs(cache.resolve(metadata, [1]).implementation, one)
+        metadata.remove_overload(1)
+        metadata.add_overload([IdentifierNode('b')], None, two)
+        self.assertIs(cache.resolve(metadata, [1]).implementation, two)
+        with self.assertRaises(FunctionNotFoundError):
+            cache.resolve(metadata, [1, 2])
+
+    def test_entry_cache_follows_global_bindings(self):
+        """Cached global entries are dropped when a name is bound in the global table."""
+        table = SymbolTable()
+        table.declare('x', None, SLInteger(1))
+        cache = EntryCache()
+        function_scope = SymbolTable(parent=table, is_restricted=True)
+        self.assertEqual(function_scope.lookup('x', cache).value, SLInteger(1))
+        table.update('x', SLInteger(2))  # Updating a value keeps the binding
+        self.assertEqual(function_scope.lookup('x', cache).value, SLInteger(2))
+        version = table.version
+        table.cleanup()
+        table.declare('x', None, SLInteger(3))
+        self.assertNotEqual(table.version, version)
+        self.assertEqual(function_scope.lookup('x', cache).value, SLInteger(3))
+
+    def test_scope_elision(self):
+        """Blocks declaring nothing share the enclosing symbol table but keep their block flags."""
+        program = ScopeElider().mark_program(Parser().parse(SCOPE_PROGRAM))
+        loop = program.nodes[1].body[2]
+        self.assertFalse(loop.body_scoped)  # Only an if statement and an assignment
+        self.assertTrue(loop.body[0].then_scoped and loop.body[0].else_scoped)
+        self.assertFalse(ScopeElider().mark_program(Parser().parse(TAIL_CALL_PROGRAM)).nodes[2].body[0].then_scoped)
+
+        context = Context()
+        table = context.current_symbol_table
+        context.enter_block(BlockType.FUNCTION, 1, scoped=False)
+        context.enter_block(BlockType.IF, 2, scoped=False)
+        self.assertIs(context.current_symbol_table, table)
+        self.assertFalse(context.can_define_function())
+        self.assertFalse(context.is_global_scope())
+        context.enter_block(BlockType.LOOP, 3)
+        self.assertIsNot(context.current_symbol_table, table)
+        context.exit_block()
+        context.exit_block()
+        self.assertTrue(context.can_define_function())
+        context.exit_block()
+        self.assertIs(context.current_symbol_table, table)
+
+    def test_error_stack_trace(self):
+        """Errors leaving a function carry a snapshot of the calls, unless capture is switched off."""
+        text = "fn inner(x) { return x / missing; } fn outer(a) { return inner(a + 1); } outer(2);"
+        for engine in Interpreter.ENGINES:
+            for stack_traces in (True, False):
+                with self.subTest(engine=engine, stack_traces=stack_traces):
+                    # The setters override what the interpreter was created with
+                    interpreter = Interpreter(engine=engine, stack_traces=not stack_traces)
+                    self.assertIsNone(interpreter.set_memoizer(None))
+                    self.assertEqual(interpreter.set_stack_traces(stack_traces), stack_traces)
+                    with self.assertRaises(ParserError) as raised:
+                        interpreter.interpret(text)
+                    stack_trace = raised.exception.stack_trace
+                    if not stack_traces:
+                        self.assertIsNone(stack_trace)
+                        continue
+                    self.assertEqual([frame.function_name for frame in stack_trace.frames()], ['inner', 'outer'])
+                    self.assertTrue(stack_trace.format().startswith("Function 'inner' called with arguments"))
+
+    def test_vm_errors_match_tree_walker(self):
+        """The virtual machine wraps errors in the calls and blocks they pass through like the tree walker."""
+        programs = [
+            "fn k(n){ var i = 0; var s = 0; while (i < n) { var t = i; s = s + t; i = i + 1; } return s; } print(k(3));",
+            "fn f(a){ if (a > 3) { return 1 + nope; } return f(a + 1); } print(f(0));",
+            "var x = 1; fn f() { return y; } print(f());",
+        ]
+
+        def error(engine, text):
+            with self.assertRaises(ParserError) as raised:
+                run_program(engine, text)
+            return re.sub(r"UUID \d+", "UUID", str(raised.exception))
+
+        for text in programs:
+            with self.subTest(text=text):
+                self.assertEqual(error('vm', text), error('tree', text))
+        self.assertIn("Error in while loop body", error('vm', programs[0]))
+
+    def test_vm_disassemble(self):
+        code = BytecodeCompiler().compile_program(ProgramNode([
+            VariableDeclarationNode(IdentifierNode('x'), value=PrimitiveIntNode(SLInteger(1)))
+        ])).code
+        listing = code.disassemble()
+        self.assertIn("LOAD_CONST", listing)
+        self.assertIn("DECLARE_NAME", listing)
+
+    def test_division_by_zero_is_catchable(self):
+        """Division by zero is raised as a user exception that try/catch handles."""
+        value_error_type = TypeRegistry.get_meta_type_by_name("ValueError")
+        function = FunctionNode('divide', [IdentifierNode('a'), IdentifierNode('b')], [
+            TryCatchNode(
+                try_block=[ReturnNode(BinaryOperationNode('/', IdentifierNode('a'), IdentifierNode('b')))],
+                catch_clauses=[("e", value_error_type, [ReturnNode(PrimitiveIntNode(SLInteger(0)))])]
+            )
+        ])
+        program = ProgramNode([
+            function,
+            VariableDeclarationNode(IdentifierNode('ok'), value=FunctionCallNode(
+                IdentifierNode('divide'), [PrimitiveIntNode(SLInteger(10)), PrimitiveIntNode(SLInteger(2))])),
+            VariableDeclarationNode(IdentifierNode('caught'), value=FunctionCallNode(
+                IdentifierNode('divide'), [PrimitiveIntNode(SLInteger(10)), PrimitiveIntNode(SLInteger(0))])),
+        ])
+        for compiler in COMPILERS:
+            with self.subTest(compiler=compiler.__name__):
+                context = Context()
+                compiler().compile_program(program).run(context)
+                self.assertEqual(context.lookup('ok'), 5)
+                self.assertEqual(context.lookup('caught'), SLInteger(0))
+                self.assertEqual(context.call_stack, [])
+                self.assertEqual(len(context.blocks_stack), 0)
+
+
+    def test_catch_clause_matches_base_type(self):
+        """A catch clause for a base exception type handles subtypes, the matching clause is cached per type."""
+        key_error_type = TypeRegistry.get_meta_type_by_name("KeyError")
+        exception_type = TypeRegistry.get_meta_type_by_name("Exception")
+        value_error_type = TypeRegistry.get_meta_type_by_name("ValueError")
+        try_catch = TryCatchNode(
+            try_block=[ReturnNode(BinaryOperationNode('/', IdentifierNode('a'), IdentifierNode('b')))],
+            catch_clauses=[("e", key_error_type, [ReturnNode(PrimitiveIntNode(SLInteger(1)))]),
+                           ("e", exception_type, [ReturnNode(PrimitiveIntNode(SLInteger(2)))])]
+        )
+        program = ProgramNode([
+            FunctionNode('divide', [IdentifierNode('a'), IdentifierNode('b')], [try_catch]),
+            VariableDeclarationNode(IdentifierNode('caught'), value=FunctionCallNode(
+                IdentifierNode('divide'), [PrimitiveIntNode(SLInteger(10)), PrimitiveIntNode(SLInteger(0))])),
+        ])
+        self.assertTrue(value_error_type.is_subtype_of(exception_type))
+        self.assertFalse(value_error_type.is_subtype_of(key_error_type))
+        for compiler in COMPILERS:
+            with self.subTest(compiler=compiler.__name__):
+                context = Context()
+                compiler().compile_program(program).run(context)
+                self.assertEqual(context.lookup('caught'), SLInteger(2))
+        self.assertEqual(try_catch.handler_index(value_error_type), 1)
+        self.assertEqual(try_catch.handler_index(key_error_type), 0)
+        self.assertIn(value_error_type, try_catch._handlers)
+
+
+if __name__ == '__main__':
+    unittest.main()
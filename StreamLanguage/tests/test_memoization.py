@@ -0,0 +1,97 @@
+import contextlib
+import io
+import os
+import unittest
+
+from StreamLanguage.interpreter.interpreter import Interpreter
+from StreamLanguage.interpreter.memoization import Memoizer, MemoCache, MISSING
+from StreamLanguage.parser.parser import Parser
+from StreamLanguage.sl_ast.purity import PurityAnalyzer
+from StreamLanguage.type_system import init_type_system, init_exception_types
+
+SAMPLES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EFFECTS_PROGRAM = """
+var counter = 0;
+const LIMIT = 10;
+fn square(n) { var s = n * n; return s; }
+fn bounded(n) { if (n > LIMIT) { return LIMIT; } return square(n); }
+fn shout(n) { print(n); return n; }
+fn count(n) { counter = counter + n; return counter; }
+fn total(n) { return count(n) + 1; }
+fn even(n) { if (n == 0) { return true; } return odd(n - 1); }
+fn odd(n) { if (n == 0) { return false; } return even(n - 1); }
+fn reads(n) { return counter + n; }
+fn piped(s) { return s >> s; }
+"""
+
+
+def analyze(text):
+    program = PurityAnalyzer().analyze_program(Parser().parse(text))
+    return {node.name: node.pure for node in program.nodes if hasattr(node, 'pure')}
+
+
+class TestPurity(unittest.TestCase):
+    def setUp(self):
+        init_type_system()
+        init_exception_types()
+
+    def test_effects(self):
+        pure = analyze(EFFECTS_PROGRAM)
+        self.assertTrue(pure['square'])
+        self.assertTrue(pure['bounded'])
+        self.assertTrue(pure['even'] and pure['odd'])  # Mutual recursion
+        self.assertFalse(pure['shout'])  # Builtin with I/O
+        self.assertFalse(pure['count'])  # Global write
+        self.assertFalse(pure['total'])  # Calls an impure function
+        self.assertFalse(pure['reads'])  # Reads an assigned global
+        self.assertFalse(pure['piped'])  # Stream operation
+
+
+class TestMemoization(unittest.TestCase):
+    def setUp(self):
+        init_type_system()
+        init_exception_types()
+
+    def run_program(self, engine, text, memoizer):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            Interpreter(engine=engine, memoizer=memoizer).interpret(text)
+        return output.getvalue()
+
+    def test_fibonacci_sample(self):
+        """fib.sl computes fibonacci(100) with double recursion, only feasible with memoization."""
+        with open(os.path.join(SAMPLES_DIR, 'fib.sl')) as file:
+            text = file.read()
+        for engine in Interpreter.ENGINES:
+            with self.subTest(engine=engine):
+                memoizer = Memoizer()
+                output = self.run_program(engine, text, memoizer)
+                self.assertIn("354224848179261915075", output)
+                self.assertEqual(memoizer.stats()['fibonacci/1']['misses'], 101)
+                self.assertNotIn('main/0', memoizer.stats())
+
+    def test_impure_calls_repeat(self):
+        text = EFFECTS_PROGRAM + "shout(1); shout(1); print(total(2)); print(total(2)); print(bounded(3) + bounded(3));"
+        expected = self.run_program('tree', text, None)
+        for engine in Interpreter.ENGINES:
+            with self.subTest(engine=engine):
+                memoizer = Memoizer()
+                self.assertEqual(self.run_program(engine, text, memoizer), expected)
+                self.assertEqual(memoizer.stats()['bounded/1']['hits'], 1)
+
+    def test_eviction(self):
+        for eviction, expected in (('lru', MISSING), ('fifo', 'b')):
+            cache = MemoCache(max_entries=2, eviction=eviction)
+            cache.store(1, 'a')
+            cache.store(2, 'b')
+            cache.lookup(1)
+            cache.store(3, 'c')
+            self.assertEqual(cache.lookup(2), expected)
+            self.assertEqual(cache.stats()['evictions'], 1)
+        with self.assertRaises(ValueError):
+            Memoizer(eviction='random')
+
+
+if __name__ == '__main__':
+    unittest.main()
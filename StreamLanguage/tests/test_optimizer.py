@@ -0,0 +1,92 @@
+import contextlib
+import io
+import unittest
+
+from StreamLanguage.interpreter.contextN import Context
+from StreamLanguage.interpreter.interpreter import Interpreter
+from StreamLanguage.parser.parser import Parser
+from StreamLanguage.sl_ast.nodes.error_handling import TryCatchNode
+from StreamLanguage.sl_ast.nodes.expressions import IdentifierNode, BinaryOperationNode
+from StreamLanguage.sl_ast.nodes.functions import ReturnNode, FunctionNode, FunctionCallNode
+from StreamLanguage.sl_ast.nodes.node_types import PrimitiveIntNode, PrimitiveStringNode
+from StreamLanguage.sl_ast.nodes.structure import ProgramNode, VariableDeclarationNode
+from StreamLanguage.sl_ast.optimizer import ConstantFolder
+from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
+from StreamLanguage.sl_types.type_registry import TypeRegistry
+from StreamLanguage.type_system import init_type_system, init_exception_types
+from StreamLanguage.tests.test_engines import COMPILERS, LOOP_PROGRAM, SCOPE_PROGRAM
+
+
+def fold(text):
+    return ConstantFolder().fold_program(Parser().parse(text))
+
+
+class TestConstantFolding(unittest.TestCase):
+    def setUp(self):
+        init_type_system()
+        init_exception_types()
+
+    def test_constant_arithmetic(self):
+        program = fold("var x = 2 * 3 + 1; var s = \"a\" + \"b\";")
+        self.assertIsInstance(program.nodes[0].value, PrimitiveIntNode)
+        self.assertEqual(program.nodes[0].value.value, SLInteger(7))
+        self.assertIsInstance(program.nodes[1].value, PrimitiveStringNode)
+
+    def test_const_propagation(self):
+        program = fold("const K = 2 * 3; fn f(n) { return n * K; } const C = 1; C = 2; var y = C;")
+        product = program.nodes[1].body[0].value
+        self.assertIsInstance(product.right, PrimitiveIntNode)
+        self.assertEqual(product.right.value, SLInteger(6))
+        # Assigned names are never propagated
+        self.assertIsInstance(program.nodes[4].value, IdentifierNode)
+
+    def test_const_hidden_by_parameter(self):
+        program = fold("const n = 1; fn f(n) { return n; }")
+        self.assertIsInstance(program.nodes[1].body[0].value, IdentifierNode)
+
+    def test_identities(self):
+        program = fold("var i = 0; i = i + 0; var f = 1.5; f = f + 0; var s = \"a\"; s = s * 1;"
+                       "if (!!(i < 1)) { i = i - 0; }")
+        self.assertIsInstance(program.nodes[1].value, IdentifierNode)
+        # x + 0 is kept for floats (-0.0 + 0 is 0.0) and x * 1 for non numbers
+        self.assertIsInstance(program.nodes[3].value, BinaryOperationNode)
+        self.assertIsInstance(program.nodes[5].value, BinaryOperationNode)
+        condition = program.nodes[6].condition
+        self.assertIsInstance(condition, BinaryOperationNode)
+        self.assertEqual(condition.operator, '<')
+
+    def test_division_by_zero_is_not_folded(self):
+        """A constant division by zero still raises when executed, so try/catch handles it."""
+        value_error_type = TypeRegistry.get_meta_type_by_name("ValueError")
+
+        def build():
+            return ProgramNode([
+                FunctionNode('divide', [], [TryCatchNode(
+                    try_block=[ReturnNode(BinaryOperationNode(
+                        '/', PrimitiveIntNode(SLInteger(1)), PrimitiveIntNode(SLInteger(0))))],
+                    catch_clauses=[("e", value_error_type, [ReturnNode(PrimitiveIntNode(SLInteger(-1)))])]
+                )]),
+                VariableDeclarationNode(IdentifierNode('result'), value=FunctionCallNode(IdentifierNode('divide'), []))
+            ])
+
+        program = ConstantFolder().fold_program(build())
+        self.assertIsInstance(program.nodes[0].body[0].try_block[0].value, BinaryOperationNode)
+        for compiler in COMPILERS:
+            with self.subTest(compiler=compiler.__name__):
+                context = Context()
+                compiler().compile_program(ConstantFolder().fold_program(build())).run(context)
+                self.assertEqual(context.lookup('result'), SLInteger(-1))
+
+    def test_same_output(self):
+        for text in (LOOP_PROGRAM, SCOPE_PROGRAM):
+            outputs = []
+            for optimize in (False, True):
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    Interpreter(optimize=optimize).interpret(text)
+                outputs.append(output.getvalue())
+            self.assertEqual(outputs[0], outputs[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
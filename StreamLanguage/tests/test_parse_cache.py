@@ -0,0 +1,86 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from StreamLanguage.interpreter.interpreter import Interpreter
+from StreamLanguage.parser.parse_cache import ParseCache, PARSETAB_PATH, encode, decode
+from StreamLanguage.parser.parser import Parser
+from StreamLanguage.type_system import init_type_system, init_exception_types
+
+SAMPLES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        init_type_system()
+        init_exception_types()
+        self.parser = Parser()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read_sample(self, name):
+        with open(os.path.join(SAMPLES_DIR, name)) as file:
+            return file.read()
+
+    def test_round_trip(self):
+        """Decoding an encoded tree gives a tree that encodes the same way."""
+        for sample in ('power.sl', 'test.sl', 'fib.sl'):
+            encoded = encode(self.parser.parse(self.read_sample(sample)))
+            self.assertEqual(encode(decode(encoded)), encoded)
+
+    def test_memory_hits(self):
+        cache = ParseCache()
+        text = self.read_sample('power.sl')
+        first = cache.parse(self.parser, text)
+        second = cache.parse(self.parser, text)
+        self.assertIsNot(first, second)
+        self.assertEqual(cache.stats(), {'hits': 1, 'disk_hits': 0, 'misses': 1, 'entries': 1})
+
+    def test_cached_program_runs(self):
+        text = self.read_sample('test.sl')
+        outputs = []
+        interpreter = Interpreter(parse_cache=ParseCache())
+        for _ in range(2):
+            interpreter.set_context(Interpreter().get_context())
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                interpreter.interpret(text)
+            outputs.append(output.getvalue())
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(interpreter.get_parse_cache().hits, 1)
+
+    def test_disk_entries_outlive_the_cache(self):
+        text = self.read_sample('fib.sl')
+        ParseCache(directory=self.directory).parse(self.parser, text)
+        cache = ParseCache(directory=self.directory)
+        cache.parse(self.parser, text)
+        self.assertEqual((cache.hits, cache.disk_hits, cache.misses), (1, 1, 0))
+
+    def test_parser_tables_change_invalidates(self):
+        parsetab = os.path.join(self.directory, 'parsetab.py')
+        shutil.copyfile(PARSETAB_PATH, parsetab)
+        entries = os.path.join(self.directory, 'entries')
+        text = self.read_sample('power.sl')
+        cache = ParseCache(directory=entries, parsetab_path=parsetab)
+        cache.parse(self.parser, text)
+
+        with open(parsetab, 'a') as file:
+            file.write("\n# regenerated\n")
+        cache.parse(self.parser, text)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(len([name for name in os.listdir(entries) if name.endswith('.slc')]), 1)
+
+    def test_syntax_errors_are_not_cached(self):
+        cache = ParseCache()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertIsNone(cache.parse(self.parser, "var = ;"))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
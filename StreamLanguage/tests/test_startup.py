@@ -0,0 +1,60 @@
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+
+import ply.lex as lex
+import ply.yacc as yacc
+
+from StreamLanguage.lexer import lextab
+from StreamLanguage.lexer.lexer import Lexer
+from StreamLanguage.parser import parsetab
+from StreamLanguage.parser.parse_cache import encode
+from StreamLanguage.parser.parser import Parser
+from StreamLanguage.type_system import init_type_system, init_exception_types
+
+SAMPLES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestFrozenTables(unittest.TestCase):
+    def setUp(self):
+        init_type_system()
+        init_exception_types()
+
+    def test_parser_tables_match_grammar(self):
+        """The shipped parser tables were generated from the current grammar (see parser/freeze.py)."""
+        reflection = yacc.ParserReflect({name: getattr(Parser, name) for name in dir(Parser)},
+                                        log=yacc.PlyLogger(io.StringIO()))
+        reflection.get_all()
+        self.assertEqual(reflection.signature(), parsetab._lr_signature)
+
+    def test_lexer_tables_match_rules(self):
+        """The shipped lexer tables are the ones parser/freeze.py writes for the current token rules."""
+        with tempfile.TemporaryDirectory() as directory:
+            lex.lex(module=Lexer.__new__(Lexer), optimize=True, lextab='fresh_lextab', outputdir=directory,
+                    errorlog=lex.NullLogger())
+            spec = importlib.util.spec_from_file_location('fresh_lextab', os.path.join(directory, 'fresh_lextab.py'))
+            fresh = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(fresh)
+        for table in ('_lextokens', '_lexreflags', '_lexliterals', '_lexstateinfo', '_lexstatere', '_lexstateignore',
+                      '_lexstateerrorf', '_lexstateeoff'):
+            with self.subTest(table=table):
+                self.assertEqual(getattr(lextab, table, None), getattr(fresh, table, None))
+
+    def test_frozen_parser_parses_the_same(self):
+        frozen, generated = Parser.frozen(), Parser()
+        for sample in ('power.sl', 'test.sl', 'fib.sl', 'guess.sl'):
+            with open(os.path.join(SAMPLES_DIR, sample)) as file:
+                text = file.read()
+            self.assertEqual(encode(frozen.parse(text)), encode(generated.parse(text)))
+
+    def test_frozen_parser_writes_nothing(self):
+        directories = [os.path.dirname(parsetab.__file__), os.path.dirname(lextab.__file__), os.getcwd()]
+        before = [sorted(os.listdir(directory)) for directory in directories]
+        Parser.frozen()
+        self.assertEqual([sorted(os.listdir(directory)) for directory in directories], before)
+
+
+if __name__ == '__main__':
+    unittest.main()
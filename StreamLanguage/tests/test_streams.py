@@ -0,0 +1,288 @@
+import itertools
+import operator
+import time
+import unittest
+
+from StreamLanguage.interpreter.bytecode_compiler import BytecodeCompiler
+from StreamLanguage.interpreter.closure_compiler import ClosureCompiler
+from StreamLanguage.interpreter.contextN import Context
+from StreamLanguage.interpreter import vectorize
+from StreamLanguage.interpreter.dataflow import vectorized, DEFAULT_BATCH_SIZE, MAX_BATCH_SIZE
+from StreamLanguage.interpreter.interpreter import Interpreter
+from StreamLanguage.interpreter.windows import COUNT, MIN, MAX, MEAN, SUM
+from StreamLanguage.parser.parser import Parser
+from StreamLanguage.sl_types.data_instances.collections.basic_stream import SLBasicStream
+from StreamLanguage.sl_types.data_instances.collections.ring_buffer import DROP_OLDEST, DROP_NEWEST, BLOCK, GROW
+from StreamLanguage.sl_types.data_instances.collections.stream import SLStream
+from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat
+from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
+from StreamLanguage.sl_types.type_registry import TypeRegistry
+from StreamLanguage.type_system import init_type_system, init_exception_types
+
+
+def integers(values):
+    """Source stream of the given Python ints."""
+    return SLStream(lambda: (SLInteger(value) for value in values),
+                    element_type=TypeRegistry.get_meta_type_by_name("Integer"))
+
+NUMERIC_FUNCTIONS = """
+fn processData(input) { return (input - 32) * 5 / 9; }
+fn hot(input) { return input > 80; }
+fn add(a, b) { return a + b; }
+fn double(x) { return x * 2; }
+fn third(x) { return x / 3; }
+fn count(x) { print(x); return x; }
+"""
+
+
+def values(stream):
+    return [element.value for element in stream]
+
+
+class TestStreams(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        init_type_system()
+        init_exception_types()
+
+    def test_map_filter_infinite_source(self):
+        """Reading a stream only runs the graph until an element reaches it."""
+        evens = integers(itertools.count()).filter(lambda x: x.value % 2 == 0).map(lambda x: x * SLInteger(10))
+        self.assertEqual([evens.next().value for _ in range(4)], [0, 20, 40, 60])
+
+    def test_split_merge_feedback(self):
+        left, right = SLStream(), SLStream()
+        integers([1, 2]).split(left).split(right)
+        self.assertEqual(values(left), [1, 2])
+        self.assertEqual(values(right), [1, 2])
+
+        self.assertEqual(values(integers([1, 2]).merge(integers([10]))), [1, 2, 10])
+
+        # Halve pushed elements until they reach 1, every value passes through loop
+        loop, seen = SLStream(), SLStream()
+        loop.split(seen)
+        loop.feedback(loop.filter(lambda x: x.value > 1).map(lambda x: SLInteger(x.value // 2)))
+        loop.push(SLInteger(16))
+        self.assertEqual(values(seen), [16, 8, 4, 2, 1])
+
+    def test_reduce_and_type_validation(self):
+        self.assertEqual(integers([1, 2, 3]).reduce(lambda a, b: a + b), SLInteger(6))
+        strings = SLStream(element_type=TypeRegistry.get_meta_type_by_name("String"))
+        integers([1]).chain(strings)
+        with self.assertRaises(TypeError):
+            strings.next()
+
+    def test_stream_operators_in_engines(self):
+        """The stream operators connect the graph the same way in every engine."""
+        program_source = "var result = (a ++ b) >> out;"
+        for compiler in (None, ClosureCompiler, BytecodeCompiler):
+            with self.subTest(compiler=compiler and compiler.__name__):
+                program = Parser().parse(program_source)
+                context = Context()
+                stream_type = TypeRegistry.get_meta_type_by_name("Stream")
+                out = SLStream()
+                context.declare_variable('a', t=stream_type, v=integers([1, 2]))
+                context.declare_variable('b', t=stream_type, v=integers([3]))
+                context.declare_variable('out', t=stream_type, v=out)
+                if compiler is None:
+                    program.evaluate(context)
+                else:
+                    compiler().compile_program(program).run(context)
+                self.assertIs(context.lookup('result'), out)
+                self.assertEqual(values(out), [1, 2, 3])
+
+    def test_basic_stream_overflow_policies(self):
+        expected = {
+            DROP_OLDEST: ([6, 7, 8, 9], 6, 4),
+            DROP_NEWEST: ([0, 1, 2, 3], 6, 4),
+            BLOCK: (list(range(10)), 0, 4),
+            GROW: ([4, 5, 6, 7, 8, 9], 4, 6),
+        }
+        for overflow, (elements, dropped, high_water_mark) in expected.items():
+            with self.subTest(overflow=overflow):
+                stream = SLBasicStream(capacity=4, overflow=overflow, max_capacity=6)
+                for value in range(10):
+                    stream.push(SLInteger(value))
+                self.assertEqual(stream.dropped, dropped)
+                self.assertEqual(stream.high_water_mark, high_water_mark)
+                self.assertEqual(values(stream), elements)
+
+    def test_source_fed_basic_stream_keeps_up(self):
+        """A basic stream read as fast as its source fills it drops nothing, one falling behind drops elements."""
+        for overflow in (DROP_OLDEST, DROP_NEWEST, BLOCK, GROW):
+            with self.subTest(overflow=overflow):
+                stream = SLBasicStream(lambda: (SLInteger(value) for value in range(100)), capacity=10,
+                                       overflow=overflow)
+                self.assertEqual(stream.next().value, 0)
+                self.assertEqual([stream.next().value for _ in range(99)], list(range(1, 100)))
+                self.assertIsNone(stream.next())
+                self.assertEqual(stream.dropped, 0)
+                self.assertEqual(stream.high_water_mark, 10)
+
+        # Only the other branch is read, the basic stream keeps the newest elements
+        source, other, behind = integers(range(10)), SLStream(), SLBasicStream(capacity=4)
+        source.split(other).split(behind)
+        self.assertEqual(values(other), list(range(10)))
+        self.assertEqual(behind.dropped, 6)
+        self.assertEqual(values(behind), [6, 7, 8, 9])
+
+    def test_blocking_basic_stream_holds_source(self):
+        """A full blocking sink keeps the graph waiting instead of growing or dropping."""
+        stream = SLBasicStream(capacity=3, overflow=BLOCK)
+        integers(range(100)).chain(stream)
+        self.assertEqual(values(stream), list(range(100)))
+        self.assertEqual(stream.high_water_mark, 3)
+        self.assertEqual(stream.capacity, 3)
+
+    def test_vectorized_stages_run_once_per_batch(self):
+        calls = []
+
+        @vectorized
+        def double(batch):
+            calls.append(len(batch))
+            return [element * SLInteger(2) for element in batch]
+
+        @vectorized
+        def small(batch):
+            calls.append(len(batch))
+            return [element.value < 50 for element in batch]
+
+        source = integers(range(200))
+        source.graph.adaptive = False
+        self.assertEqual(values(source.filter(small).map(double)), [value * 2 for value in range(50)])
+        # One predicate call per batch pulled, one map call for the only batch with elements left
+        batch = DEFAULT_BATCH_SIZE
+        self.assertEqual(calls, [batch, 50, batch, batch, 200 - 3 * batch])
+
+    def test_adaptive_batch_size(self):
+        """Batches grow while they arrive and run through the graph fast and shrink when they are slow."""
+        fast = integers(range(20000))
+        fast.graph.target_latency = 60.0
+        values(fast)
+        self.assertEqual(fast.graph.batch_size, MAX_BATCH_SIZE)
+
+        slow = integers(range(500))
+        slow.graph.target_latency = 0.0
+        values(slow)
+        self.assertEqual(slow.graph.batch_size, 1)
+
+        # Time spent waiting on the source counts, a sensor taking 2ms per reading gets small batches
+        def readings():
+            for value in itertools.count():
+                time.sleep(0.002)
+                yield SLInteger(value)
+
+        sensor = SLStream(readings)
+        sensor.graph.target_latency = 0.01
+        self.assertEqual([sensor.next().value for _ in range(150)], list(range(150)))
+        self.assertLessEqual(sensor.graph.batch_size, 8)
+
+    def user_functions(self):
+        interpreter = Interpreter(engine='closure')
+        interpreter.interpret(NUMERIC_FUNCTIONS)
+        context = interpreter.get_context()
+        return context, lambda name: context.lookup(name).overloads[0].implementation
+
+    def test_numeric_functions_match_scalar_results(self):
+        """Map, filter and reduce give the results of calling the function per element, with or without NumPy."""
+        context, function = self.user_functions()
+        integer_numbers = [SLInteger(value) for value in range(0, 300, 7)]
+        numbers = integer_numbers + [SLFloat(value / 3) for value in range(50)]
+
+        def source():
+            return SLStream(lambda: iter(numbers))
+
+        def call(name, *args):
+            return function(name).invoke(*args, context=context)
+
+        self.assertEqual(values(source().map(function('processData'), context)),
+                         [call('processData', number).value for number in numbers])
+        # Integers and Floats do not compare, the predicate only sees Integers
+        self.assertEqual(values(SLStream(lambda: iter(integer_numbers)).filter(function('hot'), context)),
+                         [number.value for number in integer_numbers if call('hot', number)])
+        self.assertEqual(SLStream(lambda: iter(integer_numbers)).reduce(function('add'), context=context).value,
+                         sum(number.value for number in integer_numbers))
+        # Integers leaving the int64 range stay exact
+        self.assertEqual(values(SLStream(lambda: iter([SLInteger(2 ** 62)])).map(function('double'), context)),
+                         [2 ** 63])
+        # Integers float64 does not hold exactly divide like Python ints
+        large = [SLInteger(2 ** 53 + 1), SLInteger(-2 ** 53 - 1), SLInteger(6)]
+        self.assertEqual(values(SLStream(lambda: iter(large)).map(function('third'), context)),
+                         [call('third', number).value for number in large])
+
+    @unittest.skipIf(vectorize.numpy is None, "NumPy is not installed")
+    def test_columnar_functions(self):
+        context, function = self.user_functions()
+        self.assertIsNotNone(vectorize.columnar_function(function('processData')))
+        self.assertIsNotNone(vectorize.columnar_function(function('hot')))
+        self.assertIsNone(vectorize.columnar_function(function('count')))
+        self.assertIs(vectorize.vectorize_reduce(function('add')), operator.add)
+        stage = vectorize.vectorize_map(function('processData'), None)  # No scalar path needed for these batches
+        self.assertEqual([element.value for element in stage([SLInteger(212), SLInteger(32)])], [100.0, 0.0])
+
+    def test_fused_stages_and_explain(self):
+        """Stateless stages of a chain run as one route, vertices fed by several streams start their own."""
+        source = integers(range(10))
+        evens = source.filter(lambda x: x.value % 2 == 0)
+        incremented = evens.map(lambda x: x + SLInteger(1))
+        tripled = incremented.map(lambda x: x * SLInteger(3))
+        self.assertEqual(source.explain(), f"source {source.vertex_id} + filter {evens.vertex_id} + "
+                                           f"map {incremented.vertex_id} + map {tripled.vertex_id} -> sink")
+        self.assertEqual(values(tripled), [3, 9, 15, 21, 27])
+
+        other = integers([100])
+        merged = tripled.merge(other)
+        self.assertEqual(merged.explain().splitlines(), [
+            f"source {source.vertex_id} + filter {evens.vertex_id} + map {incremented.vertex_id} + "
+            f"map {tripled.vertex_id} -> stream {merged.vertex_id}",
+            f"stream {merged.vertex_id} -> sink",
+            f"source {other.vertex_id} -> stream {merged.vertex_id}",
+        ])
+
+    def test_count_windows(self):
+        self.assertEqual(values(integers(range(10)).tumbling(3)), [3, 12, 21])
+        self.assertEqual(values(integers(range(6)).sliding(3, aggregate=MEAN)), [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(values(integers([5, 1, 4, 2, 8, 0, 3]).sliding(3, aggregate=MIN)), [1, 1, 2, 0, 0])
+        self.assertEqual(values(integers([5, 1, 4, 2, 8, 0, 3]).sliding(3, step=2, aggregate=MAX)), [5, 8, 8])
+        # Windows emit as elements arrive, an infinite source is fine
+        averages = integers(itertools.count()).sliding(4, aggregate=MEAN)
+        self.assertEqual([averages.next().value for _ in range(3)], [1.5, 2.5, 3.5])
+
+    def test_sliding_windows_of_floats(self):
+        """Sums and means of Floats leaving a window are not subtracted, a window of Integers sums to an Integer."""
+        def stream(numbers):
+            return SLStream(lambda: iter(numbers))
+
+        floats = [SLFloat(value) for value in (1e16, 1.0, 1.0, 1.0)]
+        self.assertEqual(values(stream(floats).sliding(2)), [1e16, 2.0, 2.0])
+        self.assertEqual(values(stream(floats).sliding(2, aggregate=MEAN)), [5e15, 1.0, 1.0])
+
+        mixed = [SLFloat(0.1), SLFloat(0.2), SLInteger(1), SLInteger(2), SLInteger(4)]
+        sums = list(stream(mixed).sliding(2))
+        self.assertEqual([type(total) for total in sums], [SLFloat, SLFloat, SLInteger, SLInteger])
+        self.assertEqual([total.value for total in sums[1:]], [1.2, 3, 6])
+
+        def timestamp(element):
+            return element.value if type(element) is SLInteger else 0
+
+        times = [SLFloat(1e16), SLInteger(1), SLInteger(2), SLInteger(5)]
+        sums = list(stream(times).sliding(2, 1, SUM, by_time=True, timestamp=timestamp))
+        self.assertEqual([total.value for total in sums], [1e16, 1e16, 3, 2, 5, 5])
+        self.assertIs(type(sums[2]), SLInteger)  # The Float left the window
+
+    def test_time_windows(self):
+        """Time windows close on the first later element, or when the source is exhausted."""
+        times = [1, 2, 5, 6, 7, 11, 12]
+
+        def timestamp(element):
+            return element.value
+
+        self.assertEqual(values(integers(times).tumbling(5, COUNT, by_time=True, timestamp=timestamp)), [2, 3, 2])
+        self.assertEqual(values(integers(times).sliding(4, 2, SUM, by_time=True, timestamp=timestamp)),
+                         [1, 3, 7, 18, 13, 11, 23, 12])
+        self.assertEqual(values(integers(times + [30]).session(2, COUNT, timestamp=timestamp)), [2, 3, 2, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
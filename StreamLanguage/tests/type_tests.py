@@ -1,11 +1,14 @@
 import unittest
-from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger
+from StreamLanguage.sl_types.data_instances.primatives.boolean import SLBoolean, TRUE, FALSE
+from StreamLanguage.sl_types.data_instances.primatives.integer import SLInteger, SMALL_INT_MAX
 from StreamLanguage.sl_types.data_instances.primatives.float import SLFloat
 from StreamLanguage.sl_types.data_instances.collections.array import SLArray
 from StreamLanguage.sl_types.data_instances.primatives.string import SLString
 from StreamLanguage.sl_types.meta_type.primatives.integer_type import SLIntegerType
 from StreamLanguage.sl_types.meta_type.primatives.float_type import SLFloatType
 from StreamLanguage.sl_types.meta_type.collections.array_type import SLArrayType
+from StreamLanguage.sl_types.type_registry import TypeRegistry
+from StreamLanguage.type_system import init_type_system, init_exception_types
 
 class TestSLTypes(unittest.TestCase):
 
@@ -103,6 +106,34 @@ class TestSLTypes(unittest.TestCase):
         self.assertEqual(str_obj_from_int.value, "5")
         self.assertEqual(str_obj_from_float.value, "5.5")
 
+    def test_shared_instances(self):
+        """Booleans are the TRUE and FALSE singletons and small integers are cached, values behave the same."""
+        self.assertIs(SLInteger(3) < SLInteger(4), TRUE)
+        self.assertIs(SLFloat(1.5) == SLInteger(2), FALSE)
+        self.assertIs(SLBoolean(True), TRUE)
+        self.assertIs(SLInteger(2) + SLInteger(3), SLInteger(5))
+        big = SLInteger(SMALL_INT_MAX) + SLInteger(1)
+        self.assertEqual(big.value, SMALL_INT_MAX + 1)
+        self.assertTrue(big == SLInteger(SMALL_INT_MAX + 1))
+        self.assertFalse(hasattr(SLInteger(1), '__dict__'))
+
+
+    def test_registry_interns_meta_types(self):
+        """Registering a type again keeps the interned meta type, lookups by name return it."""
+        init_type_system()
+        init_exception_types()
+        integer_type = TypeRegistry.get_meta_type_by_name("Integer")
+        value_error_type = TypeRegistry.get_meta_type_by_name("ValueError")
+        init_type_system()
+        init_exception_types()
+        self.assertIs(TypeRegistry.get_meta_type_by_name("Integer"), integer_type)
+        self.assertIs(SLInteger(1).type_descriptor, integer_type)
+        self.assertIs(TypeRegistry.get_meta_type_by_instance(SLInteger(1)), integer_type)
+        self.assertIs(TypeRegistry.get_meta_type_by_name("ValueError"), value_error_type)
+        self.assertTrue(value_error_type.is_subtype_of(TypeRegistry.get_meta_type_by_name("Exception")))
+        self.assertIsNone(TypeRegistry.get_meta_type_by_name("Unknown"))
+
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,5 +1,6 @@
 from StreamLanguage.sl_types.data_instances.primatives.exception import SLExceptionInstance
 from StreamLanguage.sl_types.meta_type.exception_type import SLExceptionType
+from StreamLanguage.sl_types.operators import PRIMITIVE_OPERATORS, IMPLICIT_CONVERSION_OPERATORS
 from StreamLanguage.sl_types.type_registry import TypeRegistry
 
 from StreamLanguage.sl_types.meta_type.primatives.integer_type import SLIntegerType
@@ -39,34 +40,23 @@ def init_type_system():
     TypeRegistry.register_type(SLStreamType(), SLStream)
 
     # Register conversion functions
-    TypeRegistry.register_conversion(SLInteger, SLFloat, lambda x: SLFloat(x.value))
+    TypeRegistry.register_conversion(SLInteger, SLFloat, lambda x: SLFloat(x.value), implicit=True)
     TypeRegistry.register_conversion(SLFloat, SLInteger, lambda x: SLInteger(x.value))
 
+    # Operator table, mixed integer and float arithmetic goes through the implicit conversion
+    for operator, left_type, right_type, implementation, result_type in PRIMITIVE_OPERATORS:
+        TypeRegistry.register_operator(operator, left_type, right_type, implementation, result_type)
+    TypeRegistry.derive_implicit_operators(IMPLICIT_CONVERSION_OPERATORS)
+
 def init_exception_types():
     """
     Initializes the exception sl_types for StreamLanguage.
     """
-    # Define base exception type
-    base_exception_type = SLExceptionType("Exception")
-
-    # Register the base exception type
-    TypeRegistry.register_type(base_exception_type, SLExceptionInstance)
-
-    # Define specific exception sl_types
-    type_error_type = SLExceptionType("TypeError", base=base_exception_type)
-    value_error_type = SLExceptionType("ValueError", base=base_exception_type)
-    index_error_type = SLExceptionType("IndexError", base=base_exception_type)
-    key_error_type = SLExceptionType("KeyError", base=base_exception_type)
+    # Define and register the base exception type, keeping the interned instance when it is registered already
+    base_exception_type = TypeRegistry.register_type(SLExceptionType("Exception"), SLExceptionInstance)
 
-    # Register specific exception sl_types
-    TypeRegistry.register_type(type_error_type, SLExceptionInstance)
-    TypeRegistry.register_type(value_error_type, SLExceptionInstance)
-    TypeRegistry.register_type(index_error_type, SLExceptionInstance)
-    TypeRegistry.register_type(key_error_type, SLExceptionInstance)
+    # Define and register specific exception sl_types
+    for name in ("TypeError", "ValueError", "IndexError", "KeyError"):
+        TypeRegistry.register_type(SLExceptionType(name, base=base_exception_type), SLExceptionInstance)
 
-    # Optionally, add constructors to the global namespace
-    TypeRegistry._global_namespace["Exception"] = SLExceptionInstance
-    TypeRegistry._global_namespace["TypeError"] = SLExceptionInstance
-    TypeRegistry._global_namespace["ValueError"] = SLExceptionInstance
-    TypeRegistry._global_namespace["IndexError"] = SLExceptionInstance
-    TypeRegistry._global_namespace["KeyError"] = SLExceptionInstance
+    # register_type adds their constructors to the global namespace